@@ -1,14 +1,17 @@
 #app.py
+import re
+
 import streamlit as st
 from utils.database import init_db
-from frontend.registration import show_registration_page
-from frontend.login import show_login_page
-from frontend.dashboard import show_dashboard
+from utils.metrics import start_exporters
+from utils.profiling import RerunProfiler, profiling_enabled_by_env
 
+# Page modules are imported where they are shown: the dashboard pulls in
+# PyPDF2, NumPy and SciPy, which a visitor on the register page never needs.
 
-def add_global_css():
-    st.markdown(
-        """
+
+# Source of the page styling; what is sent to the browser is GLOBAL_CSS
+_GLOBAL_CSS_SOURCE = """
         <style>
         /* Background image */
         .stApp {
@@ -64,9 +67,30 @@ def add_global_css():
             background: #1d4ed8;
         }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def _minify_css(css: str) -> str:
+    """Drop comments and indentation; done once per process, not per rerun."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return "".join(line.strip() for line in css.splitlines())
+
+
+GLOBAL_CSS = _minify_css(_GLOBAL_CSS_SOURCE)
+
+
+def add_global_css():
+    # Streamlit rebuilds the page on every rerun, so the style tag has to be
+    # sent each time; keeping it minified and prebuilt makes that cheap.
+    st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
+
+
+@st.cache_resource(show_spinner=False)
+def init_process():
+    """One-time setup per server process, skipped on every later rerun."""
+    init_db()
+    start_exporters()  # does nothing unless RESUME_APP_METRICS is set
+    return True
 
 
 def main():
@@ -77,7 +101,7 @@ def main():
     )
 
     add_global_css()
-    init_db()
+    init_process()
 
     # Init session
     if "page" not in st.session_state:
@@ -98,9 +122,13 @@ def main():
     page = st.session_state["page"]
 
     if page == "register":
+        from frontend.registration import show_registration_page
+
         show_registration_page()
 
     elif page == "login":
+        from frontend.login import show_login_page
+
         show_login_page()
 
     elif page == "dashboard":
@@ -108,8 +136,38 @@ def main():
             st.warning("You must log in to access the dashboard.")
             st.info("Please use the *Login* option in the sidebar.")
         else:
+            from frontend.dashboard import show_dashboard
+
             show_dashboard()
 
 
+def profiling_requested() -> bool:
+    """RESUME_APP_PROFILE=1 profiles every rerun; ?profile=1 just this session's."""
+    return profiling_enabled_by_env() or st.query_params.get("profile") == "1"
+
+
+def show_profile_panel(report):
+    with st.expander(f"Profile · {report['page']} rerun took {report['elapsed_ms']} ms"):
+        if report["saved_to"]:
+            st.caption(f"Saved as {report['saved_to']}")
+        else:
+            st.caption("Not among the slowest reruns, so not saved.")
+        st.table(report["top"])
+
+
+def run():
+    if not profiling_requested():
+        main()
+        return
+
+    # Tag with the page being rendered, not the one a button switches to
+    page = st.session_state.get("page", "register")
+    profiler = RerunProfiler(page)
+    with profiler:
+        main()
+    if profiler.report is not None:
+        show_profile_panel(profiler.report)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Background worker for the analysis_jobs queue.
+
+    python -m backend.analysis_worker            # run until Ctrl+C / SIGTERM
+    python -m backend.analysis_worker --drain    # exit once the queue is empty
+
+Start as many as you like, on one machine or several sharing app.db: each
+job is leased to exactly one worker at a time. The Streamlit app also runs
+one worker thread in-process unless RESUME_APP_EMBEDDED_WORKER=0.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import traceback
+import uuid
+
+from backend.resume_analyzer import analysis_record, basic_resume_analysis
+from backend.resume_cache import resume_cache
+from backend.resume_parser import extract_resume_text
+from backend.resume_store import resolve
+from utils.database import (
+    JOB_LEASE_SECONDS,
+    claim_analysis_job,
+    complete_analysis_job,
+    fail_analysis_job,
+    heartbeat_analysis_job,
+    init_db,
+    save_resume_analysis,
+    transaction,
+)
+
+POLL_INTERVAL = 1.0  # seconds between claims when the queue is empty
+EMBEDDED_WORKER = os.environ.get("RESUME_APP_EMBEDDED_WORKER", "1") != "0"
+
+_embedded = None
+_embedded_lock = threading.Lock()
+
+
+class LeaseLost(Exception):
+    """Another worker took over the job; our result must not be written."""
+
+
+class AnalysisWorker:
+    def __init__(self, worker_id: str = None,
+                 lease_seconds: float = JOB_LEASE_SECONDS,
+                 poll_interval: float = POLL_INTERVAL):
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def _heartbeat(self, job_id: int, finished: threading.Event):
+        # Renew at a third of the lease so one slow write cannot lose it
+        while not finished.wait(self.lease_seconds / 3):
+            if not heartbeat_analysis_job(job_id, self.worker_id, self.lease_seconds):
+                return
+
+    def process(self, job: dict) -> int:
+        """Extract, analyse and store one job's resume. Returns the resume_analysis id."""
+        text = extract_resume_text(str(resolve(job["file_path"])), raise_errors=True)
+        analysis = basic_resume_analysis(text)
+
+        entry = (job["content_hash"], job["file_path"], analysis["clean_text"], analysis)
+        # Result, cache row and job completion commit together, or not at all
+        with transaction():
+            result_id = save_resume_analysis(
+                job["user_id"], content_hash=job["content_hash"], **analysis_record(analysis)
+            )
+            resume_cache.store(*entry)
+            if not complete_analysis_job(job["id"], self.worker_id, result_id):
+                raise LeaseLost(f"job {job['id']} was reassigned")
+        # Memory only learns of results that committed
+        resume_cache.remember(*entry)
+        return result_id
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False if nothing was runnable."""
+        job = claim_analysis_job(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        finished = threading.Event()
+        beat = threading.Thread(
+            target=self._heartbeat, args=(job["id"], finished),
+            name=f"job-{job['id']}-heartbeat", daemon=True,
+        )
+        beat.start()
+        try:
+            self.process(job)
+            self.processed += 1
+        except LeaseLost as e:
+            print(f"[analysis_worker] {e}; dropping our result")
+        except Exception as e:
+            self.failed += 1
+            status = fail_analysis_job(
+                job["id"], self.worker_id, f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+            )
+            print(f"[analysis_worker] Job {job['id']} failed ({e}); now {status}")
+        finally:
+            finished.set()
+            beat.join()
+        return True
+
+    def run(self, drain: bool = False):
+        """Process jobs until stop() is called (or the queue is empty, with drain)."""
+        while not self.stopping.is_set():
+            if not self.run_once():
+                if drain:
+                    return
+                self.stopping.wait(self.poll_interval)
+
+    def stop(self):
+        self.stopping.set()
+
+
+def start_embedded_worker():
+    """Run one worker thread inside this process (once), unless disabled."""
+    global _embedded
+    if not EMBEDDED_WORKER or _embedded is not None:
+        return _embedded
+
+    with _embedded_lock:
+        if _embedded is None:
+            worker = AnalysisWorker()
+            threading.Thread(
+                target=worker.run, name="analysis-worker", daemon=True
+            ).start()
+            _embedded = worker
+    return _embedded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run resume analysis jobs from the queue.")
+    parser.add_argument("--drain", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS,
+                        help="seconds a claimed job stays leased without a heartbeat")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL,
+                        help="seconds to wait between claims when idle")
+    args = parser.parse_args(argv)
+
+    init_db()
+    worker = AnalysisWorker(lease_seconds=args.lease, poll_interval=args.poll)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    print(f"[analysis_worker] {worker.worker_id} started")
+
+    try:
+        worker.run(drain=args.drain)
+    except KeyboardInterrupt:
+        pass
+    print(f"[analysis_worker] Stopped: {worker.processed} done, {worker.failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import re
-import bcrypt
-from utils.database import create_user, get_user_by_email
+import sqlite3
+from backend.password_hasher import HasherOverloaded, password_hasher
+from utils.database import create_user, get_user_by_email, update_user_password_hash
+from utils.metrics import instrument
+from utils.write_behind import WRITE_RESULT_TIMEOUT, write
+
+BUSY_MESSAGE = "The server is busy right now. Please try again in a moment."
 
 # EMAIL VALIDATION
 
@@ -39,6 +44,7 @@ def validate_password(password: str) -> tuple[bool, str]:
 
 # USER REGISTRATION 
 
+@instrument()
 def register_user(full_name: str, email: str, password: str, confirm_password: str):
     """
     Handles user registration.
@@ -70,18 +76,26 @@ def register_user(full_name: str, email: str, password: str, confirm_password: s
     if existing is not None:
         return False, "User with this email already exists."
 
-    # Hash the password
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    # Hash the password (off-thread, bounded pool)
+    try:
+        hashed_pw = password_hasher.hash_password(password)
+    except HasherOverloaded:
+        return False, BUSY_MESSAGE
 
     try:
-        create_user(full_name, email, hashed_pw)
+        # Waits for the commit, so the user can log in straight away
+        write(create_user, full_name, email, hashed_pw).result(timeout=WRITE_RESULT_TIMEOUT)
         return True, "Registration successful! You can now log in."
+    except sqlite3.IntegrityError:
+        # Registered by another process since our email filter last refreshed
+        return False, "User with this email already exists."
     except Exception as e:
         print("Error in register_user:", e)
         return False, "Something went wrong while creating the user."
 
 # USER LOGIN LOGIC
 
+@instrument()
 def login_user(email: str, password: str):
     """
     Handles user login.
@@ -97,7 +111,22 @@ def login_user(email: str, password: str):
     stored_hash = user["password_hash"]
 
     # Compare entered password with stored hash
-    if bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8")):
-        return True, "Login successful!", user
-    else:
-        return False, "Invalid email or password.", None
\ No newline at end of file
+    try:
+        valid = password_hasher.verify_password(password, stored_hash)
+    except HasherOverloaded:
+        return False, BUSY_MESSAGE, None
+
+    if not valid:
+        return False, "Invalid email or password.", None
+
+    # Upgrade hashes made with an older cost factor while we know the password
+    if password_hasher.needs_rehash(stored_hash):
+        try:
+            new_hash = password_hasher.hash_password(password)
+            update_user_password_hash(user["id"], new_hash)
+            user["password_hash"] = new_hash
+        except Exception as e:
+            # Not fatal: the old hash still works, we retry on the next login
+            print("Error while rehashing password:", e)
+
+    return True, "Login successful!", user
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Bulk-ingest a directory of resumes into resume_analysis.
+
+    python -m backend.batch_ingest data/campus_dump --user-id 1 --workers 8 --timeout 30
+
+Files are matched by content hash, so re-running after a crash (or on a
+directory that grew) only processes files that are not stored yet.
+"""
+import argparse
+import hashlib
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.resume_analyzer import analysis_record, basic_resume_analysis
+from backend.resume_parser import extract_resume_text
+from utils.database import (
+    get_analyzed_content_hashes,
+    init_db,
+    save_resume_analyses_bulk,
+    user_exists,
+)
+
+RESUME_EXTENSIONS = {".pdf", ".docx", ".doc"}
+HASH_CHUNK_SIZE = 1024 * 1024
+# Slack the parent allows past --timeout before it kills a worker
+TIMEOUT_GRACE = 5.0
+
+
+def find_resumes(root: str):
+    """Yield resume file paths under root, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in RESUME_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks (same key as the upload cache)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("per-file timeout exceeded")
+
+
+def _init_worker():
+    # Workers get Ctrl+C through the parent shutting the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_timeout)
+
+
+def process_file(path: str, timeout: float) -> dict:
+    """
+    Extract and analyse one resume inside a worker process.
+    Returns {"path", "record", "elapsed", "error"}; record is None on failure.
+    The alarm only interrupts Python code; the parent enforces the timeout
+    for a worker stuck anywhere else.
+    """
+    started = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, "setitimer")
+
+    try:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        # Already one process per file; nested page pools would oversubscribe.
+        # raise_errors lets our alarm through instead of reading as "no text".
+        text = extract_resume_text(path, parallel=False, raise_errors=True)
+        analysis = basic_resume_analysis(text)
+        if not analysis["clean_text"]:
+            raise ValueError("no text could be extracted")
+        record = analysis_record(analysis)
+        error = None
+    except Exception as e:
+        record = None
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        "path": path,
+        "record": record,
+        "elapsed": time.perf_counter() - started,
+        "error": error,
+    }
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def _kill_pool(pool: ProcessPoolExecutor):
+    """Stop a pool without waiting: a stuck worker would never let shutdown() return."""
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def ingest_directory(root: str, user_id: int, workers: int = None,
+                     timeout: float = 30.0, batch_size: int = 100) -> dict:
+    """
+    Process every new resume under root and store the analyses as
+    user_id's (an existing user; raises ValueError otherwise).
+    Returns a summary dict (counts, files/sec, p50/p95 latency).
+
+    At most `workers` files are in flight, so a file's clock starts when
+    it is submitted. One that has no result timeout + TIMEOUT_GRACE
+    seconds later is failed, and the pool is killed and rebuilt. If a
+    worker dies (BrokenProcessPool), the pool is rebuilt and the files
+    it was running are retried one at a time; one that kills a worker
+    on its own is failed.
+    """
+    init_db()
+    if not user_exists(user_id):
+        raise ValueError(f"No user with id {user_id}; create the owner of the import first")
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    # Hash up front so already-ingested files never reach the pool
+    pending = {}
+    unreadable = []
+    total = 0
+    for path in find_resumes(root):
+        total += 1
+        try:
+            pending.setdefault(hash_file(path), path)
+        except OSError as e:
+            unreadable.append((path, f"{type(e).__name__}: {e}"))
+            print(f"[batch_ingest] Cannot read {path}: {e}")
+
+    # Another user's copy of the same file does not count as this user's
+    done = get_analyzed_content_hashes(user_id, pending)
+    todo = deque((h, p, False) for h, p in pending.items() if h not in done)
+    print(
+        f"[batch_ingest] {total} files, {len(pending)} unique, "
+        f"{len(todo)} to process"
+    )
+    to_process = len(todo)
+
+    latencies = []
+    failures = list(unreadable)
+    batch = []
+    stored = 0
+
+    def flush():
+        nonlocal stored
+        if batch:
+            stored += save_resume_analyses_bulk(batch)
+            batch.clear()
+
+    def fail(path, error, elapsed):
+        latencies.append(elapsed)
+        failures.append((path, error))
+        print(f"[batch_ingest] Failed {path}: {error}")
+
+    in_flight = {}  # future -> (content hash, path, solo, submitted at)
+    pool = _new_pool(workers)
+    try:
+        while todo or in_flight:
+            # Files retried after a worker died run alone, so a crash
+            # points at the file that caused it
+            while todo and len(in_flight) < workers:
+                solo = todo[0][2]
+                if solo and in_flight or any(s for _, _, s, _ in in_flight.values()):
+                    break
+                content_hash, path, solo = todo.popleft()
+                future = pool.submit(process_file, path, timeout)
+                in_flight[future] = (content_hash, path, solo, time.monotonic())
+
+            wait_for = None
+            if timeout:
+                oldest = min(t for *_, t in in_flight.values())
+                wait_for = max(0.0, oldest + timeout + TIMEOUT_GRACE - time.monotonic())
+            finished, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            broken = False
+            for future in finished:
+                content_hash, path, solo, submitted = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    if solo:
+                        fail(path, "BrokenProcessPool: worker process died",
+                             time.monotonic() - submitted)
+                    else:
+                        todo.appendleft((content_hash, path, True))
+                    continue
+
+                latencies.append(result["elapsed"])
+                if result["error"]:
+                    failures.append((result["path"], result["error"]))
+                    print(f"[batch_ingest] Failed {result['path']}: {result['error']}")
+                    continue
+
+                record = dict(result["record"])
+                record["user_id"] = user_id
+                record["content_hash"] = content_hash
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    flush()
+
+            now = time.monotonic()
+            expired = [
+                future for future, (*_, submitted) in in_flight.items()
+                if timeout and now - submitted >= timeout + TIMEOUT_GRACE
+            ]
+            for future in expired:
+                _, path, _, submitted = in_flight.pop(future)
+                fail(path, f"TimeoutError: no result after {timeout:g}s", now - submitted)
+
+            if broken or expired:
+                # Everything still running goes back in the queue, ahead
+                # of new files; with a dead worker they are suspects too
+                for content_hash, path, solo, _ in in_flight.values():
+                    todo.appendleft((content_hash, path, solo or broken))
+                in_flight.clear()
+                _kill_pool(pool)
+                pool = _new_pool(workers)
+
+        flush()
+    finally:
+        _kill_pool(pool)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "files_seen": total,
+        "skipped": total - to_process - len(unreadable),
+        "processed": len(latencies),
+        "stored": stored,
+        "failed": len(failures),
+        "elapsed_s": elapsed,
+        "files_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_s": _percentile(latencies, 50) if latencies else 0.0,
+        "p95_s": _percentile(latencies, 95) if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of resumes.")
+    parser.add_argument("directory", help="folder to scan recursively for PDF/DOCX files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="seconds allowed per file before it is failed")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="rows written per transaction")
+    parser.add_argument("--user-id", type=int, required=True,
+                        help="existing user who owns the imported rows")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = ingest_directory(
+            args.directory,
+            user_id=args.user_id,
+            workers=args.workers,
+            timeout=args.timeout,
+            batch_size=args.batch_size,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(
+        f"\nProcessed {summary['processed']} files in {summary['elapsed_s']:.1f}s "
+        f"({summary['files_per_s']:.1f} files/s)\n"
+        f"  stored:  {summary['stored']}\n"
+        f"  skipped: {summary['skipped']} (already ingested or duplicate)\n"
+        f"  failed:  {summary['failed']}\n"
+        f"  latency: p50 {summary['p50_s'] * 1000:.0f} ms · "
+        f"p95 {summary['p95_s'] * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from utils.database import init_db, iter_changed_job_postings
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CATALOG_PATH = BASE_DIR / "data" / "job_catalog.json"
+
+# Tokens keep "+", "#" and inner dots so "c++", "c#" and "node.js" survive
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our "
+    "the to we with will you your this that who able using use work".split()
+)
+
+# Bump whenever ranking changes (weighting, tokenizer, catalog fields...);
+# stored recommendations from older versions are recomputed by
+# `python -m backend.reanalyze`
+MATCHER_VERSION = 1
+
+# Only the highest-weighted resume terms are scored; the long tail of
+# common words barely moves the ranking but dominates the cost
+QUERY_MAX_TERMS = 128
+
+# Segments are merged once there are more than this many
+MAX_SEGMENTS = 8
+
+# How often the shared index checks job_postings for new or changed rows
+POSTINGS_REFRESH_SECONDS = 60.0
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def posting_text(posting: dict) -> str:
+    """The text a posting is indexed under."""
+    return " ".join(
+        [
+            posting.get("title") or "",
+            " ".join(posting.get("tags") or []),
+            posting.get("description") or "",
+        ]
+    )
+
+
+def load_catalog(path=CATALOG_PATH) -> list:
+    """Read the job catalog (a JSON list of posting dicts)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class JobIndex:
+    """
+    Sparse TF-IDF index over job postings (SMART lnc.ltc weighting).
+
+    Documents get log-scaled, cosine-normalised term frequencies, which do
+    not depend on corpus statistics; IDF is applied to the query only. That
+    lets add_postings() build a new segment for just the new rows while
+    every existing segment stays valid. Segments are stored column-major
+    (CSC) so a query only touches the columns of its own terms.
+    remove_postings() masks rows out instead of rebuilding segments.
+    """
+
+    def __init__(self, postings=None):
+        self.postings = []
+        self.vocab = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self._segments = []          # list of (first posting index, csc matrix)
+        self._rows_by_id = {}        # stored posting id -> row in self.postings
+        self._removed = np.zeros(0, dtype=bool)
+        self._lock = threading.RLock()
+
+        if postings:
+            self.add_postings(postings)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def add_postings(self, postings):
+        """Index new postings as one segment. Returns the number added."""
+        postings = list(postings)
+        if not postings:
+            return 0
+
+        with self._lock:
+            indptr = [0]
+            indices = []
+            data = []
+
+            for posting in postings:
+                counts = Counter(tokenize(posting_text(posting)))
+                cols = []
+                for term in counts:
+                    col = self.vocab.get(term)
+                    if col is None:
+                        col = self.vocab[term] = len(self.vocab)
+                    cols.append(col)
+
+                weights = np.array(
+                    [1.0 + math.log(c) for c in counts.values()], dtype=np.float32
+                )
+                norm = float(np.sqrt(np.dot(weights, weights))) or 1.0
+
+                indices.extend(cols)
+                data.extend((weights / norm).tolist())
+                indptr.append(len(indices))
+
+            rows = sparse.csr_matrix(
+                (
+                    np.asarray(data, dtype=np.float32),
+                    np.asarray(indices, dtype=np.int32),
+                    np.asarray(indptr, dtype=np.int64),
+                ),
+                shape=(len(postings), len(self.vocab)),
+            )
+
+            df = np.zeros(len(self.vocab), dtype=np.int64)
+            df[: len(self._df)] = self._df
+            df += np.bincount(rows.indices, minlength=len(self.vocab))
+            self._df = df
+
+            for i, posting in enumerate(postings, start=len(self.postings)):
+                if posting.get("id") is not None:
+                    self._rows_by_id[posting["id"]] = i
+            self._segments.append((len(self.postings), rows.tocsc()))
+            self.postings.extend(postings)
+            self._removed = np.concatenate(
+                [self._removed, np.zeros(len(postings), dtype=bool)]
+            )
+
+            if len(self._segments) > MAX_SEGMENTS:
+                self._merge_segments()
+
+        return len(postings)
+
+    def remove_postings(self, ids) -> int:
+        """Drop stored postings (by job_postings id) from results. Returns how many."""
+        removed = 0
+        with self._lock:
+            for posting_id in ids:
+                row = self._rows_by_id.pop(posting_id, None)
+                if row is None:
+                    continue
+                start, segment = next((s, m) for s, m in reversed(self._segments) if s <= row)
+                cols = segment.getrow(row - start).indices
+                self._df[cols] -= 1
+                self._removed[row] = True
+                removed += 1
+        return removed
+
+    def _merge_segments(self):
+        n_terms = len(self.vocab)
+        blocks = []
+        for _, segment in self._segments:
+            segment = segment.tocsr()
+            segment.resize((segment.shape[0], n_terms))
+            blocks.append(segment)
+        self._segments = [(0, sparse.vstack(blocks, format="csc"))]
+
+    def _query_vector(self, text: str):
+        counts = Counter(tokenize(text))
+        n_docs = len(self.postings) - int(self._removed.sum())
+
+        cols = []
+        weights = []
+        for term, count in counts.items():
+            col = self.vocab.get(term)
+            if col is None:
+                continue
+            idf = math.log((1 + n_docs) / (1 + self._df[col])) + 1.0
+            cols.append(col)
+            weights.append((1.0 + math.log(count)) * idf)
+
+        if not cols:
+            return None, None
+
+        cols = np.asarray(cols, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float32)
+
+        if len(cols) > QUERY_MAX_TERMS:
+            keep = np.argpartition(weights, -QUERY_MAX_TERMS)[-QUERY_MAX_TERMS:]
+            cols, weights = cols[keep], weights[keep]
+
+        return cols, weights / np.linalg.norm(weights)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of text against every posting, as one array."""
+        with self._lock:
+            result = np.zeros(len(self.postings), dtype=np.float32)
+            cols, weights = self._query_vector(text)
+            if cols is None:
+                return result
+
+            for start, segment in self._segments:
+                in_segment = cols < segment.shape[1]
+                if not in_segment.any():
+                    continue
+                sub = segment[:, cols[in_segment]]
+                result[start:start + segment.shape[0]] = sub @ weights[in_segment]
+
+            result[self._removed] = 0.0
+            return result
+
+    def search(self, text: str, top_k: int = 5) -> list:
+        """
+        Return the top_k postings for text, best first, as copies of the
+        posting dicts with a match_percentage (0-100) added.
+        """
+        scores = self.scores(text)
+        if not len(scores):
+            return []
+
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(scores, -top_k)[-top_k:]
+        best = best[np.argsort(-scores[best])]
+
+        results = []
+        for i in best:
+            if scores[i] <= 0:
+                break
+            job = dict(self.postings[i])
+            job["match_percentage"] = round(float(scores[i]) * 100, 1)
+            results.append(job)
+        return results
+
+
+_default_index = None
+_default_lock = threading.Lock()
+_synced_change_seq = 0      # highest job_postings change_seq already applied
+_synced_at = float("-inf")
+
+
+def _sync_stored_postings(index: JobIndex) -> int:
+    """
+    Apply job_postings rows inserted or changed since the last sync: the
+    old entry of each is dropped, and canonical ones are indexed again
+    (as one segment). Returns the number of rows applied.
+    """
+    global _synced_change_seq
+    changed = list(iter_changed_job_postings(after_seq=_synced_change_seq))
+    if changed:
+        index.remove_postings(p["id"] for p in changed)
+        index.add_postings(p for p in changed if p["canonical_id"] is None)
+        _synced_change_seq = changed[-1]["change_seq"]
+    return len(changed)
+
+
+def get_job_index() -> JobIndex:
+    """
+    Return the process-wide index: the catalog plus scraped job_postings.
+    Every POSTINGS_REFRESH_SECONDS it picks up new postings, edited ones
+    and ones whose duplicate status changed (see migration 12).
+    """
+    global _default_index, _synced_at
+    now = time.monotonic()
+    if _default_index is None or now - _synced_at >= POSTINGS_REFRESH_SECONDS:
+        with _default_lock:
+            if _default_index is None:
+                init_db()
+                _default_index = JobIndex(load_catalog())
+            if now - _synced_at >= POSTINGS_REFRESH_SECONDS:
+                _sync_stored_postings(_default_index)
+                _synced_at = now
+    return _default_index
+
+
+def recommend_jobs(analysis: dict, top_k: int = 5) -> list:
+    """Rank the catalog against a resume analysis (text plus skills)."""
+    query = " ".join([analysis.get("clean_text", "")] + analysis.get("skills", []))
+    return get_job_index().search(query, top_k=top_k)
+
+
+def to_recommendation_row(job: dict) -> dict:
+    """Map a ranked posting onto save_job_recommendation(s) fields."""
+    return {
+        "job_title": job.get("title"),
+        "company_name": job.get("company"),
+        "location": job.get("location"),
+        "job_description": job.get("description"),
+        "job_url": job.get("url"),
+        "match_percentage": job.get("match_percentage"),
+    }
@@ -0,0 +1,425 @@
+"""
+Fetch job listing pages concurrently and store their postings.
+
+    python -m backend.job_scraper data/job_sources.json
+    python -m backend.job_scraper sources.json --per-host 2 --rate 1 --dry-run
+
+The sources file is a JSON list:
+
+    [{"name": "acme", "url": "https://jobs.acme.example/list?page={page}",
+      "pages": 5, "concurrency": 2, "rate": 1.0}]
+
+`url` (or a list under `urls`) may contain {page}, expanded for 1..pages.
+`concurrency` and `rate` override the per-host defaults for that source's
+hosts. A page is either JSON (a list of postings, or an object holding
+one under "jobs"/"results"/"postings"/"data") or HTML with schema.org
+JobPosting blocks in <script type="application/ld+json">.
+
+All requests share one pooled aiohttp session. Each page's ETag and
+Last-Modified are stored in scrape_pages and sent back next time, so a
+page that has not changed costs a 304. A page's postings and validators
+are written in the same transaction, along with the near-duplicate check
+(backend/posting_dedup.py) for any posting not seen before.
+"""
+import argparse
+import asyncio
+import html
+import json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from backend.posting_dedup import deduplicate_new_postings
+from utils.database import (
+    get_page_validators,
+    init_db,
+    save_scrape_pages_bulk,
+    transaction,
+    upsert_job_postings_bulk,
+)
+
+MAX_CONNECTIONS = 32        # across all hosts
+PER_HOST_CONCURRENCY = 4    # requests in flight per host
+PER_HOST_RATE = 5.0         # request starts per second per host
+REQUEST_TIMEOUT = 20.0      # seconds per attempt
+RETRIES = 3                 # extra attempts on errors, 429 and 5xx
+BACKOFF_BASE = 0.5          # seconds; doubles per attempt, plus jitter
+BACKOFF_MAX = 30.0
+BATCH_PAGES = 20            # pages per write transaction
+USER_AGENT = "resume-analyser-job-scraper/1.0"
+
+JSON_LIST_KEYS = ("jobs", "results", "postings", "data")
+LD_JSON_RE = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+class HostLimiter:
+    """
+    At most `concurrency` requests in flight and `rate` request starts
+    per second for one host. Use as `async with limiter:`.
+    """
+
+    def __init__(self, concurrency: int = PER_HOST_CONCURRENCY, rate: float = PER_HOST_RATE):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            # Reserve the next start slot, then sleep outside the lock
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            if start > now:
+                await asyncio.sleep(start - now)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+def load_sources(path: str) -> tuple:
+    """
+    Read a sources file. Returns (pages, sources): pages holds one
+    {"source", "url"} dict per listing page, with {page} expanded.
+    """
+    with open(path, encoding="utf-8") as f:
+        sources = json.load(f)
+
+    pages = []
+    for source in sources:
+        templates = source.get("urls") or [source["url"]]
+        for template in templates:
+            numbers = range(1, int(source.get("pages", 1)) + 1) if "{page}" in template else [None]
+            for number in numbers:
+                url = template.replace("{page}", str(number)) if number else template
+                pages.append({"source": source["name"], "url": url})
+    return pages, sources
+
+
+def _text(value) -> str:
+    """Plain text from a JSON field that may hold HTML or nested values."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("value") or ""
+    if isinstance(value, list):
+        value = ", ".join(_text(v) for v in value)
+    return html.unescape(TAG_RE.sub(" ", str(value))).strip()
+
+
+def _location(value) -> str:
+    """schema.org jobLocation (Place / PostalAddress, or a list) as text."""
+    if isinstance(value, list):
+        return " / ".join(filter(None, (_location(v) for v in value)))
+    if isinstance(value, dict):
+        address = value.get("address", value)
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            return ", ".join(_text(p) for p in parts if p)
+        return _text(address)
+    return _text(value)
+
+
+def _tags(value) -> list:
+    if isinstance(value, str):
+        return [t.strip() for t in value.split(",") if t.strip()]
+    if isinstance(value, list):
+        return [_text(t) for t in value if _text(t)]
+    return []
+
+
+def normalize_posting(item: dict, page_url: str, source: str):
+    """Map a JSON or JobPosting object onto job_postings fields; None if it has no url."""
+    url = item.get("url") or item.get("link") or item.get("apply_url")
+    if not url:
+        return None
+
+    company = item.get("company") or item.get("company_name") or item.get("hiringOrganization")
+    location = item.get("location") or item.get("jobLocation")
+    if item.get("jobLocationType") == "TELECOMMUTE" and not location:
+        location = "Remote"
+
+    return {
+        "source": source,
+        "url": urljoin(page_url, str(url)),
+        "title": _text(item.get("title") or item.get("name")),
+        "company": _text(company),
+        "location": _location(location),
+        "description": _text(item.get("description")),
+        "tags": _tags(item.get("tags") or item.get("skills")),
+        "posted_at": _text(item.get("posted_at") or item.get("date_posted") or item.get("datePosted")) or None,
+    }
+
+
+def _json_ld_postings(node):
+    """Yield every JobPosting object in a JSON-LD document."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _json_ld_postings(child)
+    elif isinstance(node, dict):
+        kind = node.get("@type")
+        if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+            yield node
+        for key in ("@graph", "itemListElement", "item"):
+            if key in node:
+                yield from _json_ld_postings(node[key])
+
+
+def parse_listing(body: str, content_type: str, page_url: str, source: str) -> list:
+    """Postings on one listing page (JSON or HTML with JSON-LD)."""
+    items = []
+    if "json" in content_type or body.lstrip()[:1] in ("[", "{"):
+        data = json.loads(body)
+        if isinstance(data, dict):
+            data = next((data[k] for k in JSON_LIST_KEYS if isinstance(data.get(k), list)), [data])
+        elif not isinstance(data, list):
+            data = []  # a bare string or number holds no postings
+        items = [item for item in data if isinstance(item, dict)]
+    else:
+        for block in LD_JSON_RE.findall(body):
+            try:
+                items.extend(_json_ld_postings(json.loads(block)))
+            except ValueError:
+                continue  # one broken block should not cost the page
+
+    postings = (normalize_posting(item, page_url, source) for item in items)
+    return [posting for posting in postings if posting is not None]
+
+
+def _decode(body: bytes, charset: str) -> str:
+    """Decode a response body; an unknown or bogus charset falls back to UTF-8."""
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return min(float(value), BACKOFF_MAX)
+    except ValueError:
+        return 0.0
+
+
+class JobScraper:
+    def __init__(self, per_host: int = PER_HOST_CONCURRENCY, rate: float = PER_HOST_RATE,
+                 max_connections: int = MAX_CONNECTIONS, timeout: float = REQUEST_TIMEOUT,
+                 retries: int = RETRIES, batch_pages: int = BATCH_PAGES,
+                 host_overrides: dict = None, dry_run: bool = False):
+        self.per_host = per_host
+        self.rate = rate
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retries = retries
+        self.batch_pages = batch_pages
+        self.host_overrides = host_overrides or {}  # netloc -> {"concurrency", "rate"}
+        self.dry_run = dry_run
+        self._limiters = {}
+        self.stats = {
+            "pages": 0, "fetched": 0, "not_modified": 0, "failed": 0,
+            "postings": 0, "duplicates": 0, "bytes": 0, "retries": 0,
+        }
+
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            override = self.host_overrides.get(host, {})
+            limiter = self._limiters[host] = HostLimiter(
+                override.get("concurrency", self.per_host), override.get("rate", self.rate)
+            )
+        return limiter
+
+    async def fetch_page(self, session, page: dict, validators: dict) -> dict:
+        """
+        GET one listing page, conditionally when we hold validators.
+        Returns the page dict with status, etag, last_modified, changed,
+        postings and error filled in.
+        """
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        result = dict(page, status=None, changed=False, postings=[], error=None, **validators)
+        for attempt in range(self.retries + 1):
+            delay = None
+            try:
+                async with self._limiter(page["url"]):
+                    async with session.get(page["url"], headers=headers) as response:
+                        result["status"] = response.status
+                        if response.status == 304:
+                            # Servers may refresh validators on a 304
+                            result["etag"] = response.headers.get("ETag", result.get("etag"))
+                            return result
+                        if response.status == 429 or response.status >= 500:
+                            delay = _retry_after(response)
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, (), status=response.status,
+                                message=response.reason or "",
+                            )
+                        response.raise_for_status()
+                        body = await response.read()
+                        content_type = response.headers.get("Content-Type", "")
+                        result["etag"] = response.headers.get("ETag")
+                        result["last_modified"] = response.headers.get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or (
+                    e.status == 429 or e.status >= 500
+                )
+                if not retryable or attempt == self.retries:
+                    result["error"] = f"{type(e).__name__}: {e}"
+                    return result
+                self.stats["retries"] += 1
+                backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                await asyncio.sleep(max(delay or 0.0, random.uniform(backoff / 2, backoff)))
+                continue
+
+            self.stats["bytes"] += len(body)
+            try:
+                text = _decode(body, response.charset)
+                result["postings"] = parse_listing(text, content_type, page["url"], page["source"])
+            except (ValueError, TypeError, LookupError) as e:
+                # Odd shapes fail this page only, not the whole run
+                result["error"] = f"unparseable page: {e}"
+                return result
+            result["changed"] = True
+            return result
+
+    def _write(self, results: list) -> int:
+        """Store one batch of fetched pages: postings and validators together."""
+        postings = [p for r in results if r["error"] is None for p in r["postings"]]
+        # Failed pages keep their old validators, so the next run refetches them
+        pages = [r for r in results if r["error"] is None]
+        with transaction():
+            upsert_job_postings_bulk(postings)
+            save_scrape_pages_bulk(pages)
+            # Near-duplicates are collapsed before the batch becomes visible
+            self.stats["duplicates"] += deduplicate_new_postings()["duplicates"]
+        return len(postings)
+
+    async def run(self, pages: list) -> dict:
+        """Fetch every page and store the results. Returns the stats dict."""
+        started = time.perf_counter()
+        validators = get_page_validators(p["url"] for p in pages)
+        loop = asyncio.get_running_loop()
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=max([self.per_host] + [
+                o.get("concurrency", 0) for o in self.host_overrides.values()
+            ]),
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        # SQLite writes run on one thread of their own, off the event loop
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape-writer")
+        writes = []
+        batch = []
+
+        def flush():
+            if batch and not self.dry_run:
+                writes.append(loop.run_in_executor(writer, self._write, list(batch)))
+            batch.clear()
+
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}
+            ) as session:
+                tasks = [
+                    asyncio.create_task(self.fetch_page(session, page, validators.get(page["url"], {})))
+                    for page in pages
+                ]
+                for task in asyncio.as_completed(tasks):
+                    result = await task
+                    self.stats["pages"] += 1
+                    if result["error"]:
+                        self.stats["failed"] += 1
+                        print(f"[job_scraper] Failed {result['url']}: {result['error']}")
+                    elif result["status"] == 304:
+                        self.stats["not_modified"] += 1
+                    else:
+                        self.stats["fetched"] += 1
+                        self.stats["postings"] += len(result["postings"])
+                    batch.append(result)
+                    if len(batch) >= self.batch_pages:
+                        flush()
+                flush()
+            await asyncio.gather(*writes)
+        finally:
+            writer.shutdown(wait=True)
+
+        self.stats["elapsed_s"] = time.perf_counter() - started
+        return self.stats
+
+
+def host_overrides_for(sources: list, pages: list) -> dict:
+    """Per-host concurrency/rate from the sources that set them."""
+    by_name = {s["name"]: s for s in sources}
+    overrides = {}
+    for page in pages:
+        source = by_name[page["source"]]
+        settings = {k: source[k] for k in ("concurrency", "rate") if k in source}
+        if settings:
+            overrides.setdefault(urlsplit(page["url"]).netloc, {}).update(settings)
+    return overrides
+
+
+def scrape(sources_path: str, **options) -> dict:
+    """Fetch every page of every source in sources_path and store the postings."""
+    init_db()
+    pages, sources = load_sources(sources_path)
+    scraper = JobScraper(host_overrides=host_overrides_for(sources, pages), **options)
+    return asyncio.run(scraper.run(pages))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape job listing pages into job_postings.")
+    parser.add_argument("sources", help="JSON file listing the sources to fetch")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY,
+                        help="requests in flight per host")
+    parser.add_argument("--rate", type=float, default=PER_HOST_RATE,
+                        help="request starts per second per host (0 = unlimited)")
+    parser.add_argument("--connections", type=int, default=MAX_CONNECTIONS,
+                        help="pooled connections across all hosts")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help="seconds allowed per request")
+    parser.add_argument("--dry-run", action="store_true", help="fetch and parse, store nothing")
+    args = parser.parse_args(argv)
+
+    stats = scrape(
+        args.sources,
+        per_host=args.per_host,
+        rate=args.rate,
+        max_connections=args.connections,
+        timeout=args.timeout,
+        dry_run=args.dry_run,
+    )
+    print(
+        f"\n{stats['pages']} pages in {stats['elapsed_s']:.1f}s "
+        f"({stats['pages'] / stats['elapsed_s']:.1f} pages/s)\n"
+        f"  fetched:      {stats['fetched']} ({stats['bytes'] / 1e6:.2f} MB)\n"
+        f"  not modified: {stats['not_modified']}\n"
+        f"  failed:       {stats['failed']} (after {stats['retries']} retries)\n"
+        f"  postings:     {stats['postings']} ({stats['duplicates']} new near-duplicates)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics
+
+# Tunables (environment overrides let ops size the pool without a deploy)
+BCRYPT_ROUNDS = int(os.environ.get("RESUME_APP_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.environ.get("RESUME_APP_HASH_WORKERS", "2"))
+HASH_MAX_QUEUE = int(os.environ.get("RESUME_APP_HASH_MAX_QUEUE", "16"))
+
+# Recent samples kept for the wait/hash-time percentiles
+METRIC_SAMPLES = 1000
+
+
+class HasherOverloaded(Exception):
+    """Raised instead of queueing when the hash pool is already full."""
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def hash_cost(password_hash: str) -> int:
+    """Return the bcrypt cost factor encoded in a hash ("$2b$12$...")."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small thread pool so a burst of logins cannot occupy
+    every core of the Streamlit process. bcrypt releases the GIL, so the
+    workers hash in parallel. At most workers + max_queue calls may be in
+    flight; beyond that callers get HasherOverloaded at once.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = HASH_WORKERS,
+                 max_queue: int = HASH_MAX_QUEUE):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._wait_times = deque(maxlen=METRIC_SAMPLES)
+        self._hash_times = deque(maxlen=METRIC_SAMPLES)
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def _run(self, fn, enqueued: float, args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._wait_times.append(started - enqueued)
+                self._hash_times.append(finished - started)
+                self.completed += 1
+
+    def _call(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherOverloaded("password hashing queue is full")
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(self._run, fn, time.perf_counter(), args)
+            return future.result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def hash_password(self, password: str) -> str:
+        """Hash a password at the current cost factor."""
+        import bcrypt  # deferred: only login/registration need it
+
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = self._call(bcrypt.hashpw, password.encode("utf-8"), salt)
+        return hashed.decode("utf-8")
+
+    def verify_password(self, password: str, password_hash: str) -> bool:
+        """Check a password against a stored bcrypt hash."""
+        import bcrypt
+
+        return self._call(
+            bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8")
+        )
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash was made with a different cost factor."""
+        return hash_cost(password_hash) != self.rounds
+
+    def stats(self) -> dict:
+        """Queue-wait and hash-time percentiles (seconds) plus counters."""
+        with self._lock:
+            waits = list(self._wait_times)
+            hashes = list(self._hash_times)
+            return {
+                "rounds": self.rounds,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "queue_wait_p50": _percentile(waits, 50),
+                "queue_wait_p95": _percentile(waits, 95),
+                "queue_wait_max": max(waits, default=0.0),
+                "hash_time_p50": _percentile(hashes, 50),
+                "hash_time_p95": _percentile(hashes, 95),
+            }
+
+
+# Shared by every Streamlit session in this process
+password_hasher = PasswordHasher()
+metrics.register_stats("password_hasher", password_hasher.stats,
+                       counters=("completed", "rejected"))
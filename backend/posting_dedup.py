@@ -0,0 +1,222 @@
+"""
+Near-duplicate detection for scraped job postings (MinHash + LSH).
+
+    python -m backend.posting_dedup            # sign every unsigned posting
+    python -m backend.posting_dedup --stats
+
+Each description is cut into overlapping word shingles, and the shingle
+hashes go through NUM_PERM random hash functions at once as one NumPy
+matrix; the minimum per function is the signature. Signatures agree on
+a position with probability equal to the Jaccard similarity of the
+shingle sets. Signatures are split into BANDS bands, and two postings
+only get compared when some band matches exactly, so a lookup costs one
+index probe per band no matter how many postings are stored.
+
+A posting whose estimated similarity to an existing canonical posting
+reaches DUPLICATE_THRESHOLD gets that posting as its canonical_id and is
+left out of job matching. Everything runs incrementally: only postings
+without a stored signature are processed, and they are compared against
+every canonical posting stored so far. A high-water mark on change_seq
+(migration 14) keeps each run from re-walking postings already signed.
+"""
+import argparse
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from utils.database import (
+    get_band_candidates,
+    get_connection,
+    get_dedup_mark,
+    get_unsigned_job_postings,
+    init_db,
+    save_dedup_mark,
+    save_posting_signatures,
+    transaction,
+)
+
+NUM_PERM = 128
+BANDS = 16                  # 8 rows per band: candidates from about 0.7 Jaccard
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.8   # estimated Jaccard at which postings are merged
+SEED = 1
+BATCH_SIZE = 500            # postings per read / write
+CHUNK_ELEMENTS = 4_000_000  # permutations x shingles computed at once (32 MB)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+WORD_RE = re.compile(r"[a-z0-9]+(?:[+#.][a-z0-9+#]+)*")
+
+# Multipliers for rolling SHINGLE_WORDS token hashes into one (odd, 64-bit)
+_SHINGLE_MIX = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5,
+     0x94D049BB133111EB][:SHINGLE_WORDS],
+    dtype=np.uint64,
+)
+
+_rng = np.random.RandomState(SEED)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """Distinct 32-bit hashes of the text's word shingles."""
+    words = WORD_RE.findall((text or "").lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+
+    tokens = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    if len(tokens) < SHINGLE_WORDS:
+        mixed = tokens * _SHINGLE_MIX[0]
+    else:
+        windows = np.lib.stride_tricks.sliding_window_view(tokens, SHINGLE_WORDS)
+        mixed = np.bitwise_xor.reduce(windows * _SHINGLE_MIX, axis=1)
+    return np.unique((mixed >> np.uint64(32)) ^ (mixed & MAX_HASH))
+
+
+def signatures(texts) -> np.ndarray:
+    """
+    MinHash signatures of many texts as a (len(texts), NUM_PERM) uint32
+    array. Texts without a single word get all-0xFFFFFFFF rows.
+    """
+    shingles = [shingle_hashes(text) for text in texts]
+    result = np.full((len(shingles), NUM_PERM), np.uint32(0xFFFFFFFF), dtype=np.uint32)
+
+    start = 0
+    while start < len(shingles):
+        # Group documents until the permutation matrix would get too big
+        end, size = start, 0
+        while end < len(shingles) and (end == start or (size + len(shingles[end])) * NUM_PERM <= CHUNK_ELEMENTS):
+            size += len(shingles[end])
+            end += 1
+
+        lengths = np.array([len(s) for s in shingles[start:end]])
+        present = np.flatnonzero(lengths)
+        if len(present):
+            values = np.concatenate([shingles[start + i] for i in present])
+            # (a * x + b) mod p, truncated to 32 bits; uint64 overflow wraps,
+            # which keeps the hash family universal enough for MinHash
+            permuted = ((_PERM_A[:, None] * values[None, :] + _PERM_B[:, None])
+                        % MERSENNE_PRIME) & MAX_HASH
+            offsets = np.concatenate(([0], np.cumsum(lengths[present])[:-1]))
+            result[start + present] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+
+    return result
+
+
+def band_keys(signature: np.ndarray) -> list:
+    """(band, bucket) pairs for one signature; buckets are signed 64-bit for SQLite."""
+    rows = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(rows[band].tobytes(), digest_size=8).digest(), "little", signed=True
+        ))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _posting_text(posting: dict) -> str:
+    # Descriptions carry the posting; very short ones fall back to the header
+    description = posting.get("description") or ""
+    if len(WORD_RE.findall(description.lower())) >= SHINGLE_WORDS:
+        return description
+    return " ".join(filter(None, [posting.get("title"), posting.get("company"), description]))
+
+
+def deduplicate_batch(postings: list) -> list:
+    """
+    Compare new postings against stored canonical ones and each other.
+    Returns save_posting_signatures rows, in input order.
+    """
+    sigs = signatures([_posting_text(p) for p in postings])
+    keys = [band_keys(sig) for sig in sigs]
+    stored = get_band_candidates({key for posting_keys in keys for key in posting_keys})
+
+    # Stored canonical postings plus this batch's new ones, by bucket
+    buckets = {}
+    known = {}
+    for pid, raw in stored.items():
+        known[pid] = np.frombuffer(raw, dtype=np.uint32)
+        for key in band_keys(known[pid]):
+            buckets.setdefault(key, []).append(pid)
+
+    rows = []
+    for posting, sig, posting_keys in zip(postings, sigs, keys):
+        canonical_id = None
+        empty = not (sig != 0xFFFFFFFF).any()
+        candidates = {pid for key in posting_keys for pid in buckets.get(key, ())}
+        candidates.discard(posting["id"])
+        if candidates and not empty:
+            ids = sorted(candidates)
+            scores = (np.stack([known[pid] for pid in ids]) == sig).mean(axis=1)
+            best = int(np.argmax(scores))
+            if scores[best] >= DUPLICATE_THRESHOLD:
+                canonical_id = ids[best]
+
+        rows.append((posting["id"], sig.tobytes(), canonical_id, posting_keys))
+        if canonical_id is None and not empty:
+            known[posting["id"]] = sig
+            for key in posting_keys:
+                buckets.setdefault(key, []).append(posting["id"])
+
+    return rows
+
+
+def deduplicate_new_postings(batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Sign and deduplicate every posting without a signature. Each batch
+    commits on its own (or joins the caller's transaction).
+    Returns {"checked", "duplicates"}.
+    """
+    summary = {"checked": 0, "duplicates": 0}
+    while True:
+        # Read, sign and move the mark under one write lock, so no posting
+        # can commit below the mark in between
+        with transaction():
+            postings = get_unsigned_job_postings(after_seq=get_dedup_mark(), limit=batch_size)
+            if not postings:
+                return summary
+            summary["duplicates"] += save_posting_signatures(deduplicate_batch(postings))
+            save_dedup_mark(postings[-1]["change_seq"])
+        summary["checked"] += len(postings)
+
+
+def dedup_stats() -> dict:
+    conn = get_connection()
+    total, duplicates = conn.execute(
+        "SELECT COUNT(*), COUNT(canonical_id) FROM job_postings"
+    ).fetchone()
+    signed = conn.execute("SELECT COUNT(*) FROM job_posting_signatures").fetchone()[0]
+    return {"postings": total, "duplicates": duplicates, "unsigned": total - signed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate job postings.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--stats", action="store_true", help="only report counts")
+    args = parser.parse_args(argv)
+
+    init_db()
+    if not args.stats:
+        summary = deduplicate_new_postings(batch_size=args.batch_size)
+        print(f"Checked {summary['checked']} postings, {summary['duplicates']} near-duplicates")
+
+    stats = dedup_stats()
+    print(
+        f"{stats['postings']} postings: {stats['postings'] - stats['duplicates']} canonical, "
+        f"{stats['duplicates']} duplicates, {stats['unsigned']} not checked yet"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Recompute stored analyses after the skill list or matching rules change.
+
+    python -m backend.reanalyze --workers 4 --batch-size 200
+    python -m backend.reanalyze --dry-run      # only count what is stale
+
+Works from the text already in text_blobs, never from the original files.
+A row is stale when its analyzer_version is not ANALYZER_VERSION, or when
+it has job_recommendations from another MATCHER_VERSION. Each batch is
+written in one transaction and stops being stale once written, so an
+interrupted run simply continues where it left off when started again.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from backend.job_matcher import MATCHER_VERSION, recommend_jobs, to_recommendation_row
+from backend.resume_analyzer import ANALYZER_VERSION, analysis_record, basic_resume_analysis
+from utils import database
+from utils.database import apply_reanalysis, count_stale_analyses, get_stale_analyses, init_db
+
+RECOMMENDATIONS_PER_ANALYSIS = 5  # same as the dashboard shows
+
+
+def _init_worker(db_path: str):
+    # Workers get Ctrl+C through the parent shutting the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    database.DB_PATH = Path(db_path)
+
+
+def reanalyze_batch(rows: list) -> dict:
+    """
+    Recompute one batch inside a worker process.
+    Returns {"results", "failed"}; results go to apply_reanalysis.
+    """
+    results, failed = [], []
+    computed = {}  # text_hash -> (record, recommendations); duplicates are common
+
+    for row in rows:
+        try:
+            if row["text_hash"] not in computed:
+                text = database.get_resume_text(row["text_hash"])
+                if text is None:
+                    raise LookupError(f"no stored text {row['text_hash']}")
+                analysis = basic_resume_analysis(text)
+                jobs = recommend_jobs(analysis, top_k=RECOMMENDATIONS_PER_ANALYSIS)
+                computed[row["text_hash"]] = (
+                    analysis_record(analysis),
+                    [to_recommendation_row(job) for job in jobs],
+                )
+            record, recommendations = computed[row["text_hash"]]
+        except Exception as e:
+            failed.append((row["id"], f"{type(e).__name__}: {e}"))
+            continue
+
+        results.append({
+            "id": row["id"],
+            "user_id": row["user_id"],
+            "analysis_scores": record["analysis_scores"],
+            "identified_skills": record["identified_skills"],
+            "analyzer_version": record["analyzer_version"],
+            # Rows that never had recommendations keep having none
+            "recommendations": recommendations if row["has_recommendations"] else None,
+        })
+
+    return {"results": results, "failed": failed}
+
+
+def reanalyze(workers: int = None, batch_size: int = 200) -> dict:
+    """
+    Bring every stale resume_analysis row up to the current versions.
+    Returns a summary dict (counts, rows/sec).
+    """
+    init_db()
+    started = time.perf_counter()
+    total = count_stale_analyses(ANALYZER_VERSION, MATCHER_VERSION)
+    workers = workers or os.cpu_count() or 1
+    print(
+        f"[reanalyze] {total} stale rows "
+        f"(analyzer v{ANALYZER_VERSION}, matcher v{MATCHER_VERSION})"
+    )
+
+    updated = 0
+    failures = []
+    after_id = 0
+    exhausted = False
+    pending = set()
+
+    # Spawned, not forked: a child must not inherit our open SQLite connection
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(database.DB_PATH),),
+    ) as pool:
+        while pending or not exhausted:
+            # Keep every worker busy with one batch and one queued behind it
+            while not exhausted and len(pending) < workers * 2:
+                rows = get_stale_analyses(
+                    ANALYZER_VERSION, MATCHER_VERSION, after_id=after_id, limit=batch_size
+                )
+                if not rows:
+                    exhausted = True
+                    break
+                # Keyset on id: rows that fail stay stale but are not retried this run
+                after_id = rows[-1]["id"]
+                pending.add(pool.submit(reanalyze_batch, rows))
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = future.result()
+                updated += apply_reanalysis(batch["results"], MATCHER_VERSION)
+                for row_id, error in batch["failed"]:
+                    print(f"[reanalyze] Failed row {row_id}: {error}")
+                failures += batch["failed"]
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"[reanalyze] {updated + len(failures)}/{total} rows "
+                    f"({updated / elapsed:.0f} rows/s)"
+                )
+
+    elapsed = time.perf_counter() - started
+    return {
+        "stale": total,
+        "updated": updated,
+        "failed": len(failures),
+        "elapsed_s": elapsed,
+        "rows_per_s": updated / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recompute analyses and recommendations made by older versions."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=200,
+                        help="rows per worker task and per write transaction")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report how many rows are stale")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        init_db()
+        stale = count_stale_analyses(ANALYZER_VERSION, MATCHER_VERSION)
+        print(
+            f"{stale} rows are stale "
+            f"(analyzer v{ANALYZER_VERSION}, matcher v{MATCHER_VERSION})"
+        )
+        return
+
+    summary = reanalyze(workers=args.workers, batch_size=args.batch_size)
+    print(
+        f"\nUpdated {summary['updated']} of {summary['stale']} stale rows in "
+        f"{summary['elapsed_s']:.1f}s ({summary['rows_per_s']:.0f} rows/s)\n"
+        f"  failed:  {summary['failed']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+
+from backend.skill_matcher import get_skill_matcher
+
+# Bump whenever the analysis output changes (skill list, scoring rules...);
+# stored analyses from older versions are recomputed by
+# `python -m backend.reanalyze`
+ANALYZER_VERSION = 3
+
+
+def basic_resume_analysis(text):
+    """Handle both string and (text, extra) tuple safely."""
+    if isinstance(text, tuple):
+        text = text[0]
+
+    if not text or not isinstance(text, str):
+        return {
+            "word_count": 0,
+            "skills": [],
+            "clean_text": "",
+            "analyzer_version": ANALYZER_VERSION,
+        }
+
+    words = text.split()
+    length = len(words)
+
+    skills = get_skill_matcher().extract(text)
+
+    return {
+        "word_count": length,
+        "skills": skills,
+        "clean_text": text,
+        "analyzer_version": ANALYZER_VERSION,
+    }
+
+
+def analysis_record(analysis: dict) -> dict:
+    """Map an analysis dict onto save_resume_analysis keyword arguments."""
+    return {
+        "extracted_text": analysis.get("clean_text", ""),
+        "analysis_scores": json.dumps({"word_count": analysis.get("word_count", 0)}),
+        "identified_skills": json.dumps(analysis.get("skills", [])),
+        "analyzer_version": analysis.get("analyzer_version", ANALYZER_VERSION),
+    }
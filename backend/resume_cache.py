@@ -0,0 +1,104 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from utils.database import get_resume_cache_entry, save_resume_cache_entry
+
+# Number of resumes kept in memory per process
+MEMORY_CACHE_SIZE = 64
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest used as the cache key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeCache:
+    """
+    Two-level cache for extracted resume text and analysis.
+    Level 1 is an in-process LRU, level 2 is the resume_cache table.
+    Entries are dicts: {"file_path", "text", "analysis"}.
+    """
+
+    def __init__(self, max_size: int = MEMORY_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, content_hash: str, entry: dict):
+        self._entries[content_hash] = entry
+        self._entries.move_to_end(content_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, content_hash: str):
+        """Return the cached entry for a hash, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+                self.memory_hits += 1
+                return entry
+
+        row = get_resume_cache_entry(content_hash)
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+
+            analysis = json.loads(row["analysis"]) if row["analysis"] else None
+            if analysis is not None:
+                analysis["clean_text"] = row["extracted_text"]
+
+            entry = {
+                "file_path": row["file_path"],
+                "text": row["extracted_text"],
+                "analysis": analysis,
+            }
+            self.disk_hits += 1
+            self._remember(content_hash, entry)
+            return entry
+
+    def put(self, content_hash: str, file_path: str, text: str, analysis: dict):
+        """Store text and analysis in both cache levels."""
+        self.store(content_hash, file_path, text, analysis)
+        return self.remember(content_hash, file_path, text, analysis)
+
+    def store(self, content_hash: str, file_path: str, text: str, analysis: dict):
+        """
+        Write the resume_cache row only. Inside a transaction, call
+        remember() once it has committed, so a rolled-back result is never
+        served from memory.
+        """
+        # clean_text duplicates the text column, so keep it out of the JSON
+        stored = {k: v for k, v in analysis.items() if k != "clean_text"}
+        save_resume_cache_entry(content_hash, file_path, text, json.dumps(stored))
+
+    def remember(self, content_hash: str, file_path: str, text: str, analysis: dict):
+        """Put an entry in the in-process LRU only. Returns the entry."""
+        entry = {"file_path": file_path, "text": text, "analysis": analysis}
+        with self._lock:
+            self._remember(content_hash, entry)
+        return entry
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for both cache levels."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_entries": len(self._entries),
+            }
+
+
+# Shared by every Streamlit session in this process
+resume_cache = ResumeCache()
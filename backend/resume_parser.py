@@ -1,40 +1,295 @@
+import math
+import multiprocessing
 import os
-from PyPDF2 import PdfReader
-import docx2txt
+import threading
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    TimeoutError as FutureTimeout,
+)
+from concurrent.futures.process import BrokenProcessPool
+from utils import metrics
+from utils.metrics import instrument
 
+# Extraction budgets; a resume that needs more than this is not a resume
+MAX_PAGES = 50
+MAX_CHARS = 200_000
+PAGE_TIMEOUT = 10.0  # seconds per PDF page
+MAX_STUCK_PAGES = 4  # timed-out pages still running before new PDFs are refused
 
-def extract_resume_text(file_path: str) -> str:
+# Page-parallel mode only pays off for long documents: below these sizes
+# the serial path is faster than shipping work to other processes.
+# The byte check is only a cheap pre-filter; the page count decides.
+PARALLEL_MIN_BYTES = 64 * 1024
+PARALLEL_MIN_PAGES = 30
+PARALLEL_WORKERS = min(8, os.cpu_count() or 1)
+CHUNKS_PER_WORKER = 2  # smaller chunks balance uneven page costs
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+_stuck_pages = 0                # timed-out page extractions still running
+_stuck_pages_lock = threading.Lock()
+
+
+# PyPDF2 and docx2txt are imported on first use, so pages that never
+# parse a resume do not pay for loading them.
+def _pdf_reader(f):
+    from PyPDF2 import PdfReader
+
+    return PdfReader(f)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _PageExtraction(threading.Thread):
     """
-    Extract plain text from a PDF or DOCX resume.
-    Returns a cleaned string (or empty string if nothing could be extracted).
+    Runs one page's extract_text. Daemon, so a page we gave up on can
+    neither block interpreter exit nor be waited for; it counts against
+    MAX_STUCK_PAGES until it finishes on its own.
     """
 
+    def __init__(self, page):
+        super().__init__(name="pdf-page", daemon=True)
+        self.page = page
+        self.text = None
+        self.error = None
+        self.abandoned = False
+        self.finished = False
+
+    def run(self):
+        try:
+            self.text = self.page.extract_text()
+        except Exception as e:
+            self.error = e
+        finally:
+            global _stuck_pages
+            with _stuck_pages_lock:
+                self.finished = True
+                if self.abandoned:
+                    _stuck_pages -= 1
+
+    def abandon(self) -> bool:
+        """Stop waiting for the page. False if it finished in the meantime."""
+        global _stuck_pages
+        with _stuck_pages_lock:
+            if self.finished:
+                return False
+            self.abandoned = True
+            _stuck_pages += 1
+            return True
+
+
+def _iter_pdf_pages(file_path: str, max_pages: int, page_timeout: float, first: int = 0):
+    """Yield raw page text from page `first` on, giving up on a page that exceeds page_timeout."""
+    # PyPDF2 cannot be interrupted, so each page runs on a helper thread
+    # and we simply stop waiting for it. A stuck page ends the document;
+    # it keeps a CPU busy until it finishes, so only MAX_STUCK_PAGES may
+    # be left running before new PDFs are refused.
+    if _stuck_pages >= MAX_STUCK_PAGES:
+        raise RuntimeError(
+            f"{MAX_STUCK_PAGES} timed-out PDF pages are still running; try again later"
+        )
+
+    with open(file_path, "rb") as f:
+        reader = _pdf_reader(f)
+        for number, page in enumerate(reader.pages):
+            if number < first:
+                continue
+            if max_pages is not None and number >= max_pages:
+                return
+
+            extraction = _PageExtraction(page)
+            extraction.start()
+            extraction.join(page_timeout)
+            if extraction.is_alive() and extraction.abandon():
+                print(
+                    f"[resume_parser] Page {number + 1} took longer than "
+                    f"{page_timeout}s, stopping extraction"
+                )
+                return
+            if extraction.error is not None:
+                raise extraction.error
+
+            yield extraction.text or ""
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> list:
+    """Worker: open the PDF independently and extract pages [start, stop)."""
+    with open(file_path, "rb") as f:
+        reader = _pdf_reader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _get_page_pool():
+    global _page_pool
+    if _page_pool is None:
+        with _page_pool_lock:
+            if _page_pool is None:
+                # spawn: forking a threaded Streamlit server is unsafe
+                _page_pool = ProcessPoolExecutor(
+                    max_workers=PARALLEL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _page_pool
+
+
+def _recycle_page_pool(pool):
+    """
+    Throw away a pool with a range stuck in it. cancel() cannot stop a
+    range that already started, so the workers are killed; the next
+    document gets a fresh pool. Documents still using the old pool see
+    BrokenProcessPool and finish serially.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _count_pdf_pages(file_path: str, max_pages: int) -> int:
+    with open(file_path, "rb") as f:
+        pages = len(_pdf_reader(f).pages)
+    return pages if max_pages is None else min(pages, max_pages)
+
+
+def _parallel_page_count(file_path: str, max_pages: int) -> int:
+    """Pages to extract in parallel, or 0 if the document is too short to pay off."""
+    if PARALLEL_WORKERS < 2 or os.path.getsize(file_path) < PARALLEL_MIN_BYTES:
+        return 0
+    pages = _count_pdf_pages(file_path, max_pages)
+    return pages if pages >= PARALLEL_MIN_PAGES else 0
+
+
+def _iter_pdf_pages_parallel(file_path: str, pages: int, page_timeout: float):
+    """Yield the first `pages` pages' raw text in order, extracting ranges in a process pool."""
+    if not pages:
+        return
+
+    chunk = math.ceil(pages / (PARALLEL_WORKERS * CHUNKS_PER_WORKER))
+    pool = _get_page_pool()
+    try:
+        futures = [
+            (start, pool.submit(_extract_page_range, file_path, start, min(start + chunk, pages)))
+            for start in range(0, pages, chunk)
+        ]
+    except (BrokenProcessPool, RuntimeError):
+        # The pool was recycled between _get_page_pool() and submit()
+        yield from _iter_pdf_pages(file_path, pages, page_timeout)
+        return
+
+    try:
+        for start, future in futures:
+            size = min(chunk, pages - start)
+            try:
+                texts = future.result(timeout=page_timeout * size)
+            except FutureTimeout:
+                print(
+                    f"[resume_parser] Pages {start + 1}-{start + size} took longer "
+                    f"than {page_timeout}s per page, stopping extraction"
+                )
+                _recycle_page_pool(pool)
+                return
+            except BrokenProcessPool:
+                # Recycled under us by another document's timeout
+                yield from _iter_pdf_pages(file_path, pages, page_timeout, first=start)
+                return
+            yield from texts
+    finally:
+        # Stopped early (budget reached or timeout): drop queued ranges
+        for _, future in futures:
+            future.cancel()
+
+
+def _iter_docx_blocks(file_path: str):
+    """Yield the paragraphs of a DOC/DOCX file."""
+    import docx2txt  # handles both docx and (some) doc
+
+    text = docx2txt.process(file_path) or ""
+    for block in text.split("\n"):
+        yield block
+
+
+def iter_resume_text(file_path: str,
+                     max_pages: int = MAX_PAGES,
+                     max_chars: int = MAX_CHARS,
+                     page_timeout: float = PAGE_TIMEOUT,
+                     parallel: bool = False):
+    """
+    Yield whitespace-normalized text from a PDF (page by page) or a
+    DOC/DOCX (paragraph by paragraph). Empty chunks are skipped.
+    Stops after max_pages PDF pages, once max_chars characters have been
+    yielded, or when a single page takes longer than page_timeout. Raises
+    RuntimeError while MAX_STUCK_PAGES timed-out pages are still running.
+    parallel: True extracts PDF pages in a process pool, None lets the
+    file size and page count decide, False (the default) stays serial.
+    Unsupported formats yield nothing; read errors propagate.
+    """
     ext = os.path.splitext(file_path)[1].lower()
-    text = ""
 
+    if ext == ".pdf":
+        if parallel is None:
+            pages = _parallel_page_count(file_path, max_pages)
+        elif parallel:
+            pages = _count_pdf_pages(file_path, max_pages)
+        else:
+            pages = 0
+        if pages:
+            chunks = _iter_pdf_pages_parallel(file_path, pages, page_timeout)
+        else:
+            chunks = _iter_pdf_pages(file_path, max_pages, page_timeout)
+    elif ext in [".doc", ".docx"]:
+        chunks = _iter_docx_blocks(file_path)
+    else:
+        return
+
+    remaining = max_chars
+    pages = 0
     try:
-        #PDF
+        for raw in chunks:
+            pages += 1
+            chunk = _normalize(raw)
+            if not chunk:
+                continue
+
+            if remaining is not None:
+                if len(chunk) >= remaining:
+                    yield chunk[:remaining]
+                    return
+                remaining -= len(chunk) + 1  # joining space
+
+            yield chunk
+            if remaining is not None and remaining <= 0:
+                return
+    finally:
         if ext == ".pdf":
-            with open(file_path, "rb") as f:
-                reader = PdfReader(f)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-
-        #DOC / DOCX
-        elif ext in [".doc", ".docx"]:
-            # docx2txt handles both docx and (some) doc
-            text = docx2txt.process(file_path) or ""
-
-        #Unsupported format
-        else:
-            return ""
+            metrics.add("parser_pdf_pages", pages)
 
+
+@instrument()
+def extract_resume_text(file_path: str, parallel: bool = False,
+                        raise_errors: bool = False) -> str:
+    """
+    Extract plain text from a PDF or DOCX resume.
+    Returns a cleaned string (or empty string if nothing could be extracted).
+    With raise_errors, read/parse errors propagate instead (used by the
+    analysis worker so a broken file is retried and then dead-lettered).
+    """
+    try:
+        text = " ".join(iter_resume_text(file_path, parallel=parallel))
     except Exception as e:
         # For debugging in the terminal if something goes wrong
         print(f"[resume_parser] Error while extracting text: {e}")
+        metrics.add("parser_errors")
+        if raise_errors:
+            raise
         return ""
 
-    text = " ".join(text.split())
-    return text
\ No newline at end of file
+    if metrics.ENABLED:
+        metrics.add("parser_bytes", os.path.getsize(file_path))
+        metrics.add("parser_chars", len(text))
+    return text
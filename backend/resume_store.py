@@ -0,0 +1,175 @@
+"""
+Content-addressed storage for uploaded resumes.
+
+    data/resumes/ab/cd/abcd1234...<64 hex>.pdf
+
+Uploads are streamed to a temp file in fixed-size chunks while being
+hashed, then moved into place under their SHA-256, so identical files are
+stored once. Users point at their file through users.resume_path.
+
+    python -m backend.resume_store gc [--dry-run] [--grace 3600]
+
+deletes stored files that nothing references any more.
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from utils.database import get_referenced_resume_paths, init_db, update_user_resume_path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STORE_DIR = BASE_DIR / "data" / "resumes"
+CHUNK_SIZE = 1024 * 1024
+TMP_DIR_NAME = ".incoming"
+GC_GRACE_SECONDS = 3600  # uploads not linked to a user yet are left alone
+
+# First bytes of each format; the sniffed type beats the uploaded name
+SIGNATURES = [
+    (b"%PDF-", ".pdf"),
+    (b"PK\x03\x04", ".docx"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc"),
+]
+EXTENSIONS = {ext for _, ext in SIGNATURES}
+
+
+def detect_extension(head: bytes, filename: str = "") -> str:
+    """Return the resume extension for a file's first bytes (or its name)."""
+    for signature, ext in SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if ext in EXTENSIONS else ".pdf"
+
+
+def path_for(content_hash: str, ext: str) -> Path:
+    """Sharded location of a stored file: <store>/ab/cd/<hash><ext>."""
+    return STORE_DIR / content_hash[:2] / content_hash[2:4] / f"{content_hash}{ext}"
+
+
+def to_stored_path(path) -> str:
+    """Path relative to the project root, as kept in the database."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def resolve(stored_path: str) -> Path:
+    """Absolute path for a value from users.resume_path / resume_cache."""
+    path = Path(stored_path)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def store_upload(fileobj, filename: str = "") -> tuple:
+    """
+    Stream a file-like object into the store.
+    Returns (content_hash, absolute path). Storing identical content
+    twice returns the existing file.
+    """
+    incoming = STORE_DIR / TMP_DIR_NAME
+    incoming.mkdir(parents=True, exist_ok=True)
+
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+
+    digest = hashlib.sha256()
+    head = b""
+    fd, tmp_path = tempfile.mkstemp(dir=incoming, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                if not head:
+                    head = chunk[:16]
+                digest.update(chunk)
+                out.write(chunk)
+
+        content_hash = digest.hexdigest()
+        final = path_for(content_hash, detect_extension(head, filename))
+        if final.exists():
+            os.unlink(tmp_path)
+            os.utime(final)  # restart the GC grace period for the re-upload
+        else:
+            final.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, final)  # atomic: readers never see a partial file
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return content_hash, final
+
+
+def link_to_user(user_id: int, path) -> str:
+    """Record a stored file as the user's current resume. Returns the stored path."""
+    stored = to_stored_path(path)
+    update_user_resume_path(user_id, stored)
+    return stored
+
+
+def collect_garbage(grace_seconds: float = GC_GRACE_SECONDS, dry_run: bool = False) -> dict:
+    """
+    Delete stored files that no user or cache entry references, and
+    abandoned partial uploads, skipping anything modified in the last
+    grace_seconds. Files outside the sharded layout (older flat uploads)
+    are never touched. Returns {"kept", "deleted", "bytes_freed"}.
+    """
+    referenced = {resolve(p).resolve() for p in get_referenced_resume_paths()}
+    cutoff = time.time() - grace_seconds
+    summary = {"kept": 0, "deleted": 0, "bytes_freed": 0}
+
+    if not STORE_DIR.exists():
+        return summary
+
+    candidates = list(STORE_DIR.glob("[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]/*"))
+    candidates += (STORE_DIR / TMP_DIR_NAME).glob("*.part")
+
+    for path in sorted(candidates):
+        if not path.is_file():
+            continue
+        stat = path.stat()
+        if path.resolve() in referenced or stat.st_mtime > cutoff:
+            summary["kept"] += 1
+            continue
+
+        summary["deleted"] += 1
+        summary["bytes_freed"] += stat.st_size
+        if not dry_run:
+            path.unlink()
+
+    if not dry_run:
+        # Inner shards first, so emptied outer ones go too
+        shards = list(STORE_DIR.glob("[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]"))
+        shards += STORE_DIR.glob("[0-9a-f][0-9a-f]")
+        for directory in shards:
+            try:
+                directory.rmdir()
+            except OSError:
+                pass  # not empty
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the resume file store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gc = sub.add_parser("gc", help="delete stored files nothing references")
+    gc.add_argument("--dry-run", action="store_true", help="only report what would go")
+    gc.add_argument("--grace", type=float, default=GC_GRACE_SECONDS,
+                    help="keep files younger than this many seconds")
+    args = parser.parse_args(argv)
+
+    init_db()
+    summary = collect_garbage(grace_seconds=args.grace, dry_run=args.dry_run)
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(
+        f"{verb} {summary['deleted']} files ({summary['bytes_freed'] / 1e6:.1f} MB), "
+        f"kept {summary['kept']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Model-free semantic matching: hashed n-gram vectors and an IVF index.
+
+    python -m backend.semantic_index build       # jobs (catalog + job_postings)
+    python -m backend.semantic_index build --resumes
+    python -m backend.semantic_index query "data pipelines in python" --exact
+
+Every text becomes a DIM-dimensional vector of signed, hashed character
+3-5-grams (log-scaled, L2-normalised). Character n-grams match across
+inflections and compounds ("analyse"/"analysis", "postgres"/"postgresql")
+that whole-word TF-IDF treats as different terms; n-grams spanning a
+space carry some word order too.
+
+Vectors live in a float32 file opened with np.memmap, stored grouped by
+inverted list: k-means centroids split the collection into NLIST lists,
+and a query only scans the NPROBE lists whose centroids are closest.
+exact=True scans everything instead, which is what recall is measured
+against. The index subtracts the collection's mean vector from rows and
+queries alike: boilerplate every posting shares ("responsible for",
+"team") otherwise dominates the similarity and the lists.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+INDEX_DIR = BASE_DIR / "data" / "semantic"
+
+DIM = 512
+NGRAM_SIZES = (3, 4, 5)
+NPROBE = 16                   # lists scanned per query
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 64            # training rows per list
+CHUNK_ROWS = 65_536           # rows per matrix product while building / exact search
+INDEX_VERSION = 2
+
+_BYTE_MIX = np.uint64(0x100000001B3)     # FNV-1a prime, for rolling the n-gram bytes
+_FINAL_MIX = np.uint64(0x9E3779B97F4A7C15)
+_NON_WORD = bytes(range(256)).translate(
+    bytes(c if c >= 128 or chr(c).isalnum() or chr(c) in "+#" else 32 for c in range(256))
+)
+
+
+def _ngram_hashes(text: str) -> np.ndarray:
+    """64-bit hashes of every character n-gram of the normalised text."""
+    raw = (text or "").lower().encode("utf-8", errors="ignore").translate(_NON_WORD)
+    data = np.frombuffer(b" " + b" ".join(raw.split()) + b" ", dtype=np.uint8).astype(np.uint64)
+
+    hashes = []
+    for n in NGRAM_SIZES:
+        if len(data) < n:
+            continue
+        windows = np.lib.stride_tricks.sliding_window_view(data, n)
+        h = np.full(len(windows), np.uint64(n), dtype=np.uint64)
+        for column in range(n):
+            h = (h ^ windows[:, column]) * _BYTE_MIX
+        hashes.append(h * _FINAL_MIX)
+    return np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+
+
+def vectorize(texts) -> np.ndarray:
+    """(len(texts), DIM) float32 unit vectors; empty texts give zero rows."""
+    texts = list(texts)
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        h = _ngram_hashes(text)
+        if not len(h):
+            continue
+        # High bits pick the dimension, the next bit the sign
+        buckets = (h >> np.uint64(40)) % np.uint64(DIM)
+        signs = ((h >> np.uint64(39)) & np.uint64(1)).astype(np.float32) * 2 - 1
+        v = np.bincount(buckets.astype(np.int64), weights=signs, minlength=DIM)
+        v = np.sign(v) * np.log1p(np.abs(v))
+        norm = np.linalg.norm(v)
+        if norm:
+            out[row] = v / norm
+    return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(scores, -k)[-k:]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+def _center(vectors: np.ndarray, mean: np.ndarray) -> np.ndarray:
+    """Subtract the collection mean and re-normalise (zero rows stay zero)."""
+    centered = np.asarray(vectors, dtype=np.float32) - mean
+    norms = np.linalg.norm(centered, axis=-1, keepdims=True)
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+
+
+def _kmeans(sample: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit vectors. Returns (nlist, DIM) unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty lists from random rows rather than losing them
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = (sums / norms[:, None]).astype(np.float32)
+    return centroids
+
+
+class VectorIndex:
+    """
+    An IVF index over unit vectors in one directory:
+
+        vectors.f32     centered rows grouped by list (memory-mapped, read-only)
+        ids.npy         caller's id for each row, same order
+        mean.npy        collection mean, subtracted from rows and queries
+        centroids.npy   one unit vector per list
+        offsets.npy     list l is rows offsets[l]:offsets[l + 1]
+        meta.json
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != INDEX_VERSION or self.meta["dim"] != DIM:
+            raise ValueError(f"{self.directory} was built by another version; rebuild it")
+
+        count = self.meta["count"]
+        self.vectors = np.memmap(
+            self.directory / "vectors.f32", dtype=np.float32, mode="r", shape=(count, DIM)
+        ) if count else np.zeros((0, DIM), dtype=np.float32)
+        self.ids = np.load(self.directory / "ids.npy")
+        self.mean = np.load(self.directory / "mean.npy")
+        self.centroids = np.load(self.directory / "centroids.npy")
+        self.offsets = np.load(self.directory / "offsets.npy")
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, directory, chunks, nlist: int = None, seed: int = 0,
+              extra_files: dict = None) -> "VectorIndex":
+        """
+        Write an index from an iterable of (ids, vectors) chunks, replacing
+        whatever is in directory. extra_files ({name: JSON-able value}) are
+        written alongside and swapped in with it. Memory use is bounded by
+        the chunk size and the k-means sample, not the collection.
+        """
+        directory = Path(directory)
+        staging = directory.with_name(directory.name + ".building")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        # 1. Spill rows in arrival order
+        raw_path = staging / "arrival.f32"
+        all_ids = []
+        count = 0
+        total = np.zeros(DIM, dtype=np.float64)
+        with open(raw_path, "wb") as raw:
+            for ids, vectors in chunks:
+                vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+                raw.write(vectors.tobytes())
+                all_ids.append(np.asarray(ids))
+                total += vectors.sum(axis=0)
+                count += len(vectors)
+        ids = np.concatenate(all_ids) if all_ids else np.zeros(0, dtype=np.int64)
+        mean = (total / max(count, 1)).astype(np.float32)
+
+        nlist = max(1, min(nlist or int(math.sqrt(count)) or 1, count or 1))
+        centroids = np.zeros((nlist, DIM), dtype=np.float32)
+        assign = np.zeros(count, dtype=np.int64)
+
+        if count:
+            arrival = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(count, DIM))
+
+            # 2. Train centroids on a sample, 3. assign every row to a list
+            rng = np.random.default_rng(seed)
+            sample_size = min(count, nlist * KMEANS_SAMPLE)
+            sample = _center(arrival[np.sort(rng.choice(count, sample_size, replace=False))], mean)
+            centroids = _kmeans(sample, nlist, seed)
+            for start in range(0, count, CHUNK_ROWS):
+                block = _center(arrival[start:start + CHUNK_ROWS], mean)
+                assign[start:start + CHUNK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+
+            # 4. Rewrite grouped by list so each list is one contiguous slice
+            order = np.argsort(assign, kind="stable")
+            grouped = np.memmap(staging / "vectors.f32", dtype=np.float32, mode="w+", shape=(count, DIM))
+            for start in range(0, count, CHUNK_ROWS):
+                rows = order[start:start + CHUNK_ROWS]
+                block = _center(arrival[np.sort(rows)], mean)
+                grouped[start:start + len(rows)] = block[np.argsort(np.argsort(rows))]
+            grouped.flush()
+            del grouped, arrival
+            ids = ids[order]
+        else:
+            open(staging / "vectors.f32", "wb").close()
+
+        os.unlink(raw_path)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        np.save(staging / "ids.npy", ids)
+        np.save(staging / "mean.npy", mean)
+        np.save(staging / "centroids.npy", centroids)
+        np.save(staging / "offsets.npy", offsets)
+        for name, value in (extra_files or {}).items():
+            with open(staging / name, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+        # meta.json last: its presence means the rest is complete
+        with open(staging / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "dim": DIM, "count": int(count),
+                       "nlist": nlist, "build_id": uuid.uuid4().hex}, f)
+
+        # Swap in whole, so readers never see a half-written index or one
+        # directory's files next to another's: the old directory is renamed
+        # aside (open memmaps keep working) and only then removed
+        retired = directory.with_name(directory.name + ".old")
+        shutil.rmtree(retired, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, retired)
+        os.replace(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+        return cls(directory)
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = NPROBE,
+               exact: bool = False) -> tuple:
+        """
+        The k rows most similar (cosine, after centering) to one query
+        vector. Returns (ids, scores), best first.
+        """
+        if not len(self.ids):
+            return self.ids[:0], np.zeros(0, dtype=np.float32)
+        query = _center(query, self.mean)
+
+        if exact:
+            scores = np.empty(len(self.ids), dtype=np.float32)
+            for start in range(0, len(self.ids), CHUNK_ROWS):
+                scores[start:start + CHUNK_ROWS] = self.vectors[start:start + CHUNK_ROWS] @ query
+            best = _top_k(scores, k)
+            return self.ids[best], scores[best]
+
+        lists = _top_k(self.centroids @ query, nprobe)
+        rows, scores = [], []
+        for l in lists:
+            start, end = self.offsets[l], self.offsets[l + 1]
+            if end > start:
+                rows.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ query)
+        if not rows:
+            return self.ids[:0], np.zeros(0, dtype=np.float32)
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        best = _top_k(scores, k)
+        return self.ids[rows[best]], scores[best]
+
+
+# ---------------- jobs and resumes ----------------
+
+def _job_chunks(postings, chunk_size: int = 2048):
+    for start in range(0, len(postings), chunk_size):
+        chunk = postings[start:start + chunk_size]
+        texts = [" ".join([p.get("title") or "", " ".join(p.get("tags") or []), p.get("description") or ""])
+                 for p in chunk]
+        yield np.arange(start, start + len(chunk)), vectorize(texts)
+
+
+def build_job_index(directory=INDEX_DIR / "jobs") -> VectorIndex:
+    """Index the catalog plus canonical job_postings; ids are positions in jobs.json."""
+    from backend.job_matcher import load_catalog
+    from utils.database import init_db, iter_job_postings
+
+    init_db()
+    postings = load_catalog() + list(iter_job_postings())
+    fields = ("title", "company", "location", "tags", "url")
+    jobs = [{key: p.get(key) for key in fields} for p in postings]
+    return VectorIndex.build(directory, _job_chunks(postings), extra_files={"jobs.json": jobs})
+
+
+def build_resume_index(directory=INDEX_DIR / "resumes", chunk_size: int = 2048) -> VectorIndex:
+    """Index every stored resume text; ids are text_blobs ids."""
+    from utils.database import get_connection, init_db
+    from utils.text_blobs import decompress_text
+
+    init_db()
+
+    def chunks():
+        last_id = 0
+        while True:
+            rows = get_connection().execute(
+                "SELECT id, codec, data FROM text_blobs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            yield (np.array([row["id"] for row in rows]),
+                   vectorize(decompress_text(row["codec"], row["data"]) for row in rows))
+
+    return VectorIndex.build(directory, chunks())
+
+
+_job_index = None               # (meta.json signature, index, postings)
+_job_index_lock = threading.Lock()
+
+
+def _meta_signature(directory: Path):
+    try:
+        st = os.stat(directory / "meta.json")
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def get_job_index(directory=INDEX_DIR / "jobs"):
+    """
+    The built job index and its postings, or (None, None) if not built
+    yet or built by an incompatible version. A rebuild (new meta.json) is
+    picked up on the next call.
+    """
+    global _job_index
+    directory = Path(directory)
+    signature = _meta_signature(directory)
+    current = _job_index
+    if signature is None or (current is not None and current[0] == signature):
+        # Mid-swap or never built: keep serving what is loaded, if anything
+        return current[1:] if current is not None else (None, None)
+
+    with _job_index_lock:
+        if _job_index is not None and _job_index[0] == signature:
+            return _job_index[1:]
+        for _ in range(3):
+            try:
+                index = VectorIndex(directory)
+                with open(directory / "jobs.json", encoding="utf-8") as f:
+                    postings = json.load(f)
+            except FileNotFoundError:
+                index = None
+            except ValueError as e:
+                # Another version's format: no semantic matches until a rebuild,
+                # and this build is not read (or reported) again
+                print(f"[semantic_index] Ignoring index at {directory}: {e}")
+                _job_index = (signature, None, None)
+                break
+            # Files from two builds if a swap landed while loading: try again
+            after = _meta_signature(directory)
+            if index is not None and after == signature:
+                _job_index = (signature, index, postings)
+                break
+            signature = after
+            if signature is None:
+                break
+    return _job_index[1:] if _job_index is not None else (None, None)
+
+
+def semantic_recommend_jobs(analysis: dict, top_k: int = 5, exact: bool = False) -> list:
+    """
+    Postings closest to a resume in n-gram space, as posting dicts with
+    match_percentage added. Empty until the index has been built.
+    """
+    index, postings = get_job_index()
+    if index is None or not analysis.get("clean_text"):
+        return []
+    query = vectorize([analysis["clean_text"] + " " + " ".join(analysis.get("skills", []))])[0]
+    ids, scores = index.search(query, k=top_k, exact=exact)
+    results = []
+    for i, score in zip(ids, scores):
+        job = dict(postings[int(i)])
+        job["match_percentage"] = round(max(float(score), 0.0) * 100, 1)
+        results.append(job)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the semantic job/resume index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="(re)build an index from the database")
+    build.add_argument("--resumes", action="store_true", help="index resume texts instead of jobs")
+    query = sub.add_parser("query", help="top jobs for a piece of text")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--exact", action="store_true", help="scan every vector")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = build_resume_index() if args.resumes else build_job_index()
+        print(f"Indexed {len(index)} vectors in {index.meta['nlist']} lists at {index.directory}")
+        return
+
+    for job in semantic_recommend_jobs({"clean_text": args.text}, top_k=args.k, exact=args.exact):
+        print(f"{job['match_percentage']:5.1f}  {job['title']} · {job.get('company') or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import threading
+from collections import deque
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SKILLS_PATH = BASE_DIR / "data" / "skills.txt"
+
+# Characters that are part of a skill token: "c++", "c#" and "node.js"
+# must not be split into "c" or "js"
+WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789+#")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace; used for both aliases and resumes."""
+    return " ".join(text.lower().split())
+
+
+def load_taxonomy(path=SKILLS_PATH) -> dict:
+    """
+    Read the skill taxonomy file.
+    Returns {alias: canonical skill}, where every canonical name is also an alias.
+    """
+    taxonomy = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            names = [normalize(name) for name in line.split("|")]
+            names = [name for name in names if name]
+            if not names:
+                continue
+
+            canonical = names[0]
+            for name in names:
+                taxonomy.setdefault(name, canonical)
+
+    return taxonomy
+
+
+def _is_boundary(text: str, i: int) -> bool:
+    """True if position i (just outside a match) does not continue a word."""
+    if i < 0 or i >= len(text):
+        return True
+    ch = text[i]
+    if ch in WORD_CHARS:
+        return False
+    if ch == ".":
+        # "node.js" / "asp.net": a dot between letters joins the token
+        before = text[i - 1] if i > 0 else " "
+        after = text[i + 1] if i + 1 < len(text) else " "
+        return not (before in WORD_CHARS and after in WORD_CHARS)
+    return True
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every alias in the taxonomy.
+    One pass over the text finds all alias occurrences; word-boundary and
+    overlap filtering then keep the leftmost-longest whole-word matches.
+    """
+
+    def __init__(self, taxonomy: dict):
+        self.canonical_names = sorted(set(taxonomy.values()))
+        canonical_ids = {name: i for i, name in enumerate(self.canonical_names)}
+
+        # state -> {char: next state}; state 0 is the root
+        self._goto = [{}]
+        self._fail = [0]
+        # state -> tuple of (alias length, canonical id) ending at that state
+        self._out = [()]
+
+        for alias, canonical in taxonomy.items():
+            self._add(alias, canonical_ids[canonical])
+
+        self._build_failure_links()
+
+    def _add(self, alias: str, canonical_id: int):
+        state = 0
+        for ch in alias:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + ((len(alias), canonical_id),)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+
+                # Inherit matches that end here via the suffix link
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> list:
+        """
+        Return whole-word matches as (start, end, canonical) tuples in text
+        order. `text` must already be normalized.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for length, canonical_id in out[state]:
+                start = i - length + 1
+                if _is_boundary(text, start - 1) and _is_boundary(text, i + 1):
+                    candidates.append((start, i + 1, canonical_id))
+
+        # Leftmost-longest: "react native" wins over "react" at the same spot
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        matches = []
+        last_end = -1
+        for start, end, canonical_id in candidates:
+            if start >= last_end:
+                matches.append((start, end, self.canonical_names[canonical_id]))
+                last_end = end
+
+        return matches
+
+    def extract(self, text: str) -> list:
+        """Return canonical skills found in text, in order of first appearance."""
+        seen = {}
+        for _, _, canonical in self.find(normalize(text)):
+            seen.setdefault(canonical, None)
+        return list(seen)
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Return the process-wide matcher, compiling the taxonomy on first use."""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_lock:
+            if _default_matcher is None:
+                _default_matcher = SkillMatcher(load_taxonomy())
+    return _default_matcher
@@ -0,0 +1,78 @@
+"""
+Benchmark suite for the resume app's hot paths.
+
+    python -m benchmarks run --out bench/base.json
+    python -m benchmarks run --quick --only db.
+    python -m benchmarks compare bench/base.json bench/new.json
+
+Runs offline against a temporary database and a synthetic corpus that is
+fully determined by --seed. `compare` exits with status 1 when any
+benchmark regressed by more than --threshold.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks.harness import compare, load_results, save_results
+from benchmarks.suite import run_suite
+
+
+def cmd_run(args):
+    config, results = run_suite(seed=args.seed, quick=args.quick, only=args.only)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        save_results(args.out, config, results)
+        print(f"\nSaved {len(results)} results to {args.out}")
+    return 0
+
+
+def cmd_compare(args):
+    rows = compare(load_results(args.old), load_results(args.new),
+                   metric=args.metric, threshold=args.threshold)
+
+    regressions = 0
+    print(f"{'benchmark':45s} {'old':>11s} {'new':>11s} {'change':>8s}")
+    for name, before, after, change in rows:
+        if change is None:
+            before = "-" if before is None else f"{before:.3f}"
+            after = "-" if after is None else f"{after:.3f}"
+            print(f"{name:45s} {before:>11s} {after:>11s}   (only in one file)")
+            continue
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:45s} {before:11.3f} {after:11.3f} {change:+8.1%}{flag}")
+
+    print(f"\n{regressions} regression(s) above {args.threshold:.0%} on {args.metric}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Resume app benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the suite")
+    run.add_argument("--out", help="write results as JSON to this file")
+    run.add_argument("--seed", type=int, default=1234)
+    run.add_argument("--quick", action="store_true", help="fewer runs, smaller data")
+    run.add_argument("--only", help="only benchmarks whose name contains this")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="diff two result files")
+    cmp_.add_argument("old")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--metric", default="p50_ms")
+    cmp_.add_argument("--threshold", type=float, default=0.10,
+                      help="fractional slowdown that counts as a regression")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
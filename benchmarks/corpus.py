@@ -0,0 +1,200 @@
+"""
+Deterministic synthetic data for the benchmarks: resume text, PDF and
+DOCX files, users and job postings. The same seed always produces the
+same bytes, so two benchmark runs measure the same work.
+
+PDF and DOCX files are written by hand (no reportlab / python-docx), so
+the generator runs on a plain Linux box with only the app's own deps.
+"""
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from backend.skill_matcher import load_taxonomy
+
+FILLER = (
+    "responsible for designing building testing and maintaining features "
+    "collaborated with cross team members to deliver projects on time "
+    "improved performance reliability and user experience across modules "
+    "led initiatives mentored interns documented processes and reviewed code "
+    "analysed requirements gathered feedback and presented results to managers "
+    "university coursework included projects in several domains and a thesis "
+    "volunteered organised events and participated in hackathons and workshops"
+).split()
+
+SECTIONS = ["SUMMARY", "EXPERIENCE", "PROJECTS", "EDUCATION", "SKILLS", "CERTIFICATIONS"]
+
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "Arjun", "Divya", "Kiran", "Neha", "Vikram",
+               "Sana", "Rahul", "Priya", "Anil", "Lakshmi", "Suresh", "Fatima", "John"]
+LAST_NAMES = ["Rao", "Sharma", "Reddy", "Iyer", "Khan", "Patel", "Naidu", "Das",
+              "Singh", "Menon", "Gupta", "Varma", "Joseph", "Kumar", "Bose", "Nair"]
+
+# PDF layout
+LINE_CHARS = 90
+LINES_PER_PAGE = 55
+
+
+def skill_vocabulary() -> list:
+    """Canonical skill names from the taxonomy, in a stable order."""
+    return sorted(set(load_taxonomy().values()))
+
+
+def resume_text(rng: random.Random, words: int = 600, skill_density: float = 0.05,
+                skills: list = None) -> str:
+    """
+    Build resume-like text of roughly `words` words where about
+    `skill_density` of the tokens are skill names.
+    """
+    skills = skills if skills is not None else skill_vocabulary()
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    out = [name.upper(), f"{name.lower().replace(' ', '.')}@example.com"]
+
+    per_section = max(1, words // len(SECTIONS))
+    for section in SECTIONS:
+        out.append(section)
+        for _ in range(per_section):
+            if rng.random() < skill_density:
+                out.append(rng.choice(skills))
+            else:
+                out.append(rng.choice(FILLER))
+    return " ".join(out)
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int) -> list:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def write_pdf(path: str, text: str):
+    """Write text as a minimal multi-page PDF (Helvetica, one text stream per page)."""
+    lines = _wrap(text, LINE_CHARS) or [""]
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects = {}
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+
+        body = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        for line in page_lines:
+            body.append(f"({_pdf_escape(line)}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1")
+
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1")
+            + stream
+            + b"\nendstream"
+        )
+
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    ).encode("latin-1")
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n".encode("latin-1") + objects[number] + b"\nendobj\n"
+
+    xref_at = len(out)
+    count = max(objects) + 1
+    out += f"xref\n0 {count}\n0000000000 65535 f \n".encode("latin-1")
+    for number in range(1, count):
+        out += f"{offsets[number]:010d} 00000 n \n".encode("latin-1")
+    out += (
+        f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+    ).encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+
+def write_docx(path: str, text: str):
+    """Write text as a minimal DOCX, one paragraph per wrapped line."""
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+        for line in _wrap(text, LINE_CHARS)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+
+    # Fixed timestamps keep the archive bytes identical across runs
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in [
+            ("[Content_Types].xml", _CONTENT_TYPES),
+            ("_rels/.rels", _RELS),
+            ("word/document.xml", document),
+        ]:
+            z.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data)
+
+
+def synthetic_users(rng: random.Random, n: int) -> list:
+    """Return n (full_name, email) pairs with unique emails."""
+    users = []
+    for i in range(n):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        users.append((f"{first} {last}", f"{first}.{last}.{i}@example.com".lower()))
+    return users
+
+
+def synthetic_jobs(rng: random.Random, n: int, skills: list = None) -> list:
+    """Return n job posting dicts shaped like data/job_catalog.json."""
+    skills = skills if skills is not None else skill_vocabulary()
+    jobs = []
+    for i in range(n):
+        tags = rng.sample(skills, 3)
+        body = [rng.choice(FILLER) for _ in range(40)] + rng.sample(skills, 8)
+        rng.shuffle(body)
+        jobs.append({
+            "title": f"{tags[0].title()} Engineer {i}",
+            "company": f"{rng.choice(LAST_NAMES)} Labs",
+            "location": rng.choice(["Bengaluru", "Hyderabad", "Pune", "Remote"]),
+            "tags": tags,
+            "description": " ".join(body),
+            "url": f"https://jobs.example.com/synthetic/{i}",
+        })
+    return jobs
@@ -0,0 +1,107 @@
+"""Timing, percentile and result-file helpers shared by the benchmarks."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+
+def percentile(values, pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(samples) -> dict:
+    """Seconds -> summary dict in milliseconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "runs": len(ms),
+        "mean_ms": sum(ms) / len(ms),
+        "min_ms": min(ms),
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms),
+    }
+
+
+def measure(fn, warmup: int = 3, repeat: int = 20, setup=None) -> dict:
+    """
+    Call fn() `warmup` times untimed, then `repeat` times timed.
+    If setup is given it runs untimed before every call and its return
+    value is passed to fn.
+    """
+    for _ in range(warmup):
+        fn(setup()) if setup else fn()
+
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg) if setup else fn()
+        samples.append(time.perf_counter() - started)
+
+    return summarize(samples)
+
+
+def environment() -> dict:
+    """Facts about the machine and checkout, stored next to the results."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(path: str, config: dict, results: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"environment": environment(), "config": config, "results": results},
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+        f.write("\n")
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(old: dict, new: dict, metric: str = "p50_ms", threshold: float = 0.10) -> list:
+    """
+    Compare two result files benchmark by benchmark.
+    Returns rows of (name, old, new, change); change is a fraction, and
+    a row is a regression when change > threshold.
+    """
+    rows = []
+    old_results, new_results = old["results"], new["results"]
+    for name in sorted(set(old_results) | set(new_results)):
+        before = old_results.get(name, {}).get(metric)
+        after = new_results.get(name, {}).get(metric)
+        if before is None or after is None:
+            rows.append((name, before, after, None))
+            continue
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change))
+    return rows
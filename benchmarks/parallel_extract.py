@@ -0,0 +1,80 @@
+"""
+Serial vs page-parallel PDF extraction.
+
+    python -m benchmarks.parallel_extract --pages 60 --repeat 5
+
+Builds a long PDF by repeating the pages of a source resume, then times
+extract_resume_text with parallel=False and parallel=True. Run it on a
+4-8 core machine; on one core the parallel mode can only lose.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from backend import resume_parser
+
+DEFAULT_SOURCE = os.path.join("data", "resumes", "user_2_20251207114241.pdf")
+
+
+def build_long_pdf(source: str, pages: int, out_path: str):
+    """Write a PDF of `pages` pages by cycling through the source's pages."""
+    reader = PdfReader(source)
+    writer = PdfWriter()
+    for i in range(pages):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    with open(out_path, "wb") as f:
+        writer.write(f)
+
+
+def time_mode(path: str, parallel: bool, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = " ".join(
+            resume_parser.iter_resume_text(
+                path, max_pages=None, max_chars=None, parallel=parallel
+            )
+        )
+        timings.append(time.perf_counter() - started)
+    return timings, len(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="PDF to repeat")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=resume_parser.PARALLEL_WORKERS)
+    args = parser.parse_args(argv)
+
+    resume_parser.PARALLEL_WORKERS = args.workers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "long.pdf")
+        build_long_pdf(args.source, args.pages, path)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{args.pages} pages, {size_kb:.0f} KiB, {args.workers} workers, "
+              f"{os.cpu_count()} CPUs")
+
+        # Warm up the worker pool so process start-up is not measured
+        time_mode(path, True, 1)
+
+        serial, serial_chars = time_mode(path, False, args.repeat)
+        parallel, parallel_chars = time_mode(path, True, args.repeat)
+
+    if serial_chars != parallel_chars:
+        print(f"!! output differs: {serial_chars} vs {parallel_chars} chars")
+
+    s = statistics.median(serial)
+    p = statistics.median(parallel)
+    print(f"serial:   median {s * 1000:8.1f} ms  (min {min(serial) * 1000:.1f})")
+    print(f"parallel: median {p * 1000:8.1f} ms  (min {min(parallel) * 1000:.1f})")
+    print(f"speedup:  {s / p:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Job scraper against local stand-in job boards.
+
+    python -m benchmarks.scrape --hosts 4 --pages 50 --check
+    python -m benchmarks.scrape --serve        # just run the boards
+
+Starts one HTTP server per "host" on 127.0.0.1, each serving synthetic
+listing pages (JSON on even pages, HTML with JSON-LD on odd ones) with
+ETag / Last-Modified support, a little latency, and a few pages that
+answer 503 once; --dupes of the postings are cross-posts from a shared
+pool. The scraper then runs three times against a throwaway database:
+cold, with nothing changed (every page should be a 304), and after
+--change of the pages were edited. --check exits 1 if a per-host limit
+was exceeded, the stored postings are not what was served, or the
+cross-posts did not collapse into one canonical posting each.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks import corpus
+
+
+class FixtureBoard:
+    """One stand-in job board: listing pages at /jobs/<n>, served from memory."""
+
+    def __init__(self, name: str, rng: random.Random, pages: int, jobs_per_page: int,
+                 latency: float = 0.0, flaky: float = 0.0, shared: list = (),
+                 dupes: float = 0.0):
+        self.name = name
+        self.rng = rng
+        self.latency = latency
+        self.jobs_per_page = jobs_per_page
+        self.shared = list(shared)      # postings every board may cross-post
+        self.dupes = dupes
+        self.pages = {}                 # path -> {"body", "type", "etag", "modified"}
+        self.origins = {}               # path -> one key per posting; copies share a key
+        self.flaky = {f"/jobs/{n}" for n in range(1, pages + 1) if rng.random() < flaky}
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.starts = []                # monotonic time of every request
+        self.served = {200: 0, 304: 0, 503: 0}
+
+        for n in range(1, pages + 1):
+            self._render(n, revision=0)
+
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                board.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _render(self, n: int, revision: int):
+        jobs = corpus.synthetic_jobs(self.rng, self.jobs_per_page)
+        origins = []
+        for i, job in enumerate(jobs):
+            if self.shared and self.rng.random() < self.dupes:
+                # A cross-post: same text give or take a board footer
+                k = self.rng.randrange(len(self.shared))
+                job.update(self.shared[k])
+                job["description"] += f" Apply on {self.name}."
+                origins.append(("shared", k))
+            else:
+                job["title"] += f" r{revision}"
+                origins.append((self.name, n, i, revision))
+            job["url"] = f"/postings/{n}-{i}"
+        self.origins[f"/jobs/{n}"] = origins
+
+        if n % 2 == 0:
+            body = json.dumps({"jobs": jobs, "page": n})
+            content_type = "application/json"
+        else:
+            blocks = "\n".join(
+                '<script type="application/ld+json">' + json.dumps({
+                    "@context": "https://schema.org",
+                    "@type": "JobPosting",
+                    "title": job["title"],
+                    "description": f"<p>{job['description']}</p>",
+                    "hiringOrganization": {"@type": "Organization", "name": job["company"]},
+                    "jobLocation": {"@type": "Place", "address": {"addressLocality": job["location"]}},
+                    "skills": ", ".join(job["tags"]),
+                    "url": job["url"],
+                }) + "</script>"
+                for job in jobs
+            )
+            body = f"<html><head><title>Jobs page {n}</title>{blocks}</head><body></body></html>"
+            content_type = "text/html; charset=utf-8"
+
+        body = body.encode("utf-8")
+        self.pages[f"/jobs/{n}"] = {
+            "body": body,
+            "type": content_type,
+            "etag": '"' + hashlib.sha1(body).hexdigest()[:16] + '"',
+            # Whole seconds, as HTTP dates have no finer resolution
+            "modified": int(time.time()) - 3600 + revision,
+        }
+
+    def edit(self, fraction: float) -> int:
+        """Regenerate a fraction of the pages. Returns how many changed."""
+        chosen = [n for n in range(1, len(self.pages) + 1) if self.rng.random() < fraction]
+        for n in chosen:
+            self._render(n, revision=1 + self.rng.randrange(1000))
+        return len(chosen)
+
+    def handle(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.starts.append(time.monotonic())
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            self._respond(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _respond(self, request):
+        page = self.pages.get(request.path)
+        if page is None:
+            request.send_error(404)
+            return
+
+        with self.lock:
+            if request.path in self.flaky:
+                self.flaky.discard(request.path)
+                self.served[503] += 1
+                failing = True
+            else:
+                failing = False
+        if failing:
+            request.send_response(503)
+            request.send_header("Retry-After", "0")
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+
+        match = request.headers.get("If-None-Match")
+        since = request.headers.get("If-Modified-Since")
+        if match is not None:
+            not_modified = match == page["etag"]
+        elif since is not None:
+            try:
+                not_modified = parsedate_to_datetime(since).timestamp() >= page["modified"]
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        with self.lock:
+            self.served[304 if not_modified else 200] += 1
+
+        request.send_response(304 if not_modified else 200)
+        request.send_header("ETag", page["etag"])
+        request.send_header("Last-Modified", formatdate(page["modified"], usegmt=True))
+        if not_modified:
+            request.end_headers()
+            return
+        request.send_header("Content-Type", page["type"])
+        request.send_header("Content-Length", str(len(page["body"])))
+        request.end_headers()
+        request.wfile.write(page["body"])
+
+    def max_starts_per_second(self) -> int:
+        """Most requests that started within any one-second window."""
+        starts = sorted(self.starts)
+        best, first = 0, 0
+        for last, moment in enumerate(starts):
+            while moment - starts[first] >= 1.0:
+                first += 1
+            best = max(best, last - first + 1)
+        return best
+
+    def reset_counters(self):
+        with self.lock:
+            self.peak = 0
+            self.starts = []
+            self.served = {200: 0, 304: 0, 503: 0}
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def write_sources(boards: list, pages: int, path: str):
+    sources = [
+        {"name": board.name, "url": board.url + "/jobs/{page}", "pages": pages}
+        for board in boards
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sources, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper run against local fixture job boards.")
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=50, help="listing pages per host")
+    parser.add_argument("--jobs-per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per response")
+    parser.add_argument("--flaky", type=float, default=0.05,
+                        help="fraction of pages that answer 503 once")
+    parser.add_argument("--dupes", type=float, default=0.2,
+                        help="fraction of postings cross-posted from a shared pool")
+    parser.add_argument("--change", type=float, default=0.1,
+                        help="fraction of pages edited before the third run")
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--serve", action="store_true",
+                        help="only run the boards and print a sources file for them")
+    parser.add_argument("--check", action="store_true", help="exit 1 on any violation")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    shared = corpus.synthetic_jobs(rng, max(1, args.pages * args.jobs_per_page // 10))
+    boards = [
+        FixtureBoard(f"board{i}", rng, args.pages, args.jobs_per_page,
+                     latency=args.latency, flaky=args.flaky, shared=shared, dupes=args.dupes)
+        for i in range(args.hosts)
+    ]
+    for board in boards:
+        board.start()
+
+    if args.serve:
+        path = os.path.abspath("fixture_sources.json")
+        write_sources(boards, args.pages, path)
+        print(f"Serving {args.hosts} boards; sources in {path}. Ctrl+C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return 0
+
+    # Imported here so DB_PATH is redirected before anything touches app.db
+    from utils import database
+    from backend.job_scraper import scrape
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="resume-scrape-") as tmp:
+        database.DB_PATH = Path(tmp) / "scrape.db"
+        sources = os.path.join(tmp, "sources.json")
+        write_sources(boards, args.pages, sources)
+
+        total_pages = args.hosts * args.pages
+        print(f"{'run':12s} {'pages/s':>8s} {'200':>5s} {'304':>5s} {'failed':>6s} "
+              f"{'retries':>7s} {'MB':>6s} {'peak/host':>9s} {'req/s/host':>10s} {'dupes':>6s}")
+
+        for run in ["cold", "unchanged", "edited"]:
+            changed = total_pages
+            if run == "edited":
+                changed = sum(board.edit(args.change) for board in boards)
+            for board in boards:
+                board.reset_counters()
+
+            stats = scrape(sources, per_host=args.per_host, rate=args.rate)
+            peak = max(board.peak for board in boards)
+            per_second = max(board.max_starts_per_second() for board in boards)
+            print(
+                f"{run:12s} {stats['pages'] / stats['elapsed_s']:8.1f} "
+                f"{stats['fetched']:5d} {stats['not_modified']:5d} {stats['failed']:6d} "
+                f"{stats['retries']:7d} {stats['bytes'] / 1e6:6.2f} {peak:9d} {per_second:10d} "
+                f"{stats['duplicates']:6d}"
+            )
+
+            if peak > args.per_host:
+                failures.append(f"{run}: {peak} requests in flight on one host")
+            # Starts are spaced client-side; allow for jitter on the way here
+            if args.rate and per_second > args.rate * 1.1 + 1:
+                failures.append(f"{run}: {per_second} requests/s on one host")
+            if stats["failed"]:
+                failures.append(f"{run}: {stats['failed']} pages failed")
+            expected_fetches = 0 if run == "unchanged" else changed
+            if stats["fetched"] != expected_fetches:
+                failures.append(f"{run}: fetched {stats['fetched']} pages, expected {expected_fetches}")
+
+            # Every cross-post of one shared posting should collapse into one
+            canonical = database.get_connection().execute(
+                "SELECT COUNT(*) FROM job_postings WHERE canonical_id IS NULL"
+            ).fetchone()[0]
+            distinct = len({key for board in boards for keys in board.origins.values() for key in keys})
+            if canonical != distinct:
+                failures.append(f"{run}: {canonical} canonical postings, expected {distinct}")
+
+        stored = database.get_connection().execute(
+            "SELECT COUNT(*) FROM job_postings"
+        ).fetchone()[0]
+        expected = total_pages * args.jobs_per_page
+        print(f"\nStored {stored} postings (served {expected})")
+        if stored != expected:
+            failures.append(f"stored {stored} postings, expected {expected}")
+        database.close_all_connections()
+
+    for board in boards:
+        board.stop()
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+    else:
+        print("\nAll checks passed.")
+    return 1 if failures and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Semantic job index: query throughput and recall@10 against exact search.
+
+    python -m benchmarks.semantic                       # 10k, 100k and 1M jobs
+    python -m benchmarks.semantic --sizes 10000 --queries 50
+    python -m benchmarks.semantic --min-recall 0.9      # exit 1 below it
+
+Job texts come from a synthetic corpus grouped into role families (each
+family draws from its own skills), so the collection has the clustered
+shape real postings have; queries are synthetic resumes from the same
+families, skill-dense enough that the exact top 10 mostly comes from the
+query's own family rather than from shared filler. Vectors are generated once for the largest size into a memmap
+and every index is built from a prefix of it. Recall@10 is the share of
+the exact top 10 that the IVF search also returns.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend import semantic_index
+from benchmarks import corpus
+
+FAMILY_SKILLS = 12
+QUERY_WORDS = 300
+QUERY_SKILL_DENSITY = 0.15
+NPROBES = (4, 8, 16, 32)
+
+
+def role_families(rng: random.Random, count: int, skills: list) -> list:
+    return [rng.sample(skills, FAMILY_SKILLS) for _ in range(count)]
+
+
+def job_texts(rng: random.Random, n: int, families: list, skills: list):
+    """n job descriptions: mostly family skills, a few random ones, filler words."""
+    for _ in range(n):
+        family = rng.choice(families)
+        words = [rng.choice(corpus.FILLER) for _ in range(12)]
+        words += rng.sample(family, 6) + rng.sample(skills, 2)
+        rng.shuffle(words)
+        yield f"{family[0]} engineer " + " ".join(words)
+
+
+def write_vectors(path: Path, n: int, rng: random.Random, families: list, skills: list,
+                  chunk: int = 20_000, log=print) -> np.memmap:
+    vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(n, semantic_index.DIM))
+    texts = job_texts(rng, n, families, skills)
+    started = time.perf_counter()
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        vectors[start:start + size] = semantic_index.vectorize(next(texts) for _ in range(size))
+        log(f"  vectorised {start + size}/{n} jobs "
+            f"({(start + size) / (time.perf_counter() - started):.0f} jobs/s)", end="\r")
+    log()
+    vectors.flush()
+    return vectors
+
+
+def measure(index, queries: np.ndarray, exact_queries: int) -> dict:
+    """QPS for exact and each nprobe, and recall@10 of each nprobe."""
+    exact, exact_times = [], []
+    for q in queries:
+        started = time.perf_counter()
+        ids, _ = index.search(q, k=10, exact=True)
+        exact_times.append(time.perf_counter() - started)
+        exact.append(set(ids.tolist()))
+        if len(exact_times) >= exact_queries:
+            break
+
+    result = {"exact_qps": 1 / statistics.mean(exact_times), "ivf": {}}
+    for nprobe in NPROBES:
+        times, recalls = [], []
+        for i, q in enumerate(queries):
+            started = time.perf_counter()
+            ids, _ = index.search(q, k=10, nprobe=nprobe)
+            times.append(time.perf_counter() - started)
+            if i < len(exact):
+                recalls.append(len(exact[i] & set(ids.tolist())) / max(1, len(exact[i])))
+        result["ivf"][nprobe] = {
+            "qps": 1 / statistics.mean(times),
+            "recall": statistics.mean(recalls),
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Semantic index QPS and recall@10.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--exact-queries", type=int, default=50,
+                        help="queries also run exactly (the recall baseline)")
+    parser.add_argument("--families", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--min-recall", type=float, default=None,
+                        help=f"exit 1 if recall@10 at nprobe={semantic_index.NPROBE} is lower")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    skills = corpus.skill_vocabulary()
+    families = role_families(rng, args.families, skills)
+    queries = semantic_index.vectorize(
+        corpus.resume_text(rng, words=QUERY_WORDS, skill_density=QUERY_SKILL_DENSITY,
+                           skills=rng.choice(families))
+        for _ in range(args.queries)
+    )
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="resume-semantic-") as tmp:
+        largest = max(args.sizes)
+        vectors = write_vectors(Path(tmp) / "all.f32", largest, rng, families, skills)
+
+        print(f"\n{'jobs':>9s} {'lists':>6s} {'build s':>8s} {'exact qps':>10s}  "
+              + "  ".join(f"{'np=' + str(p) + ' qps':>10s} {'recall':>6s}" for p in NPROBES))
+        for size in sorted(args.sizes):
+            started = time.perf_counter()
+            chunks = (
+                (np.arange(start, min(start + 65_536, size)), vectors[start:min(start + 65_536, size)])
+                for start in range(0, size, 65_536)
+            )
+            index = semantic_index.VectorIndex.build(Path(tmp) / f"index-{size}", chunks)
+            build_s = time.perf_counter() - started
+
+            result = measure(index, queries, args.exact_queries)
+            print(f"{size:9d} {index.meta['nlist']:6d} {build_s:8.1f} {result['exact_qps']:10.1f}  "
+                  + "  ".join(f"{result['ivf'][p]['qps']:10.1f} {result['ivf'][p]['recall']:6.3f}"
+                              for p in NPROBES))
+
+            default = result["ivf"].get(semantic_index.NPROBE)
+            if args.min_recall and default and default["recall"] < args.min_recall:
+                failures.append(f"{size} jobs: recall@10 {default['recall']:.3f}")
+            del index
+
+        del vectors
+
+    if failures:
+        print("\nBELOW RECALL TARGET:\n  " + "\n  ".join(failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Cold-start report: what `import app` costs and how long the first page
+takes to render, checked against a budget.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --check        # exit 1 when over budget
+    python -m benchmarks.startup --top 25
+
+Every measurement runs in a fresh interpreter (-X importtime for the
+import breakdown, Streamlit's AppTest for the first render) against a
+throwaway database, and the median of --repeat runs is reported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Budgets for a cold `streamlit run app.py`; raise them only on purpose
+IMPORT_BUDGET_MS = 650
+FIRST_RENDER_BUDGET_MS = {"register": 1500, "dashboard": 2000}
+
+# Must not be loaded before someone opens the dashboard
+DEFERRED_MODULES = ["PyPDF2", "docx2txt", "numpy", "scipy", "bcrypt", "http.server", "aiohttp"]
+
+_RENDER_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+if sys.argv[1] == "dashboard":
+    at.session_state["user"] = {"id": 1, "full_name": "Startup Check", "email": "s@example.com"}
+    at.session_state["page"] = "dashboard"
+at.run()
+elapsed = time.perf_counter() - started
+print(json.dumps({"ms": elapsed * 1000, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+
+def _env(db_dir: str) -> dict:
+    env = dict(os.environ)
+    env["RESUME_APP_DB"] = os.path.join(db_dir, "startup.db")
+    env["RESUME_APP_EMBEDDED_WORKER"] = "0"
+    env.pop("RESUME_APP_PROFILE", None)
+    env.pop("RESUME_APP_METRICS", None)
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+    """Rows of (self_us, cumulative_us, depth, module) from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def import_report(module: str = "app", repeat: int = 5, db_dir: str = None) -> dict:
+    """Median total import time of `module` plus its slowest direct imports."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BASE_DIR, env=_env(db_dir), capture_output=True, text=True, check=True,
+        )
+        rows = parse_importtime(proc.stderr)
+        # Children are printed before their parent: the subtree of `module`
+        # is everything between the previous top-level line and its own
+        end = next(i for i, row in enumerate(rows) if row[3] == module and row[2] == 0)
+        start = max((i for i in range(end) if rows[i][2] == 0), default=-1) + 1
+        runs.append((rows[end][1], rows[start:end + 1]))
+
+    runs.sort(key=lambda run: run[0])
+    total, rows = runs[len(runs) // 2]
+    loaded = {name for _, _, _, name in rows}
+    return {
+        "total_ms": total / 1000,
+        "runs_ms": [run[0] / 1000 for run in runs],
+        # Depth-1 entries are what `module` imports itself
+        "direct": sorted(
+            ((name, cum / 1000) for _, cum, depth, name in rows if depth == 1),
+            key=lambda item: item[1],
+            reverse=True,
+        ),
+        "slowest": sorted(
+            ((name, own / 1000) for own, _, _, name in rows),
+            key=lambda item: item[1],
+            reverse=True,
+        ),
+        "eager_heavy": [m for m in DEFERRED_MODULES if m in loaded],
+    }
+
+
+def first_render_ms(page: str, repeat: int = 3, db_dir: str = None) -> dict:
+    """Wall time from a fresh interpreter to the first finished run of `page`."""
+    samples, errors = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", _RENDER_SCRIPT, page],
+            cwd=BASE_DIR, env=_env(db_dir), capture_output=True, text=True, check=True,
+        )
+        wall = (time.perf_counter() - started) * 1000
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(wall)
+        errors += result["errors"]
+    return {"median_ms": statistics.median(samples), "runs_ms": samples, "errors": errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import and render report.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to list")
+    parser.add_argument("--check", action="store_true", help="exit 1 when over budget")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="resume-startup-") as db_dir:
+        imports = import_report("app", repeat=args.repeat, db_dir=db_dir)
+        print(f"import app: {imports['total_ms']:.0f} ms median "
+              f"(budget {IMPORT_BUDGET_MS} ms)")
+        print("\n  direct imports (cumulative ms)")
+        for name, ms in imports["direct"][:args.top]:
+            print(f"  {ms:9.1f}  {name}")
+        print("\n  slowest modules (self ms)")
+        for name, ms in imports["slowest"][:args.top]:
+            print(f"  {ms:9.1f}  {name}")
+
+        if imports["total_ms"] > IMPORT_BUDGET_MS:
+            failures.append(f"import app took {imports['total_ms']:.0f} ms")
+        if imports["eager_heavy"]:
+            failures.append(f"loaded at import: {', '.join(imports['eager_heavy'])}")
+
+        print()
+        for page, budget in FIRST_RENDER_BUDGET_MS.items():
+            render = first_render_ms(page, repeat=max(1, args.repeat // 2), db_dir=db_dir)
+            print(f"first render of {page}: {render['median_ms']:.0f} ms median "
+                  f"(budget {budget} ms)")
+            if render["errors"]:
+                failures.append(f"{page} raised: {render['errors'][0]}")
+            elif render["median_ms"] > budget:
+                failures.append(f"{page} first render took {render['median_ms']:.0f} ms")
+
+    if failures:
+        print("\nOVER BUDGET:\n  " + "\n  ".join(failures))
+    else:
+        print("\nWithin budget.")
+    return 1 if failures and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
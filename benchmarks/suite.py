@@ -0,0 +1,164 @@
+"""
+The benchmark definitions. Every hot path gets its own entry; each runs
+against a throwaway database and corpus in a temp directory.
+"""
+import itertools
+import os
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks import corpus
+from benchmarks.harness import measure
+
+FULL = {"warmup": 3, "repeat": 30, "bcrypt_repeat": 10, "jobs": 10_000, "rows": 2_000}
+QUICK = {"warmup": 1, "repeat": 5, "bcrypt_repeat": 3, "jobs": 1_000, "rows": 200}
+
+
+def run_suite(seed: int = 1234, quick: bool = False, only: str = None,
+              log=print) -> tuple:
+    """Run every benchmark whose name contains `only`. Returns (config, results)."""
+    settings = dict(QUICK if quick else FULL)
+    config = {"seed": seed, "quick": quick, **settings}
+    warmup, repeat = settings["warmup"], settings["repeat"]
+
+    # Imported here so DB_PATH is redirected before anything touches app.db
+    from utils import database
+
+    results = {}
+
+    def bench(name, fn, **kwargs):
+        if only and only not in name:
+            return
+        kwargs.setdefault("warmup", warmup)
+        kwargs.setdefault("repeat", repeat)
+        results[name] = stats = measure(fn, **kwargs)
+        log(f"{name:45s} p50 {stats['p50_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as tmp:
+        database.DB_PATH = Path(tmp) / "bench.db"
+        database.init_db()
+
+        rng = random.Random(seed)
+        skills = corpus.skill_vocabulary()
+
+        # ---------------- corpus ----------------
+        files = {}
+        for label, words in [("small", 600), ("large", 12_000)]:
+            text = corpus.resume_text(rng, words=words, skills=skills)
+            files[label] = text
+            corpus.write_pdf(os.path.join(tmp, f"{label}.pdf"), text)
+            corpus.write_docx(os.path.join(tmp, f"{label}.docx"), text)
+
+        # ---------------- parser ----------------
+        from backend.resume_parser import extract_resume_text
+
+        for label in ["small", "large"]:
+            pdf = os.path.join(tmp, f"{label}.pdf")
+            docx = os.path.join(tmp, f"{label}.docx")
+            bench(f"parser.extract_pdf_{label}", lambda p=pdf: extract_resume_text(p, parallel=False))
+            bench(f"parser.extract_docx_{label}", lambda p=docx: extract_resume_text(p))
+
+        # ---------------- analysis ----------------
+        from backend.resume_analyzer import basic_resume_analysis
+
+        for label in ["small", "large"]:
+            bench(f"analysis.basic_resume_analysis_{label}",
+                  lambda t=files[label]: basic_resume_analysis(t))
+
+        # ---------------- job matching ----------------
+        from backend.job_matcher import JobIndex, recommend_jobs
+
+        analysis = basic_resume_analysis(files["small"])
+        bench("matcher.recommend_jobs_catalog", lambda: recommend_jobs(analysis))
+
+        index = JobIndex(corpus.synthetic_jobs(rng, settings["jobs"], skills))
+        query = files["small"]
+        bench(f"matcher.search_{settings['jobs']}_jobs", lambda: index.search(query, top_k=10))
+
+        # ---------------- posting dedup ----------------
+        from backend import posting_dedup
+
+        postings = [
+            dict(job, source="bench", url=f"{job['url']}/{i}")
+            for i, job in enumerate(corpus.synthetic_jobs(rng, settings["jobs"], skills))
+        ]
+        descriptions = [posting["description"] for posting in postings[:1000]]
+        bench("dedup.signatures_1000", lambda: posting_dedup.signatures(descriptions))
+
+        database.upsert_job_postings_bulk(postings)
+        posting_dedup.deduplicate_new_postings()
+        probes = [dict(posting, id=-i) for i, posting in enumerate(postings[:100], 1)]
+        bench(f"dedup.lookup_100_vs_{settings['jobs']}",
+              lambda: posting_dedup.deduplicate_batch(probes))
+
+        # ---------------- database ----------------
+        users = corpus.synthetic_users(rng, settings["rows"] + 10_000)
+        for full_name, email in users[:settings["rows"]]:
+            database.create_user(full_name, email, "x")
+        known = users[settings["rows"] // 2][1]
+        fresh_users = iter(users[settings["rows"]:])
+
+        bench("db.create_user", lambda: database.create_user(*next(fresh_users), "x"))
+        bench("db.get_user_by_email_hit", lambda: database.get_user_by_email(known))
+        missing = (f"missing{i}@example.com" for i in itertools.count())
+        bench("db.get_user_by_email_unknown", lambda: database.get_user_by_email(next(missing)))
+
+        text = files["small"]
+        bench("db.save_resume_analysis",
+              lambda: database.save_resume_analysis(1, text, identified_skills="[]"))
+        bench("db.get_latest_resume_analysis", lambda: database.get_latest_resume_analysis(1))
+        bench("db.search_resumes", lambda: database.search_resumes('python OR "machine learning"'))
+
+        job_rows = [
+            {
+                "job_title": job["title"],
+                "company_name": job["company"],
+                "location": job["location"],
+                "job_description": job["description"],
+                "job_url": job["url"],
+                "match_percentage": 50.0,
+            }
+            for job in corpus.synthetic_jobs(rng, 100, skills)
+        ]
+        row = job_rows[0]
+        bench("db.save_job_recommendation",
+              lambda: database.save_job_recommendation(2, *row.values()))
+        bench("db.save_job_recommendations_bulk_100",
+              lambda: database.save_job_recommendations_bulk(3, job_rows))
+        bench("db.iter_job_recommendations_top20",
+              lambda: list(database.iter_job_recommendations_for_user(3, limit=20)))
+        bench("db.get_job_recommendations_for_user_all",
+              lambda: database.get_job_recommendations_for_user(3))
+
+        # ---------------- auth (bcrypt) ----------------
+        from backend import auth
+        from backend.password_hasher import password_hasher
+
+        b_repeat = settings["bcrypt_repeat"]
+        stored = password_hasher.hash_password("Str0ng!Pass")
+        bench("auth.hash_password", lambda: password_hasher.hash_password("Str0ng!Pass"),
+              warmup=1, repeat=b_repeat)
+        bench("auth.verify_password",
+              lambda: password_hasher.verify_password("Str0ng!Pass", stored),
+              warmup=1, repeat=b_repeat)
+
+        database.create_user("Bench User", "bench.login@example.com", stored)
+        bench("auth.login_user",
+              lambda: auth.login_user("bench.login@example.com", "Str0ng!Pass"),
+              warmup=1, repeat=b_repeat)
+        bench("auth.login_user_unknown_email",
+              lambda: auth.login_user(next(missing), "Str0ng!Pass"))
+
+        registrations = iter(users[settings["rows"] + 5_000:])
+
+        def register():
+            full_name, email = next(registrations)
+            auth.register_user(full_name, email, "Str0ng!Pass", "Str0ng!Pass")
+
+        bench("auth.register_user", register, warmup=1, repeat=b_repeat)
+        config["bcrypt_rounds"] = password_hasher.rounds
+
+        database.close_all_connections()
+
+    return config, results
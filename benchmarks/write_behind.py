@@ -0,0 +1,177 @@
+"""
+Per-call commits vs the write-behind writer, under concurrent writers.
+
+    python -m benchmarks.write_behind --processes 2 --threads 8 --ops 300
+
+Every writer (a thread, standing in for a Streamlit session) cycles
+through create_user, save_resume_analysis and save_job_recommendation
+against one throwaway database, each process with its own threads. Modes:
+
+    per-call   each call commits on the thread's own connection (today)
+    batched    calls go through a WriteBehindWriter per process and the
+               caller waits on the future (read-your-writes)
+    async      like batched, but callers only wait for everything at the end
+
+Reports writes per second, per-call latency and `database is locked`
+errors (the busy timeout is BUSY_TIMEOUT_MS).
+"""
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import corpus
+from utils.write_behind import WRITE_BATCH_DELAY, WRITE_BATCH_SIZE
+
+MODES = ("per-call", "batched", "async")
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def _writer_thread(database, submit, worker: str, ops: int, text: str,
+                   latencies: list, errors: list, pending: list):
+    calls = [
+        lambda i: (database.create_user, (f"User {worker} {i}", f"{worker}.{i}@example.com", "x")),
+        lambda i: (database.save_resume_analysis, (1, text), {"identified_skills": '["SQL"]'}),
+        lambda i: (database.save_job_recommendation,
+                   (1, "Data Engineer", "Acme", "Pune", "Pipelines", f"https://x/{worker}/{i}", 80.0)),
+    ]
+    for i in range(ops):
+        func, args, *rest = calls[i % len(calls)](i)
+        kwargs = rest[0] if rest else {}
+        started = time.perf_counter()
+        try:
+            result = submit(func, *args, **kwargs)
+            if pending is None:
+                if hasattr(result, "result"):
+                    result.result()
+                latencies.append(time.perf_counter() - started)
+            else:
+                pending.append((started, result))
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+
+
+def run_process(db_path: str, mode: str, threads: int, ops: int, tag: str, out, barrier,
+                batch_size: int, delay: float, synchronous: str):
+    """
+    One process's share of the load. Puts (latencies, errors, writer
+    stats, began, finished) on out; the times are wall-clock seconds.
+    """
+    from utils import database
+    from utils.write_behind import WriteBehindWriter
+
+    database.DB_PATH = Path(db_path)
+    database.SYNCHRONOUS = synchronous
+    database.init_db()
+    text = corpus.resume_text(random.Random(0), words=300)
+
+    writer = WriteBehindWriter(batch_size, delay) if mode != "per-call" else None
+    submit = writer.submit if writer else (lambda func, *a, **kw: func(*a, **kw))
+
+    latencies, errors, pending = [], [], [] if mode == "async" else None
+    workers = [
+        threading.Thread(target=_writer_thread, args=(
+            database, submit, f"{tag}w{t}", ops, text, latencies, errors, pending))
+        for t in range(threads)
+    ]
+    # Time only the writes, not process start-up and imports
+    barrier.wait()
+    began = time.time()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    for started, future in pending or ():
+        try:
+            future.result()
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+        latencies.append(time.perf_counter() - started)
+    finished = time.time()
+
+    stats = writer.stats() if writer else {}
+    if writer:
+        writer.close()
+    database.close_all_connections()
+    out.put((latencies, errors, stats, began, finished))
+
+
+def run_mode(mode: str, processes: int, threads: int, ops: int,
+             batch_size: int, delay: float, synchronous: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="resume-write-behind-") as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+
+        # Schema and the user the analyses belong to, before the clock starts
+        from utils import database
+        database.DB_PATH = Path(db_path)
+        database.init_db()
+        database.create_user("Bench User", "bench@example.com", "x")
+        database.close_all_connections()
+
+        out = ctx.Queue()
+        barrier = ctx.Barrier(processes)
+        procs = [
+            ctx.Process(target=run_process, args=(
+                db_path, mode, threads, ops, f"p{p}", out, barrier, batch_size, delay, synchronous))
+            for p in range(processes)
+        ]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = max(r[4] for r in results) - min(r[3] for r in results)
+
+    latencies = [x for r in results for x in r[0]]
+    batches = sum(r[2].get("batches", 0) for r in results)
+    writes = sum(r[2].get("writes", 0) for r in results)
+    return {
+        "writes_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "locked": sum(len(r[1]) for r in results),
+        "mean_batch": writes / batches if batches else 1.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-call commits vs write-behind batching.")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="writer threads per process")
+    parser.add_argument("--ops", type=int, default=300, help="writes per thread")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE)
+    parser.add_argument("--delay", type=float, default=WRITE_BATCH_DELAY,
+                        help="seconds the writer waits for more calls after the first")
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"],
+                        help="PRAGMA synchronous; FULL fsyncs on every commit")
+    args = parser.parse_args(argv)
+
+    total = args.processes * args.threads * args.ops
+    print(f"{args.processes} processes x {args.threads} threads x {args.ops} writes = {total}, "
+          f"synchronous={args.synchronous}\n")
+    print(f"{'mode':10s} {'writes/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s} "
+          f"{'locked':>7s} {'batch':>6s}")
+    for mode in args.modes:
+        r = run_mode(mode, args.processes, args.threads, args.ops, args.batch_size, args.delay,
+                     args.synchronous)
+        print(f"{mode:10s} {r['writes_per_s']:9.0f} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} "
+              f"{r['max_ms']:8.1f} {r['locked']:7d} {r['mean_batch']:6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
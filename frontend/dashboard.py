@@ -1,83 +1,67 @@
 import streamlit as st
-from backend.resume_parser import extract_resume_text
-import os
-import datetime
-
-
-def basic_resume_analysis(text):
-    """Handle both string and (text, extra) tuple safely."""
-    if isinstance(text, tuple):
-        text = text[0]
-
-    if not text or not isinstance(text, str):
-        return {"word_count": 0, "skills": [], "clean_text": ""}
-
-    lower = text.lower()
-    words = text.split()
-    length = len(words)
-
-    skills = []
-    for skill in [
-        "python",
-        "java",
-        "c++",
-        "sql",
-        "html",
-        "css",
-        "javascript",
-        "react",
-        "django",
-        "flask",
-        "machine learning",
-        "data analysis",
-    ]:
-        if skill in lower:
-            skills.append(skill)
-
-    return {"word_count": length, "skills": skills, "clean_text": text}
+from backend.analysis_worker import start_embedded_worker
+from backend.resume_analyzer import (
+    ANALYZER_VERSION,
+    analysis_record,
+    basic_resume_analysis,
+)
+from backend.resume_cache import resume_cache
+from backend.resume_store import link_to_user, store_upload, to_stored_path
+from backend.job_matcher import MATCHER_VERSION, recommend_jobs, to_recommendation_row
+from utils.database import (
+    enqueue_analysis_job,
+    get_analysis_job,
+    iter_job_recommendations_for_user,
+    retry_analysis_job,
+    save_job_recommendations_bulk,
+    save_resume_analysis,
+)
+from utils.metrics import timed
+from utils.write_behind import WRITE_RESULT_TIMEOUT, write
+
+JOB_POLL_SECONDS = 1.0
 
 
 def get_job_recommendations(analysis: dict):
-    skills = set(analysis.get("skills", []))
-    jobs = []
-
-    if {"python", "sql"} & skills:
-        jobs.append(
-            {
-                "title": "Junior Data Analyst",
-                "meta": "Entry-level · Remote / Hybrid",
-                "tags": "Python · SQL · Excel",
-            }
-        )
+    """Top catalog postings for a resume, with display fields added."""
+    jobs = recommend_jobs(analysis, top_k=5)
+    for job in jobs:
+        job["meta"] = f"{job.get('company', '')} · {job.get('location', '')}"
+        job["tags"] = " · ".join(job.get("tags", []))
+    return jobs
 
-    if {"html", "css", "javascript"} <= skills:
-        jobs.append(
-            {
-                "title": "Frontend Developer Intern",
-                "meta": "Internship · Web Development",
-                "tags": "HTML · CSS · JavaScript",
-            }
-        )
 
-    if {"python", "django"} & skills:
-        jobs.append(
-            {
-                "title": "Python / Django Developer Intern",
-                "meta": "Internship · Backend",
-                "tags": "Python · Django · REST APIs",
-            }
-        )
+def get_similar_roles(analysis: dict):
+    """Postings close to the resume's wording; empty until the semantic index is built."""
+    from backend.semantic_index import semantic_recommend_jobs
 
-    if not jobs:
-        jobs.append(
-            {
-                "title": "Software Developer Intern",
-                "meta": "Internship · Generalist",
-                "tags": "Problem Solving · OOP · Git",
-            }
-        )
+    return semantic_recommend_jobs(analysis, top_k=5)
 
-    return jobs
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_analysis_job_status(job_id: int):
+    """Re-runs on its own every second; reloads the page once the job is done."""
+    job = get_analysis_job(job_id)
+
+    if job is None or job["status"] == "done":
+        st.rerun()
+
+    if job["status"] == "dead":
+        st.error("We could not analyse this resume. Please check the file and try again.")
+        with st.expander("Error details"):
+            st.code(job["last_error"] or "")
+        if st.button("Retry analysis"):
+            retry_analysis_job(job_id)
+            st.rerun()
+        return
+
+    if job["last_error"]:
+        st.warning(
+            f"The last attempt failed, retrying "
+            f"({job['attempts']} of {job['max_attempts']} attempts used)…"
+        )
+    else:
+        st.info("Analysing your resume… this page updates by itself.")
 
 
 def show_dashboard():
@@ -105,22 +89,52 @@ def show_dashboard():
         st.info("Upload a resume to view analysis and job suggestions.")
         return
 
-    # Save resume
-    save_dir = "data/resumes"
-    os.makedirs(save_dir, exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"user_resume_{timestamp}.pdf"
-    file_path = os.path.join(save_dir, filename)
-
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.read())
+    user_id = st.session_state["user"]["id"]
+
+    with timed("dashboard.analysis"):
+        # Stream each new upload into the store once; reruns reuse the result
+        stored = st.session_state.get("stored_upload")
+        if stored is None or stored[:2] != (user_id, uploaded_file.file_id):
+            content_hash, file_path = store_upload(uploaded_file, uploaded_file.name)
+            link_to_user(user_id, file_path)
+            stored = (user_id, uploaded_file.file_id, content_hash, str(file_path))
+            st.session_state["stored_upload"] = stored
+        _, _, content_hash, file_path = stored
+
+        # Identical uploads share one hash, so they share the analysis too
+        cached = resume_cache.get(content_hash)
+        analysis = cached["analysis"] if cached is not None else None
+
+        # Skill list changed since this was cached: re-analyse the stored text
+        if analysis is not None and analysis.get("analyzer_version") != ANALYZER_VERSION:
+            analysis = basic_resume_analysis(cached["text"])
+            resume_cache.put(content_hash, to_stored_path(file_path), cached["text"], analysis)
+
+    if analysis is None:
+        # Not seen before: extraction runs on a worker, this page just polls
+        start_embedded_worker()  # once per process; external workers may join
+        job = st.session_state.get("analysis_job")
+        if (
+            job is None
+            or job[:2] != (user_id, content_hash)
+            # done, yet no cached result (entry evicted or deleted): run it again
+            or (get_analysis_job(job[2]) or {}).get("status") in (None, "done")
+        ):
+            job_id = enqueue_analysis_job(user_id, content_hash, to_stored_path(file_path))
+            job = (user_id, content_hash, job_id)
+            st.session_state["analysis_job"] = job
+        show_analysis_job_status(job[2])
+        return
 
     st.success("Resume uploaded successfully.")
-    st.write(f"Saved as: {file_path}")
+    st.write(f"Saved as: {to_stored_path(file_path)}")
+
+    stats = resume_cache.stats()
+    st.caption(
+        f"Analysis cache: {stats['memory_hits'] + stats['disk_hits']} hits · "
+        f"{stats['misses']} misses"
+    )
 
-    # Extract + analyse
-    raw_extracted = extract_resume_text(file_path)
-    analysis = basic_resume_analysis(raw_extracted)
     text = analysis["clean_text"]
 
     if not text:
@@ -130,6 +144,39 @@ def show_dashboard():
         )
         return
 
+    with timed("dashboard.job_matching"):
+        jobs = get_job_recommendations(analysis)
+
+    # Persist once per upload, not on every rerun. A finished job has
+    # already written its own resume_analysis row; one still queued or
+    # running (the analysis came from another upload's cache entry) will
+    # write it, so wait for that rather than saving a second copy.
+    saved = st.session_state.get("saved_analysis") == (user_id, content_hash)
+    job = st.session_state.get("analysis_job")
+    queued = None
+    if not saved and job and job[:2] == (user_id, content_hash):
+        queued = get_analysis_job(job[2])
+    job_pending = queued is not None and queued["status"] in ("queued", "running")
+
+    if not saved and not job_pending:
+        if queued is not None and queued["result_id"] is not None:
+            analysis_id = queued["result_id"]
+        else:
+            analysis_id = write(
+                save_resume_analysis,
+                user_id, content_hash=content_hash, **analysis_record(analysis)
+            ).result(timeout=WRITE_RESULT_TIMEOUT)
+        # Waited on so the history below already includes these rows
+        write(
+            save_job_recommendations_bulk,
+            user_id,
+            [to_recommendation_row(job) for job in jobs],
+            analysis_id=analysis_id,
+            analyzer_version=analysis.get("analyzer_version"),
+            matcher_version=MATCHER_VERSION,
+        ).result(timeout=WRITE_RESULT_TIMEOUT)
+        st.session_state["saved_analysis"] = (user_id, content_hash)
+
     st.markdown("---")
     st.markdown("#### Step 2 · Quick Analysis")
 
@@ -141,7 +188,7 @@ def show_dashboard():
         if skills:
             st.write("Skills detected:", ", ".join(skills))
         else:
-            st.write("Skills detected: None found from common keywords.")
+            st.write("Skills detected: None found in the skill taxonomy.")
 
     with st.expander("View extracted resume text"):
         st.text_area("Resume Content", text, height=220)
@@ -149,11 +196,27 @@ def show_dashboard():
     st.markdown("---")
     st.markdown("#### Step 3 · Job Recommendations")
 
-    st.caption("Sample roles based on the skills found in your resume text.")
+    st.caption("Roles from the job catalog ranked by similarity to your resume.")
+
+    if not jobs:
+        st.write("No matching roles found in the job catalog.")
 
-    jobs = get_job_recommendations(analysis)
     for job in jobs:
-        st.write(f"{job['title']}")
+        st.write(f"{job['title']} · {job['match_percentage']}% match")
         st.write(f"{job['meta']}")
         st.write(f"Skills: {job['tags']}")
-        st.markdown("---")
\ No newline at end of file
+        st.markdown("---")
+
+    similar = get_similar_roles(analysis)
+    if similar:
+        with st.expander("Similar roles by wording"):
+            for job in similar:
+                st.write(f"{job['title']} · {job.get('company') or ''} · {job['match_percentage']}% similar")
+
+    with st.expander("Recommendation history"):
+        # Streams only the newest rows instead of loading the whole history
+        for row in iter_job_recommendations_for_user(user_id, limit=20):
+            st.write(
+                f"{row['job_title']} at {row['company_name']} · "
+                f"{row['match_percentage']}% · {(row['scraping_date'] or '')[:10]}"
+            )
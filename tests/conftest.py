@@ -0,0 +1,18 @@
+import pytest
+
+from utils import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, migrated database in tmp_path; the database module points at it."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "app.db")
+    database.init_db()
+    yield database
+    database.close_all_connections()
+
+
+@pytest.fixture
+def user_id(db):
+    db.create_user("Test User", "test@example.com", "x")
+    return db.get_user_by_email("test@example.com")["id"]
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+
+from backend import analysis_worker
+from backend.resume_cache import ResumeCache
+
+
+@pytest.fixture
+def no_jitter(db, monkeypatch):
+    monkeypatch.setattr(db.random, "uniform", lambda low, high: 1.0)
+
+
+def _enqueue(db, user_id, n=1, **kwargs):
+    return [db.enqueue_analysis_job(user_id, f"hash{i}", f"uploads/{i}.pdf", **kwargs)
+            for i in range(n)]
+
+
+def _expire_lease(db, job_id):
+    with db.transaction() as conn:
+        conn.execute("UPDATE analysis_jobs SET lease_expires = ? WHERE id = ?",
+                     (time.time() - 1, job_id))
+
+
+def _make_runnable(db, job_id):
+    with db.transaction() as conn:
+        conn.execute("UPDATE analysis_jobs SET run_after = 0 WHERE id = ?", (job_id,))
+
+
+def test_enqueue_reuses_a_pending_job(db, user_id):
+    first = db.enqueue_analysis_job(user_id, "h", "uploads/a.pdf")
+    assert db.enqueue_analysis_job(user_id, "h", "uploads/a.pdf") == first
+
+
+def test_concurrent_workers_never_claim_the_same_job(db, user_id):
+    jobs = set(_enqueue(db, user_id, 30))
+    claimed = []
+    lock = threading.Lock()
+
+    def work(worker_id):
+        while True:
+            job = db.claim_analysis_job(worker_id)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(jobs)
+    assert db.claim_analysis_job("late") is None
+
+
+def test_expired_lease_is_reclaimed(db, user_id):
+    (job_id,) = _enqueue(db, user_id)
+    assert db.claim_analysis_job("a")["id"] == job_id
+    assert db.claim_analysis_job("b") is None  # still leased to a
+
+    _expire_lease(db, job_id)
+    job = db.claim_analysis_job("b")
+    assert (job["id"], job["lease_owner"], job["attempts"]) == (job_id, "b", 2)
+
+
+def test_stale_owner_loses_the_lease(db, user_id):
+    (job_id,) = _enqueue(db, user_id)
+    db.claim_analysis_job("a")
+    _expire_lease(db, job_id)
+    db.claim_analysis_job("b")
+
+    assert db.heartbeat_analysis_job(job_id, "a") is False
+    assert db.complete_analysis_job(job_id, "a", result_id=1) is False
+    assert db.fail_analysis_job(job_id, "a", "boom") is None
+    assert db.heartbeat_analysis_job(job_id, "b") is True
+    assert db.complete_analysis_job(job_id, "b", result_id=1) is True
+    assert db.get_analysis_job(job_id)["status"] == "done"
+
+
+def test_backoff_doubles_up_to_the_cap(db, no_jitter):
+    delays = [db._job_backoff(attempts) for attempts in range(1, 10)]
+    assert delays[:4] == [db.JOB_BACKOFF_BASE * 2 ** n for n in range(4)]
+    assert delays[-1] == db.JOB_BACKOFF_MAX
+    assert delays == sorted(delays)
+
+
+def test_failed_job_waits_for_its_backoff(db, user_id, no_jitter):
+    (job_id,) = _enqueue(db, user_id)
+    db.claim_analysis_job("a")
+    before = time.time()
+    assert db.fail_analysis_job(job_id, "a", "boom") == "queued"
+
+    job = db.get_analysis_job(job_id)
+    assert job["run_after"] >= before + db.JOB_BACKOFF_BASE
+    assert job["last_error"] == "boom"
+    assert db.claim_analysis_job("a") is None
+
+    _make_runnable(db, job_id)
+    db.claim_analysis_job("a")
+    before = time.time()
+    db.fail_analysis_job(job_id, "a", "boom")
+    assert db.get_analysis_job(job_id)["run_after"] >= before + 2 * db.JOB_BACKOFF_BASE
+
+
+def test_job_is_dead_after_max_attempts(db, user_id):
+    (job_id,) = _enqueue(db, user_id, max_attempts=2)
+    db.claim_analysis_job("a")
+    assert db.fail_analysis_job(job_id, "a", "boom") == "queued"
+    _make_runnable(db, job_id)
+    db.claim_analysis_job("a")
+    assert db.fail_analysis_job(job_id, "a", "boom") == "dead"
+    _make_runnable(db, job_id)
+    assert db.claim_analysis_job("a") is None
+
+    assert db.retry_analysis_job(job_id) is True
+    assert db.retry_analysis_job(job_id) is False  # no longer dead
+    assert db.claim_analysis_job("a")["attempts"] == 1
+
+
+def test_expired_lease_on_last_attempt_is_dead(db, user_id):
+    (job_id,) = _enqueue(db, user_id, max_attempts=1)
+    db.claim_analysis_job("a")
+    _expire_lease(db, job_id)
+    assert db.claim_analysis_job("b") is None
+    assert db.get_analysis_job(job_id)["status"] == "dead"
+
+
+@pytest.fixture
+def worker_cache(monkeypatch):
+    cache = ResumeCache()
+    monkeypatch.setattr(analysis_worker, "resume_cache", cache)
+    monkeypatch.setattr(analysis_worker, "extract_resume_text",
+                        lambda path, raise_errors: "Python and SQL developer")
+    return cache
+
+
+def test_worker_caches_a_committed_result(db, user_id, worker_cache):
+    (job_id,) = _enqueue(db, user_id)
+    worker = analysis_worker.AnalysisWorker("a")
+    result_id = worker.process(db.claim_analysis_job("a", worker.lease_seconds))
+
+    assert db.get_analysis_job(job_id)["result_id"] == result_id
+    assert worker_cache.get("hash0")["text"] == "Python and SQL developer"
+    assert worker_cache.stats()["memory_hits"] == 1
+
+
+def test_worker_that_lost_its_lease_writes_nothing(db, user_id, worker_cache):
+    (job_id,) = _enqueue(db, user_id)
+    stale = analysis_worker.AnalysisWorker("a")
+    job = db.claim_analysis_job("a")
+    _expire_lease(db, job_id)
+    db.claim_analysis_job("b")
+
+    with pytest.raises(analysis_worker.LeaseLost):
+        stale.process(job)
+    assert worker_cache.get("hash0") is None  # neither in memory nor on disk
+    assert db.get_latest_resume_analysis(user_id) is None
+    assert db.get_analysis_job(job_id)["lease_owner"] == "b"
@@ -0,0 +1,29 @@
+import pytest
+
+from backend import batch_ingest
+
+
+def test_analyzed_hashes_are_per_user(db, user_id):
+    db.create_user("Other", "other@example.com", "x")
+    other = db.get_user_by_email("other@example.com")["id"]
+    db.save_resume_analysis(other, "text", content_hash="h1")
+    db.save_resume_analysis(user_id, "text", content_hash="h2")
+
+    assert db.get_analyzed_content_hashes(user_id, ["h1", "h2", "h3"]) == {"h2"}
+    assert db.get_analyzed_content_hashes(other, ["h1", "h2", "h3"]) == {"h1"}
+
+
+def test_unreadable_files_are_failures(db, user_id, tmp_path, monkeypatch):
+    (tmp_path / "gone.pdf").write_bytes(b"%PDF")
+
+    def unreadable(path):
+        raise PermissionError(13, "Permission denied", path)
+
+    monkeypatch.setattr(batch_ingest, "hash_file", unreadable)
+    summary = batch_ingest.ingest_directory(str(tmp_path), user_id, workers=1)
+    assert (summary["files_seen"], summary["failed"], summary["skipped"]) == (1, 1, 0)
+
+
+def test_unknown_user_is_rejected(db, tmp_path):
+    with pytest.raises(ValueError):
+        batch_ingest.ingest_directory(str(tmp_path), user_id=999)
@@ -0,0 +1,156 @@
+import gc
+import sqlite3
+import threading
+
+import pytest
+
+
+def _emails(db):
+    return {row[0] for row in db.get_connection().execute("SELECT email FROM users")}
+
+
+def test_transaction_commits(db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO users (full_name, email, password_hash, registration_date) "
+                     "VALUES ('A', 'a@x.com', 'x', 'now')")
+    assert _emails(db) == {"a@x.com"}
+
+
+def test_nested_failure_rolls_back_only_the_savepoint(db):
+    with db.transaction():
+        db.create_user("A", "a@x.com", "x")
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.create_user("B", "b@x.com", "x")
+                raise ValueError
+        assert db.in_transaction()
+        db.create_user("C", "c@x.com", "x")
+    assert not db.in_transaction()
+    assert _emails(db) == {"a@x.com", "c@x.com"}
+
+
+def test_outer_failure_rolls_back_committed_savepoints(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            with db.transaction():
+                db.create_user("A", "a@x.com", "x")
+            raise RuntimeError
+    assert _emails(db) == set()
+    # The connection is usable again afterwards
+    db.create_user("B", "b@x.com", "x")
+    assert _emails(db) == {"b@x.com"}
+
+
+def test_three_levels_of_savepoints(db):
+    with db.transaction():
+        db.create_user("A", "a@x.com", "x")
+        with db.transaction():
+            db.create_user("B", "b@x.com", "x")
+            with pytest.raises(KeyError):
+                with db.transaction():
+                    db.create_user("C", "c@x.com", "x")
+                    raise KeyError
+            db.create_user("D", "d@x.com", "x")
+    assert _emails(db) == {"a@x.com", "b@x.com", "d@x.com"}
+
+
+def test_in_transaction_does_not_open_a_connection(db):
+    seen = []
+
+    def check():
+        seen.append((db.in_transaction(), getattr(db._local, "state", None)))
+
+    thread = threading.Thread(target=check)
+    thread.start()
+    thread.join()
+    assert seen == [(False, None)]
+
+
+def test_thread_connections_close_when_the_thread_ends(db):
+    conns = []
+
+    def work():
+        db.create_user("T", "t@x.com", "x")
+        conns.append(db.get_connection())
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    del thread
+    gc.collect()
+
+    with pytest.raises(Exception, match="closed"):
+        conns[0].execute("SELECT 1")
+
+
+def test_failed_commit_rolls_back(db, user_id):
+    conn = db.get_connection()
+    conn.execute("PRAGMA foreign_keys = ON")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction():
+            conn.execute("PRAGMA defer_foreign_keys = ON")  # fails at COMMIT, not here
+            conn.execute("INSERT INTO user_skills (user_id, skill, analysis_id) VALUES (?, 'sql', 1)",
+                         (user_id + 1,))
+    assert not conn.in_transaction
+    assert not db.in_transaction()
+    db.create_user("B", "b@x.com", "x")
+    assert _emails(db) == {"test@example.com", "b@x.com"}
+
+
+class _FailingRollback:
+    """Connection stand-in whose ROLLBACK fails, like one SQLite already rolled back."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if sql.startswith("ROLLBACK"):
+            raise sqlite3.OperationalError("cannot rollback - no transaction is active")
+        return self._conn.execute(sql, *args)
+
+
+@pytest.mark.parametrize("nested", [False, True])
+def test_failed_rollback_does_not_hide_the_error(db, monkeypatch, nested):
+    real = db.get_connection()
+    monkeypatch.setattr(db, "get_connection", lambda: _FailingRollback(real))
+    with pytest.raises(ValueError):
+        if nested:
+            with db.transaction():
+                with db.transaction():
+                    raise ValueError
+        else:
+            with db.transaction():
+                raise ValueError
+    assert not db.in_transaction()
+    real.execute("ROLLBACK")
+
+
+def _register_elsewhere(db, email):
+    with sqlite3.connect(db.DB_PATH) as other:  # stands in for another process
+        other.execute("INSERT INTO users (full_name, email, password_hash, registration_date) "
+                      "VALUES ('N', ?, 'x', 'now')", (email,))
+
+
+def test_unknown_email_needs_no_query(db, monkeypatch):
+    monkeypatch.setattr(db, "EMAIL_FILTER_REFRESH", 3600.0)
+    db.rebuild_email_filter()
+    skips = db.user_cache_stats()["bloom_skips"]
+    assert db.get_user_by_email("nobody@x.com") is None
+    assert db.user_cache_stats()["bloom_skips"] == skips + 1
+
+    # Registered in this process: known at once
+    db.create_user("A", "a@x.com", "x")
+    assert db.get_user_by_email("a@x.com")["email"] == "a@x.com"
+
+
+def test_registration_elsewhere_is_seen_after_refresh(db, monkeypatch):
+    monkeypatch.setattr(db, "EMAIL_FILTER_REFRESH", 3600.0)
+    db.rebuild_email_filter()
+    _register_elsewhere(db, "new@x.com")
+    assert db.get_user_by_email("new@x.com") is None  # within the refresh interval
+
+    monkeypatch.setattr(db, "EMAIL_FILTER_REFRESH", 0.0)
+    skips = db.user_cache_stats()["bloom_skips"]
+    assert db.get_user_by_email("new@x.com")["email"] == "new@x.com"
+    assert db.get_user_by_email("still-nobody@x.com") is None
+    assert db.user_cache_stats()["bloom_skips"] == skips  # both misses queried
@@ -0,0 +1,50 @@
+from backend import job_matcher, posting_dedup
+
+
+def test_posting_text_tolerates_null_fields():
+    # Scraped rows store NULL for a missing description or tag list
+    posting = {"title": "Zebra Keeper", "tags": None, "description": None}
+    assert job_matcher.posting_text(posting).split() == ["Zebra", "Keeper"]
+    assert job_matcher.posting_text({"title": None}).strip() == ""
+
+
+def test_job_index_search_skips_null_fields():
+    index = job_matcher.JobIndex([
+        {"id": 1, "title": "Zebra Keeper", "tags": None, "description": None},
+        {"id": 2, "title": None, "tags": ["llama"], "description": "llama grooming"},
+    ])
+    assert [job["id"] for job in index.search("zebra")] == [1]
+    assert [job["id"] for job in index.search("llama")] == [2]
+
+
+def test_job_index_remove_postings():
+    index = job_matcher.JobIndex([
+        {"id": 1, "title": "Zebra Keeper", "tags": [], "description": "zebra"},
+        {"id": 2, "title": "Llama Groomer", "tags": [], "description": "llama"},
+    ])
+    assert index.remove_postings([1, 99]) == 1
+    assert index.search("zebra") == []
+    assert [job["id"] for job in index.search("llama")] == [2]
+
+
+def _posting(n, description, title):
+    return {"source": "test", "url": f"https://jobs.example.com/{n}", "title": title,
+            "company": "Acme", "location": "Pune", "description": description,
+            "tags": ["python"], "posted_at": None}
+
+
+def test_job_index_sync_replaces_changed_postings(db, monkeypatch):
+    monkeypatch.setattr(job_matcher, "_synced_change_seq", 0)
+    db.upsert_job_postings_bulk([_posting(1, "zebra care and zebra feeding", "Zebra Keeper"),
+                                 _posting(2, "zebra care and zebra feeding", "Zebra Keeper")])
+    posting_dedup.deduplicate_new_postings()
+
+    index = job_matcher.JobIndex()
+    job_matcher._sync_stored_postings(index)
+    assert [job["id"] for job in index.search("zebra", top_k=5)] == [1]
+
+    db.upsert_job_postings_bulk([_posting(1, "llama grooming", "Llama Groomer")])
+    job_matcher._sync_stored_postings(index)
+    assert [job["id"] for job in index.search("zebra", top_k=5)] == [2]
+    assert [job["id"] for job in index.search("llama", top_k=5)] == [1]
+    assert job_matcher._sync_stored_postings(index) == 0
@@ -0,0 +1,148 @@
+import json
+import sqlite3
+
+from utils import migrations
+
+
+def _rows(conn, sql, params=()):
+    return [tuple(row) for row in conn.execute(sql, params)]
+
+
+def test_fresh_database_reaches_latest_version(db):
+    conn = db.get_connection()
+    assert migrations.get_schema_version(conn) == migrations.latest_version()
+    # Running again is a no-op
+    assert migrations.run_migrations(conn) == []
+
+
+def test_migration_versions_are_increasing():
+    versions = [version for version, _, _ in migrations.MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_hot_queries_use_indexes(db):
+    for name, details in migrations.explain_hot_queries(db.get_connection()).items():
+        for detail in details:
+            assert "TEMP B-TREE" not in detail, name
+            assert not (detail.startswith("SCAN") and "INDEX" not in detail
+                        and "VIRTUAL TABLE" not in detail), name
+
+
+def test_search_index_follows_store_and_prune(db, user_id):
+    db.save_resume_analysis(user_id, "Kubernetes operator written in golang")
+    db.save_resume_analysis(user_id, "Kubernetes operator written in golang")
+    other = db.save_resume_analysis(user_id, "Pandas and numpy notebooks")
+
+    hits = db.search_resumes("kubernetes")["results"]
+    assert len(hits) == 2  # one per analysis, though the text is stored once
+    assert "[Kubernetes]" in hits[0]["snippet"]
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM resume_analysis WHERE id != ?", (other,))
+    assert db.prune_text_blobs() == 1
+    assert db.search_resumes("kubernetes")["results"] == []
+    assert len(db.search_resumes("pandas")["results"]) == 1
+    conn = db.get_connection()
+    conn.execute("INSERT INTO resume_search (resume_search) VALUES ('integrity-check')")
+
+
+def test_text_blobs_writable_without_inflate_text(db):
+    # Triggers must not depend on the app's Python UDFs (sqlite3 shell, backups)
+    with sqlite3.connect(db.DB_PATH) as conn:
+        conn.execute(
+            "INSERT INTO text_blobs (hash, codec, raw_size, data, created_at) "
+            "VALUES ('h', 'raw', 3, x'616263', 'now')"
+        )
+        conn.execute("DELETE FROM text_blobs WHERE hash = 'h'")
+
+
+def test_latest_analysis_includes_text(db, user_id):
+    db.save_resume_analysis(user_id, "first")
+    db.save_resume_analysis(user_id, "second resume text " * 20)
+    analysis = db.get_latest_resume_analysis(user_id)
+    assert analysis["extracted_text"] == "second resume text " * 20
+    assert dict(analysis)["extracted_text"] == "second resume text " * 20
+    assert db.get_resume_text(analysis["text_hash"]) == "second resume text " * 20
+
+
+def test_latest_analysis_text_is_decompressed_on_access(db, user_id, monkeypatch):
+    from utils import text_blobs
+
+    db.save_resume_analysis(user_id, "resume text " * 50)
+    calls = []
+    real = text_blobs.decompress_text
+    monkeypatch.setattr(text_blobs, "decompress_text", lambda *a: calls.append(a) or real(*a))
+
+    analysis = db.get_latest_resume_analysis(user_id)
+    assert analysis["user_id"] == user_id and "extracted_text" in analysis
+    assert calls == []
+    assert analysis.get("extracted_text") == analysis["extracted_text"]
+    assert len(calls) == 1
+
+
+def test_posting_change_seq_tracks_real_changes(db):
+    posting = {"source": "s", "url": "https://jobs/1", "title": "Dev", "company": "c",
+               "location": "l", "description": "build things", "tags": [], "posted_at": None}
+    db.upsert_job_postings_bulk([posting])
+    conn = db.get_connection()
+    seq = conn.execute("SELECT change_seq FROM job_postings").fetchone()[0]
+
+    db.upsert_job_postings_bulk([posting])  # re-scrape, nothing changed
+    assert conn.execute("SELECT change_seq FROM job_postings").fetchone()[0] == seq
+
+    db.upsert_job_postings_bulk([dict(posting, description="build other things")])
+    assert conn.execute("SELECT change_seq FROM job_postings").fetchone()[0] > seq
+
+
+def test_job_posting_iterators_page_past_page_size(db):
+    postings = [{"source": "s", "url": f"https://jobs/{n}", "title": f"Dev {n}", "company": "c",
+                 "location": "l", "description": "d", "tags": ["x"], "posted_at": None}
+                for n in range(7)]
+    db.upsert_job_postings_bulk(postings)
+
+    assert [p["title"] for p in db.iter_job_postings(page_size=3)] == [f"Dev {n}" for n in range(7)]
+    assert [p["id"] for p in db.iter_job_postings(after_id=5, page_size=1)] == [6, 7]
+    changed = list(db.iter_changed_job_postings(page_size=2))
+    assert len(changed) == 7 and changed[0]["tags"] == ["x"]
+
+
+def test_skill_counts_follow_analyses(db, user_id):
+    conn = db.get_connection()
+    first = db.save_resume_analysis(user_id, "a", identified_skills=json.dumps(["SQL", "sql", "Python"]))
+    db.save_resume_analysis(user_id, "b", identified_skills=json.dumps(["sql"]))
+    counts = dict(_rows(conn, "SELECT skill, analyses FROM skill_counts"))
+    assert counts == {"SQL": 2, "Python": 1}
+    assert sorted(db.get_user_skills(user_id)) == ["sql"]
+
+    with db.transaction() as conn:
+        conn.execute("UPDATE resume_analysis SET identified_skills = ? WHERE id = ?",
+                     (json.dumps(["Python", "PYTHON"]), first))
+    assert dict(_rows(conn, "SELECT skill, analyses FROM skill_counts")) == {"SQL": 1, "Python": 1}
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM resume_analysis")
+    assert _rows(conn, "SELECT * FROM skill_counts") == []
+    assert _rows(conn, "SELECT * FROM user_skills") == []
+
+
+def test_role_counts_follow_recommendations(db, user_id):
+    db.save_job_recommendation(user_id, "Data Engineer", "Acme", "Pune", "Pipelines", "https://x/1", 80.0)
+    db.save_job_recommendation(user_id, "Data Engineer", "Beta", "Pune", "Pipelines", "https://x/2", 70.0)
+    conn = db.get_connection()
+    assert _rows(conn, "SELECT job_title, recommendations FROM role_counts") == [("Data Engineer", 2)]
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM job_recommendations")
+    assert _rows(conn, "SELECT * FROM role_counts") == []
+
+
+def test_cohort_queries_read_the_counts(db, user_id):
+    db.create_user("Other", "other@example.com", "x")
+    other = db.get_user_by_email("other@example.com")["id"]
+    db.save_resume_analysis(user_id, "a", identified_skills=json.dumps(["SQL", "Python"]))
+    db.save_resume_analysis(other, "b", identified_skills=json.dumps(["sql"]))
+
+    assert db.count_users_with_skill("Sql") == 2
+    assert db.count_users_with_skill("python") == 1
+    top = db.get_top_skills(5, month=db.current_month())
+    assert [(row["skill"].lower(), row["analyses"]) for row in top] == [("sql", 2), ("python", 1)]
@@ -0,0 +1,74 @@
+from backend import posting_dedup
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to design, build and operate payment "
+    "APIs in Python and PostgreSQL, review code, mentor juniors and keep "
+    "our services fast and reliable for millions of users every day."
+)
+
+
+def _posting(n, description, title="Backend Engineer"):
+    return {"source": "test", "url": f"https://jobs.example.com/{n}", "title": title,
+            "company": "Acme", "location": "Pune", "description": description,
+            "tags": ["python"], "posted_at": None}
+
+
+def _canonical(db):
+    return dict(db.get_connection().execute("SELECT id, canonical_id FROM job_postings"))
+
+
+def test_near_duplicates_point_at_one_canonical(db):
+    db.upsert_job_postings_bulk([
+        _posting(1, DESCRIPTION),
+        _posting(2, DESCRIPTION + " Apply today."),
+        _posting(3, "Farm hand wanted to look after goats, fences and an old tractor."),
+    ])
+    summary = posting_dedup.deduplicate_new_postings()
+    assert summary == {"checked": 3, "duplicates": 1}
+    assert _canonical(db) == {1: None, 2: 1, 3: None}
+
+    # Already signed postings are not checked again
+    assert posting_dedup.deduplicate_new_postings() == {"checked": 0, "duplicates": 0}
+    assert posting_dedup.dedup_stats() == {"postings": 3, "duplicates": 1, "unsigned": 0}
+
+
+def test_editing_a_canonical_releases_its_duplicates(db):
+    db.upsert_job_postings_bulk([_posting(1, DESCRIPTION), _posting(2, DESCRIPTION)])
+    posting_dedup.deduplicate_new_postings()
+    assert _canonical(db) == {1: None, 2: 1}
+
+    db.upsert_job_postings_bulk([_posting(1, "Now a farm job with goats and a tractor and fences.")])
+    assert _canonical(db) == {1: None, 2: None}
+    assert posting_dedup.dedup_stats()["unsigned"] == 2
+    posting_dedup.deduplicate_new_postings()
+    assert _canonical(db) == {1: None, 2: None}
+
+
+def test_signing_starts_from_the_mark(db):
+    db.upsert_job_postings_bulk([_posting(n, f"posting number {n} " * 5) for n in range(1, 6)])
+    assert posting_dedup.deduplicate_new_postings(batch_size=2)["checked"] == 5
+    mark = db.get_dedup_mark()
+    assert mark == db.get_connection().execute("SELECT MAX(change_seq) FROM job_postings").fetchone()[0]
+    assert db.get_unsigned_job_postings(after_seq=0) == []
+
+    db.upsert_job_postings_bulk([_posting(6, DESCRIPTION)])
+    assert [p["id"] for p in db.get_unsigned_job_postings(after_seq=mark)] == [6]
+
+
+def test_rolled_back_batch_keeps_the_mark(db):
+    db.upsert_job_postings_bulk([_posting(1, DESCRIPTION)])
+    posting_dedup.deduplicate_new_postings()
+    mark = db.get_dedup_mark()
+
+    try:
+        with db.transaction():
+            db.upsert_job_postings_bulk([_posting(2, "Farm hand wanted for goats and tractors.")])
+            posting_dedup.deduplicate_new_postings()
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert db.get_dedup_mark() == mark
+
+    # The rolled-back change_seq values are handed out again and still signed
+    db.upsert_job_postings_bulk([_posting(3, DESCRIPTION + " Apply today.")])
+    assert posting_dedup.deduplicate_new_postings() == {"checked": 1, "duplicates": 1}
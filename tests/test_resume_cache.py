@@ -0,0 +1,71 @@
+from backend.resume_cache import ResumeCache, hash_bytes
+
+
+def _analysis(version=1):
+    return {"clean_text": "python sql", "skills": ["python", "sql"], "analyzer_version": version}
+
+
+def test_miss_then_memory_hit(db):
+    cache = ResumeCache()
+    key = hash_bytes(b"resume")
+    assert cache.get(key) is None
+
+    cache.put(key, "uploads/a.pdf", "python sql", _analysis())
+    assert cache.get(key)["text"] == "python sql"
+    assert cache.stats() == {
+        "memory_hits": 1, "disk_hits": 0, "misses": 1, "hit_rate": 0.5, "memory_entries": 1,
+    }
+
+
+def test_disk_hit_restores_clean_text(db):
+    key = hash_bytes(b"resume")
+    ResumeCache().put(key, "uploads/a.pdf", "python sql", _analysis())
+
+    # A new process starts with an empty LRU and falls back to resume_cache
+    cache = ResumeCache()
+    entry = cache.get(key)
+    assert entry == {"file_path": "uploads/a.pdf", "text": "python sql", "analysis": _analysis()}
+    assert cache.get(key) is entry
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_clean_text_is_not_stored_twice(db):
+    key = hash_bytes(b"resume")
+    ResumeCache().put(key, "uploads/a.pdf", "python sql", _analysis())
+    assert "clean_text" not in db.get_resume_cache_entry(key)["analysis"]
+
+
+def test_lru_evicts_least_recently_used(db):
+    cache = ResumeCache(max_size=2)
+    keys = [hash_bytes(bytes([n])) for n in range(3)]
+    cache.put(keys[0], "a", "a", _analysis())
+    cache.put(keys[1], "b", "b", _analysis())
+    cache.get(keys[0])  # keys[1] is now the oldest
+    cache.put(keys[2], "c", "c", _analysis())
+
+    assert list(cache._entries) == [keys[0], keys[2]]
+    assert cache.stats()["memory_entries"] == 2
+    # Evicted entries are still on disk
+    assert cache.get(keys[1])["text"] == "b"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_new_upload_replaces_both_levels(db):
+    key = hash_bytes(b"resume")
+    cache = ResumeCache()
+    cache.put(key, "uploads/a.pdf", "python sql", _analysis(version=1))
+    # The dashboard re-analyses under a new analyzer version and stores it again
+    cache.put(key, "uploads/b.pdf", "python sql", _analysis(version=2))
+
+    assert cache.get(key)["analysis"]["analyzer_version"] == 2
+    fresh = ResumeCache().get(key)
+    assert fresh["file_path"] == "uploads/b.pdf"
+    assert fresh["analysis"]["analyzer_version"] == 2
+
+
+def test_different_content_is_a_miss(db):
+    cache = ResumeCache()
+    cache.put(hash_bytes(b"old resume"), "a", "old", _analysis())
+    assert cache.get(hash_bytes(b"new resume")) is None
+    assert cache.stats()["misses"] == 1
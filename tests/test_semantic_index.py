@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from backend import job_matcher, semantic_index
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to design, build and operate payment "
+    "APIs in Python and PostgreSQL, review code, mentor juniors and keep "
+    "our services fast and reliable for millions of users every day."
+)
+
+
+def _posting(n, description, title="Backend Engineer", tags=("python",)):
+    return {"source": "test", "url": f"https://jobs.example.com/{n}", "title": title,
+            "company": "Acme", "location": "Pune", "description": description,
+            "tags": list(tags), "posted_at": None}
+
+
+@pytest.fixture
+def no_catalog(monkeypatch):
+    monkeypatch.setattr(semantic_index, "_job_index", None)
+    monkeypatch.setattr(job_matcher, "load_catalog", lambda: [])
+
+
+def test_vector_index_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, semantic_index.DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = np.arange(1000, 1300)
+    chunks = [(ids[i:i + 100], vectors[i:i + 100]) for i in range(0, 300, 100)]
+
+    directory = tmp_path / "index"
+    built = semantic_index.VectorIndex.build(directory, chunks, nlist=8,
+                                             extra_files={"extra.json": [1, 2]})
+    loaded = semantic_index.VectorIndex(directory)
+    assert len(loaded) == len(built) == 300
+    assert sorted(loaded.ids.tolist()) == ids.tolist()
+    assert (directory / "extra.json").exists()
+
+    for row in (0, 123, 299):
+        found, scores = loaded.search(vectors[row], k=1, exact=True)
+        assert found[0] == ids[row]
+        found, _ = loaded.search(vectors[row], k=1, nprobe=8)
+        assert found[0] == ids[row]
+
+    # A rebuild swaps the directory whole and leaves nothing behind
+    semantic_index.VectorIndex.build(directory, chunks[:1], nlist=2)
+    assert len(semantic_index.VectorIndex(directory)) == 100
+    assert not (tmp_path / "index.old").exists()
+    assert not (tmp_path / "index.building").exists()
+
+
+def test_vector_index_rejects_other_versions(tmp_path):
+    directory = tmp_path / "index"
+    semantic_index.VectorIndex.build(directory, [])
+    meta = (directory / "meta.json").read_text()
+    (directory / "meta.json").write_text(meta.replace(f'"version": {semantic_index.INDEX_VERSION}',
+                                                      '"version": 0'))
+    with pytest.raises(ValueError):
+        semantic_index.VectorIndex(directory)
+
+
+def test_get_job_index_reloads_after_rebuild(db, tmp_path, no_catalog):
+    directory = tmp_path / "jobs"
+    db.upsert_job_postings_bulk([_posting(1, DESCRIPTION)])
+
+    semantic_index.build_job_index(directory)
+    index, postings = semantic_index.get_job_index(directory)
+    assert len(index) == len(postings) == 1
+
+    db.upsert_job_postings_bulk([_posting(2, "Farm hand wanted for goats and tractors.")])
+    semantic_index.build_job_index(directory)
+    index, postings = semantic_index.get_job_index(directory)
+    assert len(index) == len(postings) == 2
+
+
+def test_build_pages_through_many_postings(db, tmp_path, no_catalog, monkeypatch):
+    from utils import database
+
+    real = database.iter_job_postings
+    monkeypatch.setattr(database, "iter_job_postings", lambda: real(page_size=2))
+    db.upsert_job_postings_bulk([_posting(n, f"{DESCRIPTION} Team {n}.") for n in range(5)])
+    index = semantic_index.build_job_index(tmp_path / "jobs")
+    assert len(index) == 5
+
+
+def test_null_posting_fields_are_indexed(db, tmp_path, no_catalog):
+    db.upsert_job_postings_bulk([_posting(1, None, tags=())])
+    with db.transaction() as conn:
+        conn.execute("UPDATE job_postings SET tags = NULL")
+    index = semantic_index.build_job_index(tmp_path / "jobs")
+    assert len(index) == 1
+
+
+def test_get_job_index_ignores_other_versions(db, tmp_path, no_catalog, capsys):
+    directory = tmp_path / "jobs"
+    db.upsert_job_postings_bulk([_posting(1, DESCRIPTION)])
+    semantic_index.build_job_index(directory)
+    meta = (directory / "meta.json").read_text()
+    (directory / "meta.json").write_text(meta.replace(f'"version": {semantic_index.INDEX_VERSION}',
+                                                      '"version": 0'))
+
+    assert semantic_index.get_job_index(directory) == (None, None)
+    assert semantic_index.get_job_index(directory) == (None, None)
+    assert capsys.readouterr().out.count("Ignoring index") == 1
+
+    semantic_index.build_job_index(directory)
+    index, postings = semantic_index.get_job_index(directory)
+    assert len(index) == len(postings) == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from backend.skill_matcher import SkillMatcher, get_skill_matcher, load_taxonomy
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    path = tmp_path / "skills.txt"
+    path.write_text(
+        "# canonical | aliases\n"
+        "java | core java\n"
+        "javascript | js\n"
+        "sql\n"
+        "mysql | my sql\n"
+        "c++ | cpp\n"
+        "c#\n"
+        "node.js | nodejs\n"
+        "react\n"
+        "react native\n",
+        encoding="utf-8",
+    )
+    return SkillMatcher(load_taxonomy(path))
+
+
+def test_taxonomy_maps_aliases_to_canonical(tmp_path):
+    path = tmp_path / "skills.txt"
+    path.write_text("# comment\n\nJavaScript | JS |  Vanilla   JS\n", encoding="utf-8")
+    assert load_taxonomy(path) == {
+        "javascript": "javascript", "js": "javascript", "vanilla js": "javascript",
+    }
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("Java", ["java"]),
+    ("JavaScript", ["javascript"]),
+    ("Java and JavaScript", ["java", "javascript"]),
+    ("Core Java, JS", ["java", "javascript"]),
+    ("MySQL", ["mysql"]),
+    ("SQL and MySQL", ["sql", "mysql"]),
+    ("nosql", []),
+])
+def test_whole_words_only(matcher, text, skills):
+    assert matcher.extract(text) == skills
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("C++, C# and Node.js.", ["c++", "c#", "node.js"]),
+    ("cpp/nodejs", ["c++", "node.js"]),
+    ("c", []),
+    ("node", []),
+])
+def test_symbols_are_part_of_the_token(matcher, text, skills):
+    assert matcher.extract(text) == skills
+
+
+def test_longest_match_wins(matcher):
+    assert matcher.extract("React Native and React") == ["react native", "react"]
+
+
+def test_repeats_are_reported_once_in_order(matcher):
+    assert matcher.extract("sql, java, SQL") == ["sql", "java"]
+
+
+@pytest.mark.parametrize("text", [
+    "I excel at planning",
+    "swift delivery",
+    "a spark of curiosity",
+    "rust on the hull",
+    "awk ward",
+])
+def test_english_words_are_not_skills(text):
+    assert get_skill_matcher().extract(text) == []
+
+
+def test_qualified_forms_still_match():
+    skills = get_skill_matcher().extract("Swift programming, Apache Spark, rust lang")
+    assert skills == ["swift programming", "apache spark", "rust lang"]
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from utils import write_behind
+from utils.write_behind import WriteBehindWriter
+
+
+@pytest.fixture
+def writer(db):
+    writer = WriteBehindWriter(max_batch=50, max_delay=0)
+    yield writer
+    writer.close()
+
+
+def _emails(db):
+    return {row[0] for row in db.get_connection().execute("SELECT email FROM users")}
+
+
+def test_failing_call_fails_only_its_own_future(db, writer):
+    db.create_user("A", "a@x.com", "x")
+    futures = [
+        writer.submit(db.create_user, "B", "b@x.com", "x"),
+        writer.submit(db.create_user, "Dup", "a@x.com", "x"),  # UNIQUE violation
+        writer.submit(db.create_user, "C", "c@x.com", "x"),
+    ]
+    assert futures[0].result(timeout=10) is None
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[1].result(timeout=10)
+    assert futures[2].result(timeout=10) is None
+    assert _emails(db) == {"a@x.com", "b@x.com", "c@x.com"}
+    assert writer.stats()["failed"] == 1
+
+
+def test_failed_begin_fails_every_future(db, writer, monkeypatch):
+    monkeypatch.setattr(db, "BUSY_TIMEOUT_MS", 100)
+    blocker = sqlite3.connect(db.DB_PATH, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        futures = [writer.submit(db.create_user, f"U{i}", f"u{i}@x.com", "x") for i in range(3)]
+        for future in futures:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                future.result(timeout=write_behind.WRITE_RESULT_TIMEOUT)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+    # The writer keeps going once the lock is free
+    writer.submit(db.create_user, "Later", "later@x.com", "x").result(timeout=10)
+    assert _emails(db) == {"later@x.com"}
+
+
+def test_cancelled_future_is_skipped(db, writer):
+    writer.flush(timeout=10)
+    futures = [writer.submit(db.create_user, f"U{i}", f"u{i}@x.com", "x") for i in range(20)]
+    cancelled = [f for f in futures if f.cancel()]
+    writer.flush(timeout=10)
+    assert len(_emails(db)) == len(futures) - len(cancelled)
+
+
+def test_closed_writer_rejects_calls(db):
+    writer = WriteBehindWriter()
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(db.create_user, "A", "a@x.com", "x")
+
+
+def test_inline_write_returns_failed_future(db, monkeypatch):
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND", False)
+    db.create_user("A", "a@x.com", "x")
+    future = write_behind.write(db.create_user, "Dup", "a@x.com", "x")
+    assert future.done()
+    assert isinstance(future.exception(), sqlite3.IntegrityError)
@@ -1,163 +1,556 @@
+import atexit
+import json
+import os
+import random
 import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
+from utils.metrics import instrument
+from utils.migrations import run_migrations
+from utils.text_blobs import (
+    LazyTextRow,
+    compress_text,
+    decompress_text,
+    register_sql_functions,
+    text_hash,
+)
+from utils.user_cache import BloomFilter, TTLCache
+
 # Base folder = project root (springboard_intern)
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = BASE_DIR / "data" / "app.db"
+# RESUME_APP_DB points the app (and its workers) at another database file
+DB_PATH = Path(os.environ.get("RESUME_APP_DB", BASE_DIR / "data" / "app.db"))
 
+# Connection tuning (applied once per connection)
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000           # negative cache_size means KiB
+MMAP_SIZE = 256 * 1024 * 1024
+SYNCHRONOUS = "NORMAL"          # safe with WAL, one fsync per checkpoint
 
-def get_connection():
-    """Return a connection to the SQLite database."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)  # ensure /data exists
-    conn = sqlite3.connect(DB_PATH)
+# User lookup cache (per process)
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 300.0          # seconds; bounds staleness across processes
+EMAIL_FILTER_ERROR_RATE = 0.01
+EMAIL_FILTER_REFRESH = 2.0      # seconds; how late a miss may learn of other processes' users
+
+_local = threading.local()
+_all_threads = weakref.WeakSet()   # every live _ThreadConnections
+_all_connections_lock = threading.Lock()
+_generation = 0  # bumped by close_all_connections() to invalidate every thread
+
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+_user_cache = TTLCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_email_filters = {}             # db path -> {"bloom", "max_id", "checked_at"}
+_email_filter_lock = threading.Lock()
+_email_filter_skips = 0
+
+
+def _open_connection(path: str):
+    """Open and tune a new connection. Transactions are managed explicitly."""
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,  # so another thread can close it (exit, thread end)
+    )
     conn.row_factory = sqlite3.Row  # access columns by name
+    register_sql_functions(conn)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
     return conn
 
 
+def _close_each(conns: dict):
+    for conn in list(conns.values()):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    conns.clear()
+
+
+class _ThreadConnections:
+    """
+    One thread's connections (by database path) and transaction depth.
+    Only the thread's threading.local refers to it, so when the thread
+    ends (Streamlit starts a new one for every rerun) the finalizer
+    closes its connections instead of leaving them open until exit.
+    """
+
+    def __init__(self):
+        self.connections = {}
+        self.generation = _generation
+        self.depth = 0
+        self.finalizer = weakref.finalize(self, _close_each, self.connections)
+
+
+def _thread_state() -> _ThreadConnections:
+    state = getattr(_local, "state", None)
+    if state is None or state.generation != _generation:
+        state = _local.state = _ThreadConnections()
+        with _all_connections_lock:
+            _all_threads.add(state)
+    return state
+
+
+def get_connection():
+    """
+    Return this thread's connection to the SQLite database.
+    Connections are reused for the life of the thread and closed when it
+    ends; do not close them.
+    """
+    path = str(DB_PATH)
+    conns = _thread_state().connections
+
+    conn = conns.get(path)
+    if conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)  # ensure /data exists
+        conn = conns[path] = _open_connection(path)
+    return conn
+
+
+@contextmanager
+def transaction():
+    """
+    Run a block of statements in one transaction on this thread's connection.
+    Commits on success, rolls back on error. Nested blocks use savepoints,
+    so only the outermost block commits.
+    """
+    conn = get_connection()
+    state = _thread_state()
+    depth = state.depth
+
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute(f"SAVEPOINT sp_{depth}")
+
+    state.depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        _rollback(conn, depth)
+        raise
+    else:
+        try:
+            conn.execute("COMMIT" if depth == 0 else f"RELEASE sp_{depth}")
+        except BaseException:
+            # A failed COMMIT (deferred constraint, disk full) leaves the
+            # transaction open; undo it so the connection is usable again
+            _rollback(conn, depth)
+            raise
+    finally:
+        state.depth = depth
+
+
+def _rollback(conn, depth: int):
+    """
+    Undo a transaction() block. Errors are swallowed: SQLite may already
+    have rolled back on its own, and the caller re-raises the error that
+    got us here, which is the one worth seeing.
+    """
+    try:
+        if depth == 0:
+            conn.execute("ROLLBACK")
+        else:
+            conn.execute(f"ROLLBACK TO sp_{depth}")
+            conn.execute(f"RELEASE sp_{depth}")
+    except sqlite3.Error:
+        pass
+
+
+def in_transaction() -> bool:
+    """True inside a transaction() block on this thread."""
+    state = getattr(_local, "state", None)
+    return state is not None and state.generation == _generation and state.depth > 0
+
+
+def close_all_connections():
+    """Close every pooled connection (called automatically at exit)."""
+    global _generation
+    with _all_connections_lock:
+        states = list(_all_threads)
+        _all_threads.clear()
+        _generation += 1
+
+    for state in states:
+        state.finalizer()
+
+
+def _forget_connections_after_fork():
+    # A forked child must never reuse the parent's sqlite handles
+    global _local, _all_threads, _all_connections_lock
+    for state in list(_all_threads):
+        state.finalizer.detach()
+    _local = threading.local()
+    _all_threads = weakref.WeakSet()
+    _all_connections_lock = threading.Lock()
+
+
+atexit.register(close_all_connections)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_connections_after_fork)
+
+
+@instrument()
 def init_db():
-    """Create tables if they don't exist."""
+    """
+    Create or upgrade the schema to the latest migration.
+    Runs at most once per process per database; later calls return at once.
+    """
+    path = str(DB_PATH)
+    if path in _initialized_paths:
+        return
+
+    with _init_lock:
+        if path in _initialized_paths:
+            return
+        run_migrations(get_connection())
+        rebuild_email_filter()
+        _initialized_paths.add(path)
+
+
+# USER CACHE + EMAIL BLOOM FILTER
+# get_user_by_email() is hit by every login and registration. Emails that
+# were never registered are answered by the Bloom filter without a query;
+# known users are served from a TTL/LRU cache. Writes invalidate both.
+
+
+@instrument()
+def rebuild_email_filter():
+    """Rebuild the registered-email Bloom filter from the users table."""
     conn = get_connection()
-    cur = conn.cursor()
+    count, max_id = conn.execute("SELECT COUNT(*), MAX(id) FROM users").fetchone()
 
-    # Users table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            full_name TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            registration_date TEXT NOT NULL,
-            resume_path TEXT
-        );
-        """
-    )
+    # Leave room to grow before the false-positive rate degrades
+    bloom = BloomFilter(max(10_000, 2 * count), EMAIL_FILTER_ERROR_RATE)
+    for (email,) in conn.execute("SELECT email FROM users"):
+        bloom.add(email)
 
-    # Resume Analysis table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS resume_analysis (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            extracted_text TEXT NOT NULL,
-            analysis_scores TEXT,
-            strengths TEXT,
-            weaknesses TEXT,
-            identified_skills TEXT,
-            recommended_skills TEXT,
-            analysis_timestamp TEXT NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-        """
-    )
+    with _email_filter_lock:
+        _email_filters[str(DB_PATH)] = {
+            "bloom": bloom,
+            "max_id": max_id or 0,
+            "checked_at": time.monotonic(),
+        }
 
-    # Job Recommendations table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS job_recommendations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            job_title TEXT,
-            company_name TEXT,
-            location TEXT,
-            job_description TEXT,
-            job_url TEXT,
-            match_percentage REAL,
-            scraping_date TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-        """
-    )
 
-    conn.commit()
-    conn.close()
+def _email_maybe_registered(email: str) -> bool:
+    """
+    False if email is not in the users table. Registrations made by other
+    processes may go unseen for up to EMAIL_FILTER_REFRESH seconds.
+    """
+    global _email_filter_skips
+    state = _email_filters.get(str(DB_PATH))
+    if state is None or email in state["bloom"]:
+        return True
+
+    # This process's registrations go in through create_user(). Ones made
+    # by other processes are folded in by a rowid range query, run at most
+    # every EMAIL_FILTER_REFRESH seconds, so most misses cost no query.
+    now = time.monotonic()
+    with _email_filter_lock:
+        refresh = now - state["checked_at"] >= EMAIL_FILTER_REFRESH
+        if refresh:
+            state["checked_at"] = now
+        else:
+            _email_filter_skips += 1
+    if not refresh:
+        return False
+
+    rows = get_connection().execute(
+        "SELECT id, email FROM users WHERE id > ?", (state["max_id"],)
+    ).fetchall()
+    if rows:
+        with _email_filter_lock:
+            for user_id, new_email in rows:
+                state["bloom"].add(new_email)
+                state["max_id"] = max(state["max_id"], user_id)
+        if state["bloom"].count > state["bloom"].capacity:
+            rebuild_email_filter()
+    return any(new_email == email for _, new_email in rows)
+
 
+def _remember_email(email: str):
+    state = _email_filters.get(str(DB_PATH))
+    if state is None:
+        return
+    with _email_filter_lock:
+        state["bloom"].add(email)
+    if state["bloom"].count > state["bloom"].capacity:
+        rebuild_email_filter()
 
+
+def _forget_cached_user(user_id: int):
+    path = str(DB_PATH)
+    _user_cache.pop_where(lambda entry: entry[0] == path and entry[1]["id"] == user_id)
+
+
+def user_cache_stats() -> dict:
+    """Hit-rate statistics for the user cache and the email Bloom filter."""
+    stats = _user_cache.stats()
+    stats["bloom_skips"] = _email_filter_skips
+    lookups = stats["hits"] + stats["misses"] + _email_filter_skips
+    stats["queries_avoided_rate"] = (
+        (stats["hits"] + _email_filter_skips) / lookups if lookups else 0.0
+    )
+    state = _email_filters.get(str(DB_PATH))
+    stats["bloom"] = state["bloom"].stats() if state else None
+    return stats
+
+
+@instrument()
 def create_user(full_name: str, email: str, password_hash: str):
     """Insert a new user into the users table."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO users (full_name, email, password_hash, registration_date)
-        VALUES (?, ?, ?, ?)
-        """,
-        (full_name, email, password_hash, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO users (full_name, email, password_hash, registration_date)
+            VALUES (?, ?, ?, ?)
+            """,
+            (full_name, email, password_hash, datetime.utcnow().isoformat())
+        )
+
+    _user_cache.pop((str(DB_PATH), email))
+    _remember_email(email)
 
 
+@instrument()
 def get_user_by_email(email: str):
     """Fetch a single user row by email. Return dict or None."""
+    if not _email_maybe_registered(email):
+        return None
+
+    key = (str(DB_PATH), email)
+    cached = _user_cache.get(key)
+    if cached is not None:
+        return dict(cached[1])
+
     conn = get_connection()
     cur = conn.cursor()
     cur.execute("SELECT * FROM users WHERE email = ?", (email,))
     row = cur.fetchone()
-    conn.close()
 
     if row is None:
         return None
 
-    return dict(row)
+    user = dict(row)
+    _user_cache.set(key, (key[0], user))
+    return dict(user)
+
+
+@instrument()
+def user_exists(user_id: int) -> bool:
+    """True if a user with this id is registered."""
+    row = get_connection().execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone()
+    return row is not None
+
+
+def _store_text(conn, text: str, timestamp: str = None) -> str:
+    """Insert text into text_blobs unless already there. Returns its hash."""
+    digest = text_hash(text or "")
+    exists = conn.execute("SELECT 1 FROM text_blobs WHERE hash = ?", (digest,)).fetchone()
+    if exists is None:
+        codec, data, raw_size = compress_text(text or "")
+        cur = conn.execute(
+            """
+            INSERT INTO text_blobs (hash, codec, raw_size, data, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (digest, codec, raw_size, data, timestamp or datetime.utcnow().isoformat())
+        )
+        # Indexed here rather than by a trigger (see migration 11)
+        conn.execute(
+            "INSERT INTO resume_search (rowid, extracted_text) VALUES (?, ?)",
+            (cur.lastrowid, text or "")
+        )
+    return digest
 
 
+@instrument()
 def save_resume_analysis(user_id: int, extracted_text: str,
                          analysis_scores: str = None,
                          strengths: str = None,
                          weaknesses: str = None,
                          identified_skills: str = None,
-                         recommended_skills: str = None):
-    """Save resume analysis data for a user."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO resume_analysis (
-            user_id, extracted_text, analysis_scores,
-            strengths, weaknesses, identified_skills,
-            recommended_skills, analysis_timestamp
+                         recommended_skills: str = None,
+                         content_hash: str = None,
+                         analyzer_version: int = None):
+    """
+    Save resume analysis data for a user. The text is stored once per
+    distinct content in text_blobs; triggers update user_skills and
+    skill_counts in the same transaction. Returns the new row id.
+    """
+    with transaction() as conn:
+        digest = _store_text(conn, extracted_text)
+        cur = conn.execute(
+            """
+            INSERT INTO resume_analysis (
+                user_id, text_hash, analysis_scores,
+                strengths, weaknesses, identified_skills,
+                recommended_skills, analysis_timestamp, content_hash,
+                analyzer_version
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id,
+                digest,
+                analysis_scores,
+                strengths,
+                weaknesses,
+                identified_skills,
+                recommended_skills,
+                datetime.utcnow().isoformat(),
+                content_hash,
+                analyzer_version
+            )
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            user_id,
-            extracted_text,
-            analysis_scores,
-            strengths,
-            weaknesses,
-            identified_skills,
-            recommended_skills,
-            datetime.utcnow().isoformat()
+        return cur.lastrowid
+
+
+@instrument()
+def save_resume_analyses_bulk(records):
+    """
+    Insert many resume analyses in one transaction.
+    `records` is an iterable of dicts with user_id plus the
+    save_resume_analysis fields. Returns the number of rows inserted.
+    """
+    timestamp = datetime.utcnow().isoformat()
+    records = list(records)
+
+    with transaction() as conn:
+        hashes = {}
+        rows = []
+        for record in records:
+            text = record.get("extracted_text", "")
+            if text not in hashes:
+                hashes[text] = _store_text(conn, text, timestamp)
+            rows.append((
+                record["user_id"],
+                hashes[text],
+                record.get("analysis_scores"),
+                record.get("strengths"),
+                record.get("weaknesses"),
+                record.get("identified_skills"),
+                record.get("recommended_skills"),
+                timestamp,
+                record.get("content_hash"),
+                record.get("analyzer_version")
+            ))
+
+        conn.executemany(
+            """
+            INSERT INTO resume_analysis (
+                user_id, text_hash, analysis_scores,
+                strengths, weaknesses, identified_skills,
+                recommended_skills, analysis_timestamp, content_hash,
+                analyzer_version
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
         )
-    )
-    conn.commit()
-    conn.close()
 
+    return len(rows)
+
+
+@instrument()
+def get_analyzed_content_hashes(user_id: int, content_hashes) -> set:
+    """Return the subset of content hashes the user already has an analysis row for."""
+    content_hashes = list(content_hashes)
+    conn = get_connection()
+    found = set()
 
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(content_hashes), 500):
+        chunk = content_hashes[i:i + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT DISTINCT content_hash FROM resume_analysis "
+            f"WHERE content_hash IN ({placeholders}) AND user_id = ?",
+            chunk + [user_id]
+        ).fetchall()
+        found.update(row[0] for row in rows)
+
+    return found
+
+
+@instrument()
 def get_latest_resume_analysis(user_id: int):
-    """Get the most recent resume analysis for a user."""
+    """
+    Get the most recent resume analysis for a user, with its text from
+    text_blobs as "extracted_text". The text is decompressed on first
+    access, so callers that never read it do not pay for it.
+    """
     conn = get_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT * FROM resume_analysis
-        WHERE user_id = ?
-        ORDER BY id DESC
+        SELECT r.*, b.codec AS text_codec, b.data AS text_data
+        FROM resume_analysis r
+        LEFT JOIN text_blobs b ON b.hash = r.text_hash
+        WHERE r.user_id = ?
+        ORDER BY r.id DESC
         LIMIT 1
         """,
         (user_id,)
     )
     row = cur.fetchone()
-    conn.close()
 
     if row is None:
         return None
 
-    return dict(row)
+    analysis = dict(row)
+    codec, data = analysis.pop("text_codec"), analysis.pop("text_data")
+    return LazyTextRow(analysis, "extracted_text", codec, data)
+
+
+@instrument()
+def get_resume_text(text_hash: str):
+    """Decompress and return a stored resume text, or None if unknown."""
+    row = get_connection().execute(
+        "SELECT codec, data FROM text_blobs WHERE hash = ?", (text_hash,)
+    ).fetchone()
+    if row is None:
+        return None
+    return decompress_text(row["codec"], row["data"])
 
 
+@instrument()
+def prune_text_blobs() -> int:
+    """Delete texts no resume_analysis row refers to. Returns how many."""
+    with transaction() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, codec, data FROM text_blobs
+            WHERE NOT EXISTS (
+                SELECT 1 FROM resume_analysis WHERE text_hash = text_blobs.hash
+            )
+            """
+        ).fetchall()
+        # The search index needs the old text to remove a document
+        conn.executemany(
+            "INSERT INTO resume_search (resume_search, rowid, extracted_text) "
+            "VALUES ('delete', ?, ?)",
+            [(row["id"], decompress_text(row["codec"], row["data"])) for row in rows]
+        )
+        conn.executemany("DELETE FROM text_blobs WHERE id = ?", [(row["id"],) for row in rows])
+        return len(rows)
+
+
+@instrument()
 def save_job_recommendation(user_id: int,
                             job_title: str,
                             company_name: str,
@@ -166,59 +559,953 @@ def save_job_recommendation(user_id: int,
                             job_url: str,
                             match_percentage: float):
     """Insert a single job recommendation."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO job_recommendations (
+                user_id, job_title, company_name, location,
+                job_description, job_url, match_percentage, scraping_date
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id,
+                job_title,
+                company_name,
+                location,
+                job_description,
+                job_url,
+                match_percentage,
+                datetime.utcnow().isoformat()
+            )
+        )
+
+
+@instrument()
+def save_job_recommendations_bulk(user_id: int, jobs, analysis_id: int = None,
+                                  analyzer_version: int = None,
+                                  matcher_version: int = None):
+    """
+    Insert many job recommendations for a user in one transaction.
+    `jobs` is an iterable of dicts with the save_job_recommendation fields.
+    With analysis_id, the rows are tied to that resume_analysis row and
+    its matcher_version is updated. Returns the number of rows inserted.
+    """
+    scraping_date = datetime.utcnow().isoformat()
+    rows = [
+        (
+            user_id,
+            job.get("job_title"),
+            job.get("company_name"),
+            job.get("location"),
+            job.get("job_description"),
+            job.get("job_url"),
+            job.get("match_percentage"),
+            job.get("scraping_date") or scraping_date,
+            analysis_id,
+            analyzer_version,
+            matcher_version
+        )
+        for job in jobs
+    ]
+
+    with transaction() as conn:
+        _insert_job_recommendations(conn, rows)
+        if analysis_id is not None:
+            conn.execute(
+                "UPDATE resume_analysis SET matcher_version = ? WHERE id = ?",
+                (matcher_version, analysis_id)
+            )
+
+    return len(rows)
+
+
+def _insert_job_recommendations(conn, rows):
+    conn.executemany(
         """
         INSERT INTO job_recommendations (
             user_id, job_title, company_name, location,
-            job_description, job_url, match_percentage, scraping_date
+            job_description, job_url, match_percentage, scraping_date,
+            analysis_id, analyzer_version, matcher_version
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (
-            user_id,
-            job_title,
-            company_name,
-            location,
-            job_description,
-            job_url,
-            match_percentage,
-            datetime.utcnow().isoformat()
-        )
+        rows
     )
-    conn.commit()
-    conn.close()
 
 
+@instrument()
+def iter_job_recommendations_for_user(user_id: int, limit: int = None,
+                                      page_size: int = 100):
+    """
+    Yield a user's job recommendations newest first, one page at a time.
+    Pages are fetched with keyset pagination on (user_id, id), so memory
+    stays bounded by page_size. Stops after `limit` rows if given.
+    """
+    conn = get_connection()
+    last_id = None
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+
+        if last_id is None:
+            rows = conn.execute(
+                """
+                SELECT * FROM job_recommendations
+                WHERE user_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (user_id, size)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """
+                SELECT * FROM job_recommendations
+                WHERE user_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (user_id, last_id, size)
+            ).fetchall()
+
+        for row in rows:
+            yield dict(row)
+
+        if len(rows) < size:
+            return
+
+        last_id = rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+@instrument()
 def get_job_recommendations_for_user(user_id: int):
     """Fetch all job recommendations for a user."""
+    return list(iter_job_recommendations_for_user(user_id))
+
+@instrument()
+def update_user_resume_path(user_id: int, resume_path: str):
+    """Update the stored resume path for a user."""
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE users
+            SET resume_path = ?
+            WHERE id = ?
+            """,
+            (resume_path, user_id)
+        )
+
+    _forget_cached_user(user_id)
+
+
+@instrument()
+def get_referenced_resume_paths() -> set:
+    """Every resume file path the database still points at."""
+    rows = get_connection().execute(
+        """
+        SELECT resume_path FROM users WHERE resume_path IS NOT NULL
+        UNION
+        SELECT file_path FROM resume_cache WHERE file_path IS NOT NULL
+        UNION
+        SELECT file_path FROM analysis_jobs WHERE status IN ('queued', 'running')
+        """
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+@instrument()
+def update_user_password_hash(user_id: int, password_hash: str):
+    """Replace a user's password hash (used when upgrading the bcrypt cost)."""
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE users
+            SET password_hash = ?
+            WHERE id = ?
+            """,
+            (password_hash, user_id)
+        )
+
+    _forget_cached_user(user_id)
+
+
+@instrument()
+def get_resume_cache_entry(content_hash: str):
+    """Fetch a cached extraction/analysis by content hash. Return dict or None."""
     conn = get_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT * FROM job_recommendations
-        WHERE user_id = ?
-        ORDER BY id DESC
-        """,
-        (user_id,)
+        "SELECT * FROM resume_cache WHERE content_hash = ?",
+        (content_hash,)
     )
-    rows = cur.fetchall()
-    conn.close()
+    row = cur.fetchone()
+
+    if row is None:
+        return None
+
+    return dict(row)
+
+
+@instrument()
+def save_resume_cache_entry(content_hash: str, file_path: str,
+                            extracted_text: str, analysis: str = None):
+    """Insert or replace the cached extraction/analysis for a content hash."""
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO resume_cache (
+                content_hash, file_path, extracted_text, analysis, created_at
+            )
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                content_hash,
+                file_path,
+                extracted_text,
+                analysis,
+                datetime.utcnow().isoformat()
+            )
+        )
+
+
+# FULL-TEXT SEARCH
+# resume_search is an FTS5 index over the distinct texts in text_blobs,
+# kept in sync by _store_text() and prune_text_blobs() (see migration 11).
+# A text is indexed once, but every analysis of it is a hit, so users who
+# uploaded the same resume each show up. Queries use FTS5 syntax:
+#   kubernetes AND golang    "machine learning"    py*    "c++" NOT java
+
+SEARCH_PAGE_SIZE = 20
+SNIPPET_TOKENS = 16
+
+
+@instrument()
+def search_resumes(query: str, page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> dict:
+    """
+    Full-text search over stored resume text, best match first (bm25).
+    Returns {"results": [{id, user_id, analysis_timestamp, score, snippet}],
+    "page", "has_more"}. Raises ValueError for malformed queries.
+    """
+    page = max(1, int(page))
+    conn = get_connection()
+
+    try:
+        # One extra row tells us whether a next page exists without a COUNT(*)
+        rows = conn.execute(
+            """
+            SELECT r.id, r.user_id, r.analysis_timestamp, s.rank AS score,
+                   snippet(resume_search, 0, '[', ']', '…', ?) AS snippet
+            FROM resume_search s
+            JOIN text_blobs b ON b.id = s.rowid
+            JOIN resume_analysis r ON r.text_hash = b.hash
+            WHERE resume_search MATCH ?
+            ORDER BY s.rank
+            LIMIT ? OFFSET ?
+            """,
+            (SNIPPET_TOKENS, query, page_size + 1, (page - 1) * page_size)
+        ).fetchall()
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e) or "syntax error" in str(e):
+            raise ValueError(f"Invalid search query {query!r}: {e}") from None
+        raise
+
+    results = [dict(row) for row in rows[:page_size]]
+    for result in results:
+        # FTS5 ranks are negative bm25 scores; flip them so higher is better
+        result["score"] = -result["score"]
+
+    return {"results": results, "page": page, "has_more": len(rows) > page_size}
+
+
+def rebuild_search_index() -> tuple:
+    """Re-index every stored text. Returns (texts indexed, seconds)."""
+    started = time.perf_counter()
+    with transaction() as conn:
+        conn.execute("INSERT INTO resume_search (resume_search) VALUES ('rebuild')")
+        conn.execute("INSERT INTO resume_search (resume_search) VALUES ('optimize')")
+        count = conn.execute("SELECT COUNT(*) FROM text_blobs").fetchone()[0]
+    return count, time.perf_counter() - started
+
+
+
+# ANALYSIS JOB QUEUE
+# Durable queue for resume analysis (see backend/analysis_worker.py).
+# A worker claims a job by taking a time-limited lease and must renew it
+# with heartbeats; a job whose lease runs out (crashed worker) is handed
+# to the next claimer. Failures are retried with exponential backoff
+# until max_attempts, then the job is parked as 'dead'. Every state
+# change runs under BEGIN IMMEDIATE, so two workers can never claim the
+# same job.
+
+JOB_MAX_ATTEMPTS = 5
+JOB_LEASE_SECONDS = 60.0
+JOB_BACKOFF_BASE = 5.0          # seconds before the first retry
+JOB_BACKOFF_MAX = 600.0
+
 
+def _job_backoff(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)  # jitter spreads out retry storms
+
+
+@instrument()
+def enqueue_analysis_job(user_id: int, content_hash: str, file_path: str,
+                         max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+    """
+    Queue a resume for analysis. If the same user already has this file
+    queued or running, that job is reused. Returns the job id.
+    """
+    now = datetime.utcnow().isoformat()
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT id FROM analysis_jobs
+            WHERE user_id = ? AND content_hash = ? AND status IN ('queued', 'running')
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (user_id, content_hash)
+        ).fetchone()
+        if row is not None:
+            return row["id"]
+
+        cur = conn.execute(
+            """
+            INSERT INTO analysis_jobs (
+                user_id, content_hash, file_path, status, max_attempts,
+                run_after, created_at, updated_at
+            )
+            VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)
+            """,
+            (user_id, content_hash, file_path, max_attempts, time.time(), now, now)
+        )
+        return cur.lastrowid
+
+
+@instrument()
+def claim_analysis_job(worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS):
+    """
+    Lease the next runnable job to worker_id. Jobs whose lease expired
+    are requeued (or declared dead) first. Returns the job dict or None.
+    """
+    now = time.time()
+    stamp = datetime.utcnow().isoformat()
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                last_error = 'lease expired (worker stopped responding)',
+                lease_owner = NULL,
+                lease_expires = NULL,
+                run_after = ?,
+                updated_at = ?
+            WHERE status = 'running' AND lease_expires <= ?
+            """,
+            (now, stamp, now)
+        )
+
+        row = conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = 'running',
+                attempts = attempts + 1,
+                lease_owner = ?,
+                lease_expires = ?,
+                updated_at = ?
+            WHERE id = (
+                SELECT id FROM analysis_jobs
+                WHERE status = 'queued' AND run_after <= ?
+                ORDER BY run_after, id
+                LIMIT 1
+            )
+            RETURNING *
+            """,
+            (worker_id, now + lease_seconds, stamp, now)
+        ).fetchone()
+
+    return dict(row) if row is not None else None
+
+
+@instrument()
+def heartbeat_analysis_job(job_id: int, worker_id: str,
+                           lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+    """Extend a held lease. False means the lease was lost; stop working on the job."""
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET lease_expires = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (time.time() + lease_seconds, datetime.utcnow().isoformat(), job_id, worker_id)
+        )
+        return cur.rowcount == 1
+
+
+@instrument()
+def complete_analysis_job(job_id: int, worker_id: str, result_id: int) -> bool:
+    """
+    Mark a job done with its resume_analysis row id. Returns False if
+    worker_id no longer holds the lease; call it in the same transaction
+    as the result write and roll back in that case.
+    """
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = 'done', result_id = ?, last_error = NULL,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (result_id, datetime.utcnow().isoformat(), job_id, worker_id)
+        )
+        return cur.rowcount == 1
+
+
+@instrument()
+def fail_analysis_job(job_id: int, worker_id: str, error: str):
+    """
+    Record a failed attempt. The job is retried after a backoff, or set to
+    'dead' once it has used max_attempts. Returns the new status, or None
+    if worker_id no longer holds the lease.
+    """
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM analysis_jobs "
+            "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (job_id, worker_id)
+        ).fetchone()
+        if row is None:
+            return None
+
+        status = "dead" if row["attempts"] >= row["max_attempts"] else "queued"
+        conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = ?, last_error = ?, run_after = ?,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ?
+            """,
+            (
+                status,
+                error[:2000],
+                time.time() + _job_backoff(row["attempts"]),
+                datetime.utcnow().isoformat(),
+                job_id
+            )
+        )
+        return status
+
+
+@instrument()
+def retry_analysis_job(job_id: int) -> bool:
+    """Give a dead job a fresh set of attempts. Returns False if it was not dead."""
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = 'queued', attempts = 0, run_after = ?, updated_at = ?
+            WHERE id = ? AND status = 'dead'
+            """,
+            (time.time(), datetime.utcnow().isoformat(), job_id)
+        )
+        return cur.rowcount == 1
+
+
+@instrument()
+def get_analysis_job(job_id: int):
+    """Current state of a job (a single primary-key read, cheap to poll)."""
+    row = get_connection().execute(
+        "SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+
+# RE-ANALYSIS
+# resume_analysis rows remember which analyzer produced them and which
+# matcher produced their job_recommendations. When either version moves
+# on, backend/reanalyze.py recomputes the stale rows from the stored text.
+
+_STALE_CONDITION = """
+    (r.analyzer_version IS NOT :analyzer
+     OR (r.matcher_version IS NOT :matcher
+         AND EXISTS (SELECT 1 FROM job_recommendations j WHERE j.analysis_id = r.id)))
+"""
+
+
+@instrument()
+def count_stale_analyses(analyzer_version: int, matcher_version: int) -> int:
+    """Number of resume_analysis rows the current versions would change."""
+    return get_connection().execute(
+        f"SELECT COUNT(*) FROM resume_analysis r WHERE {_STALE_CONDITION}",
+        {"analyzer": analyzer_version, "matcher": matcher_version}
+    ).fetchone()[0]
+
+
+@instrument()
+def get_stale_analyses(analyzer_version: int, matcher_version: int,
+                       after_id: int = 0, limit: int = 500) -> list:
+    """
+    Next `limit` stale rows with id > after_id, oldest first, as dicts of
+    id, user_id, text_hash, has_recommendations.
+    """
+    rows = get_connection().execute(
+        f"""
+        SELECT r.id, r.user_id, r.text_hash,
+               EXISTS (SELECT 1 FROM job_recommendations j WHERE j.analysis_id = r.id)
+                   AS has_recommendations
+        FROM resume_analysis r
+        WHERE r.id > :after AND {_STALE_CONDITION}
+        ORDER BY r.id
+        LIMIT :limit
+        """,
+        {"analyzer": analyzer_version, "matcher": matcher_version,
+         "after": after_id, "limit": limit}
+    ).fetchall()
     return [dict(row) for row in rows]
 
-def update_user_resume_path(user_id: int, resume_path: str):
-    """Update the stored resume path for a user."""
+
+@instrument()
+def apply_reanalysis(results, matcher_version: int) -> int:
+    """
+    Write recomputed analyses in one transaction. Each result is a dict
+    with id, user_id, analysis_scores, identified_skills, analyzer_version
+    and `recommendations` (rows for save_job_recommendations_bulk, or None
+    to leave the row's recommendations alone). Returns rows updated.
+    """
+    scraping_date = datetime.utcnow().isoformat()
+    with transaction() as conn:
+        for result in results:
+            conn.execute(
+                """
+                UPDATE resume_analysis
+                SET analysis_scores = ?, identified_skills = ?, analyzer_version = ?
+                WHERE id = ?
+                """,
+                (
+                    result["analysis_scores"],
+                    result["identified_skills"],
+                    result["analyzer_version"],
+                    result["id"]
+                )
+            )
+
+            if result["recommendations"] is None:
+                continue
+
+            conn.execute(
+                "DELETE FROM job_recommendations WHERE analysis_id = ?", (result["id"],)
+            )
+            _insert_job_recommendations(conn, [
+                (
+                    result["user_id"],
+                    job.get("job_title"),
+                    job.get("company_name"),
+                    job.get("location"),
+                    job.get("job_description"),
+                    job.get("job_url"),
+                    job.get("match_percentage"),
+                    scraping_date,
+                    result["id"],
+                    result["analyzer_version"],
+                    matcher_version
+                )
+                for job in result["recommendations"]
+            ])
+            conn.execute(
+                "UPDATE resume_analysis SET matcher_version = ? WHERE id = ?",
+                (matcher_version, result["id"])
+            )
+
+    return len(results)
+
+
+
+# JOB POSTINGS
+# Filled by backend/job_scraper.py. scrape_pages keeps each listing page's
+# ETag / Last-Modified so the next run can ask "changed since?" and get a
+# 304 instead of the whole page.
+
+@instrument()
+def upsert_job_postings_bulk(postings) -> int:
+    """
+    Insert or refresh many postings in one transaction, keyed by url.
+    Each dict has source, url, title, company, location, description,
+    tags (a list) and posted_at. Returns the number of rows written.
+    """
+    now = datetime.utcnow().isoformat()
+    rows = [
+        (
+            posting["source"],
+            posting["url"],
+            posting.get("title"),
+            posting.get("company"),
+            posting.get("location"),
+            posting.get("description"),
+            json.dumps(posting.get("tags") or []),
+            posting.get("posted_at"),
+            now,
+            now
+        )
+        for posting in postings
+    ]
+
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO job_postings (
+                source, url, title, company, location,
+                description, tags, posted_at, first_seen, last_seen
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                source = excluded.source,
+                title = excluded.title,
+                company = excluded.company,
+                location = excluded.location,
+                description = excluded.description,
+                tags = excluded.tags,
+                posted_at = excluded.posted_at,
+                last_seen = excluded.last_seen
+            """,
+            rows
+        )
+
+    return len(rows)
+
+
+@instrument()
+def iter_job_postings(after_id: int = 0, page_size: int = 500):
+    """
+    Yield stored canonical postings (near-duplicates are skipped) with
+    id > after_id, oldest first, as dicts in the job catalog's shape
+    (tags decoded) plus id and source.
+    """
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
+    while True:
+        rows = conn.execute(
+            """
+            SELECT id, source, url, title, company, location, description, tags, posted_at
+            FROM job_postings
+            WHERE id > ? AND canonical_id IS NULL
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, page_size)
+        ).fetchall()
+
+        for row in rows:
+            posting = dict(row)
+            posting["tags"] = json.loads(posting["tags"] or "[]")
+            yield posting
+
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["id"]
+
+
+@instrument()
+def iter_changed_job_postings(after_seq: int = 0, page_size: int = 500):
+    """
+    Yield every stored posting, duplicates included, inserted or changed
+    after change_seq after_seq, in change order: iter_job_postings' shape
+    plus canonical_id and change_seq. Lets an index replace entries it
+    already holds (see migration 12).
+    """
+    conn = get_connection()
+    while True:
+        rows = conn.execute(
+            """
+            SELECT id, source, url, title, company, location, description, tags,
+                   posted_at, canonical_id, change_seq
+            FROM job_postings
+            WHERE change_seq > ?
+            ORDER BY change_seq
+            LIMIT ?
+            """,
+            (after_seq, page_size)
+        ).fetchall()
+
+        for row in rows:
+            posting = dict(row)
+            posting["tags"] = json.loads(posting["tags"] or "[]")
+            yield posting
+
+        if len(rows) < page_size:
+            return
+        after_seq = rows[-1]["change_seq"]
+
+
+@instrument()
+def get_page_validators(urls) -> dict:
+    """{url: {"etag", "last_modified"}} for the listing pages fetched before."""
+    urls = list(urls)
+    conn = get_connection()
+    found = {}
+
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT url, etag, last_modified FROM scrape_pages "
+            f"WHERE url IN ({placeholders})",
+            chunk
+        ).fetchall()
+        for row in rows:
+            found[row["url"]] = {"etag": row["etag"], "last_modified": row["last_modified"]}
+
+    return found
+
+
+@instrument()
+def save_scrape_pages_bulk(pages) -> int:
+    """
+    Record listing page fetches in one transaction. Each dict has url,
+    source, etag, last_modified, status and changed (False for a 304).
+    Returns the number of rows written.
+    """
+    now = datetime.utcnow().isoformat()
+    rows = [
+        (
+            page["url"],
+            page["source"],
+            page.get("etag"),
+            page.get("last_modified"),
+            page.get("status"),
+            now,
+            now if page.get("changed") else None
+        )
+        for page in pages
+    ]
+
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO scrape_pages (
+                url, source, etag, last_modified, status, fetched_at, changed_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                source = excluded.source,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                status = excluded.status,
+                fetched_at = excluded.fetched_at,
+                changed_at = COALESCE(excluded.changed_at, scrape_pages.changed_at)
+            """,
+            rows
+        )
+
+    return len(rows)
+
+
+
+# NEAR-DUPLICATE POSTINGS
+# backend/posting_dedup.py gives every new job_postings row a MinHash
+# signature. Canonical rows are also filed under one bucket per LSH band;
+# a near-duplicate gets canonical_id set instead and is left out of
+# matching.
+
+@instrument()
+def get_unsigned_job_postings(after_seq: int = 0, limit: int = 500) -> list:
+    """
+    Next `limit` postings with no signature yet and change_seq > after_seq,
+    in change order. Only the postings above after_seq are visited.
+    """
+    rows = get_connection().execute(
         """
-        UPDATE users
-        SET resume_path = ?
-        WHERE id = ?
+        SELECT p.id, p.title, p.company, p.description, p.change_seq
+        FROM job_postings p
+        WHERE p.change_seq > ?
+          AND NOT EXISTS (SELECT 1 FROM job_posting_signatures s WHERE s.posting_id = p.id)
+        ORDER BY p.change_seq
+        LIMIT ?
         """,
-        (resume_path, user_id)
-    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+        (after_seq, limit)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@instrument()
+def get_dedup_mark() -> int:
+    """change_seq up to which every posting has been signed (migration 14)."""
+    row = get_connection().execute(
+        "SELECT change_seq FROM job_posting_dedup_mark WHERE id = 1"
+    ).fetchone()
+    return row[0] if row is not None else 0
+
+
+@instrument()
+def save_dedup_mark(change_seq: int):
+    """Advance the dedup mark; call in the transaction that signed up to it."""
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE job_posting_dedup_mark SET change_seq = MAX(change_seq, ?) WHERE id = 1",
+            (change_seq,)
+        )
+
+
+@instrument()
+def get_band_candidates(band_keys) -> dict:
+    """
+    {posting_id: signature bytes} for the canonical postings filed under
+    any of the given (band, bucket) pairs.
+    """
+    band_keys = list(band_keys)
+    conn = get_connection()
+    found = {}
+
+    # Two parameters per key; stay well below SQLite's limit. Joining a
+    # VALUES list probes the primary key once per key, unlike a long OR
+    for i in range(0, len(band_keys), 250):
+        chunk = band_keys[i:i + 250]
+        pairs = ", ".join(["(?, ?)"] * len(chunk))
+        rows = conn.execute(
+            f"""
+            WITH k (band, bucket) AS (VALUES {pairs})
+            SELECT DISTINCT s.posting_id, s.signature
+            FROM k
+            JOIN job_posting_bands b ON b.band = k.band AND b.bucket = k.bucket
+            JOIN job_posting_signatures s ON s.posting_id = b.posting_id
+            """,
+            [value for key in chunk for value in key]
+        ).fetchall()
+        found.update((row[0], row[1]) for row in rows)
+
+    return found
+
+
+@instrument()
+def save_posting_signatures(rows) -> int:
+    """
+    Store dedup results in one transaction. Each row is (posting_id,
+    signature bytes, canonical_id or None, band keys); canonical postings
+    are filed under their band keys, duplicates point at their canonical.
+    Returns the number of duplicates recorded.
+    """
+    duplicates = 0
+    with transaction() as conn:
+        for posting_id, signature, canonical_id, band_keys in rows:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_posting_signatures (posting_id, signature) "
+                "VALUES (?, ?)",
+                (posting_id, signature)
+            )
+            if canonical_id is not None:
+                duplicates += 1
+                conn.execute(
+                    "UPDATE job_postings SET canonical_id = ? WHERE id = ?",
+                    (canonical_id, posting_id)
+                )
+            else:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO job_posting_bands (band, bucket, posting_id) "
+                    "VALUES (?, ?, ?)",
+                    [(band, bucket, posting_id) for band, bucket in band_keys]
+                )
+    return duplicates
+
+
+
+# COHORT ANALYTICS
+# user_skills (each user's current skills) and the monthly skill_counts /
+# role_counts tables are maintained by triggers on resume_analysis and
+# job_recommendations (migration 10), inside the writing transaction.
+# These helpers read them through primary keys and indexes only; nothing
+# here parses identified_skills.
+
+def current_month() -> str:
+    """The 'YYYY-MM' bucket rows written now are counted under (UTC)."""
+    return datetime.utcnow().isoformat()[:7]
+
+
+@instrument()
+def count_users_with_skill(skill: str) -> int:
+    """Users whose latest analysis lists the skill (case-insensitive)."""
+    return get_connection().execute(
+        "SELECT COUNT(*) FROM user_skills WHERE skill = ?", (skill,)
+    ).fetchone()[0]
+
+
+@instrument()
+def get_users_with_skill(skill: str, limit: int = 100) -> list:
+    """User ids whose latest analysis lists the skill, lowest first."""
+    rows = get_connection().execute(
+        "SELECT user_id FROM user_skills WHERE skill = ? ORDER BY user_id LIMIT ?",
+        (skill, limit)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+@instrument()
+def get_user_skills(user_id: int) -> list:
+    """Skills of the user's latest analysis, alphabetically."""
+    rows = get_connection().execute(
+        "SELECT skill FROM user_skills WHERE user_id = ? ORDER BY skill", (user_id,)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+@instrument()
+def get_top_skills(limit: int = 20, month: str = None) -> list:
+    """
+    [{"skill", "analyses"}] for the skills listed in the most analyses,
+    in one 'YYYY-MM' month, or over all months when month is None.
+    """
+    if month is not None:
+        rows = get_connection().execute(
+            """
+            SELECT skill, analyses FROM skill_counts
+            WHERE bucket = ?
+            ORDER BY analyses DESC, skill
+            LIMIT ?
+            """,
+            (month, limit)
+        ).fetchall()
+    else:
+        rows = get_connection().execute(
+            """
+            SELECT skill, SUM(analyses) AS analyses FROM skill_counts
+            GROUP BY skill
+            ORDER BY analyses DESC, skill
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@instrument()
+def get_top_recommended_roles(limit: int = 20, month: str = None) -> list:
+    """
+    [{"job_title", "recommendations"}] for the most-recommended roles, in
+    one 'YYYY-MM' month, or over all months when month is None.
+    """
+    if month is not None:
+        rows = get_connection().execute(
+            """
+            SELECT job_title, recommendations FROM role_counts
+            WHERE bucket = ?
+            ORDER BY recommendations DESC, job_title
+            LIMIT ?
+            """,
+            (month, limit)
+        ).fetchall()
+    else:
+        rows = get_connection().execute(
+            """
+            SELECT job_title, SUM(recommendations) AS recommendations FROM role_counts
+            GROUP BY job_title
+            ORDER BY recommendations DESC, job_title
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,274 @@
+"""
+Lightweight call metrics with Prometheus text export.
+
+Enable with RESUME_APP_METRICS=1. Then either
+  RESUME_APP_METRICS_PORT=9108  serves /metrics on 127.0.0.1, or
+  RESUME_APP_METRICS_FILE=path  rewrites a .prom file every 15 seconds
+(both may be set). When disabled, @instrument returns the function
+unchanged and timed()/add() are no-ops, so the cost is close to nothing.
+"""
+import atexit
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("RESUME_APP_METRICS", "").lower() in ("1", "true", "yes", "on")
+METRICS_PORT = os.environ.get("RESUME_APP_METRICS_PORT")
+METRICS_FILE = os.environ.get("RESUME_APP_METRICS_FILE")
+FILE_INTERVAL = 15.0
+PREFIX = "resume_app"
+
+# Latency histogram upper bounds, seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_lock = threading.Lock()
+_calls = {}      # name -> {"count", "sum", "errors", "buckets": [..]}
+_counters = {}   # name -> float
+_stats_sources = {}  # name -> (stats function, keys exported as counters)
+_exporter_started = False
+
+
+def _observe(name: str, seconds: float, failed: bool):
+    with _lock:
+        series = _calls.get(name)
+        if series is None:
+            series = _calls[name] = {
+                "count": 0, "sum": 0.0, "errors": 0, "buckets": [0] * len(BUCKETS),
+            }
+        series["count"] += 1
+        series["sum"] += seconds
+        if failed:
+            series["errors"] += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series["buckets"][i] += 1
+                break
+
+
+def instrument(name: str = None):
+    """
+    Decorator recording call count, latency histogram and error count.
+    Generator functions are timed over the work done inside next(), not
+    the consumer's between yields; closing one early is not an error.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                elapsed = 0.0
+                failed = False
+                started = time.perf_counter()
+                try:
+                    gen = fn(*args, **kwargs)
+                    while True:
+                        try:
+                            item = next(gen)
+                        except StopIteration as stop:
+                            return stop.value
+                        elapsed += time.perf_counter() - started
+                        try:
+                            yield item
+                        except GeneratorExit:
+                            # Consumer stopped early or dropped us: not a failure
+                            gen.close()
+                            raise
+                        started = time.perf_counter()
+                except GeneratorExit:
+                    raise
+                except BaseException:
+                    failed = True
+                    elapsed += time.perf_counter() - started
+                    raise
+                finally:
+                    _observe(label, elapsed, failed)
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                _observe(label, time.perf_counter() - started, failed)
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def _timed(name: str):
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _observe(name, time.perf_counter() - started, failed)
+
+
+_NULL_CONTEXT = nullcontext()
+
+
+def timed(name: str):
+    """Context manager recording a block under `name` like @instrument."""
+    return _timed(name) if ENABLED else _NULL_CONTEXT
+
+
+def add(name: str, value: float = 1):
+    """Increment the counter `name` (exported as <prefix>_<name>_total)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def register_stats(name: str, stats, counters=()):
+    """
+    Export stats() (a dict of numbers) on every scrape as gauges named
+    <prefix>_<name>_<key>; keys in `counters` become <..>_total counters.
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        _stats_sources[name] = (stats, frozenset(counters))
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def render_prometheus() -> str:
+    """Current metrics in Prometheus text exposition format."""
+    with _lock:
+        calls = {k: dict(v, buckets=list(v["buckets"])) for k, v in _calls.items()}
+        counters = dict(_counters)
+        sources = dict(_stats_sources)
+
+    lines = [
+        f"# HELP {PREFIX}_call_duration_seconds Latency of instrumented calls.",
+        f"# TYPE {PREFIX}_call_duration_seconds histogram",
+    ]
+    for fn_name in sorted(calls):
+        series = calls[fn_name]
+        cumulative = 0
+        for bound, count in zip(BUCKETS, series["buckets"]):
+            cumulative += count
+            lines.append(
+                f'{PREFIX}_call_duration_seconds_bucket{{fn="{fn_name}",'
+                f'le="{_format_bound(bound)}"}} {cumulative}'
+            )
+        lines.append(f'{PREFIX}_call_duration_seconds_sum{{fn="{fn_name}"}} {series["sum"]}')
+        lines.append(f'{PREFIX}_call_duration_seconds_count{{fn="{fn_name}"}} {series["count"]}')
+
+    lines += [
+        f"# HELP {PREFIX}_call_errors_total Instrumented calls that raised.",
+        f"# TYPE {PREFIX}_call_errors_total counter",
+    ]
+    for fn_name in sorted(calls):
+        lines.append(f'{PREFIX}_call_errors_total{{fn="{fn_name}"}} {calls[fn_name]["errors"]}')
+
+    for name in sorted(counters):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {counters[name]}")
+
+    for source in sorted(sources):
+        stats, counter_keys = sources[source]
+        try:
+            values = stats()
+        except Exception as e:
+            print(f"[metrics] Could not read {source} stats: {e}")
+            continue
+        for key in sorted(values):
+            value = values[key]
+            if not isinstance(value, (int, float)):
+                continue
+            if key in counter_keys:
+                lines.append(f"# TYPE {PREFIX}_{source}_{key}_total counter")
+                lines.append(f"{PREFIX}_{source}_{key}_total {value}")
+            else:
+                lines.append(f"# TYPE {PREFIX}_{source}_{key} gauge")
+                lines.append(f"{PREFIX}_{source}_{key} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    """Atomically write the metrics to a file (node_exporter textfile style)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def start_http_server(port: int, host: str = "127.0.0.1"):
+    """Serve /metrics from a daemon thread. Returns the server."""
+    # Imported here: only processes exporting over HTTP need the server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _file_writer(path: str):
+    while True:
+        time.sleep(FILE_INTERVAL)
+        try:
+            write_prometheus(path)
+        except OSError as e:
+            print(f"[metrics] Could not write {path}: {e}")
+
+
+def start_exporters():
+    """Start the exporters configured by environment, once per process."""
+    global _exporter_started
+    if not ENABLED or _exporter_started:
+        return
+
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    if METRICS_PORT:
+        try:
+            start_http_server(int(METRICS_PORT))
+        except OSError as e:
+            # Another process (e.g. a second Streamlit worker) owns the port
+            print(f"[metrics] Could not listen on port {METRICS_PORT}: {e}")
+
+    if METRICS_FILE:
+        threading.Thread(
+            target=_file_writer, args=(METRICS_FILE,), name="metrics-file", daemon=True
+        ).start()
+        atexit.register(write_prometheus, METRICS_FILE)
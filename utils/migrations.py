@@ -0,0 +1,850 @@
+"""
+Versioned schema migrations for data/app.db.
+
+The schema version lives in PRAGMA user_version. Each migration runs in
+its own transaction and bumps the version, so a partially migrated
+database never exists. Run `python -m utils.migrations` to migrate and
+print the query plans of the hot queries, or
+`python -m utils.migrations rebuild-search` to re-index resume text.
+"""
+import argparse
+import os
+from datetime import datetime
+
+from utils.text_blobs import compress_text, register_sql_functions, text_hash
+
+SEARCH_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '+#'"
+# json_each value compared the way skill_counts.skill is (see migration 13)
+SKILL_NOCASE = "value COLLATE NOCASE"
+
+
+def _move_text_to_blobs(conn):
+    """
+    Migration 5: store each distinct extracted text once, compressed, in
+    text_blobs, and point resume_analysis rows at it by hash. The search
+    index moves with the text, so duplicate uploads are indexed once.
+    """
+    register_sql_functions(conn)
+
+    rows_before, bytes_before = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(length(CAST(extracted_text AS BLOB))), 0) "
+        "FROM resume_analysis"
+    ).fetchone()
+
+    for trigger in ["resume_analysis_search_ai", "resume_analysis_search_ad",
+                    "resume_analysis_search_au"]:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS resume_search")
+
+    conn.execute(
+        """
+        CREATE TABLE text_blobs (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            codec TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE TEMP TABLE text_hash_map (id INTEGER PRIMARY KEY, text_hash TEXT)")
+
+    now = datetime.utcnow().isoformat()
+    stored = set()
+    batch = []
+    for row_id, text in conn.execute("SELECT id, extracted_text FROM resume_analysis"):
+        text = text or ""
+        digest = text_hash(text)
+        if digest not in stored:
+            stored.add(digest)
+            codec, data, raw_size = compress_text(text)
+            conn.execute(
+                "INSERT INTO text_blobs (hash, codec, raw_size, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (digest, codec, raw_size, data, now)
+            )
+        batch.append((row_id, digest))
+        if len(batch) >= 1000:
+            conn.executemany("INSERT INTO text_hash_map VALUES (?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO text_hash_map VALUES (?, ?)", batch)
+
+    conn.execute(
+        """
+        CREATE TABLE resume_analysis_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            text_hash TEXT NOT NULL,
+            analysis_scores TEXT,
+            strengths TEXT,
+            weaknesses TEXT,
+            identified_skills TEXT,
+            recommended_skills TEXT,
+            analysis_timestamp TEXT NOT NULL,
+            content_hash TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (text_hash) REFERENCES text_blobs(hash)
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO resume_analysis_new
+        SELECT r.id, r.user_id, m.text_hash, r.analysis_scores, r.strengths,
+               r.weaknesses, r.identified_skills, r.recommended_skills,
+               r.analysis_timestamp, r.content_hash
+        FROM resume_analysis r JOIN text_hash_map m ON m.id = r.id
+        """
+    )
+    conn.execute("DROP TABLE text_hash_map")
+    conn.execute("DROP TABLE resume_analysis")
+    conn.execute("ALTER TABLE resume_analysis_new RENAME TO resume_analysis")
+    conn.execute("CREATE INDEX idx_resume_analysis_user_id ON resume_analysis (user_id, id DESC)")
+    conn.execute("CREATE INDEX idx_resume_analysis_content_hash ON resume_analysis (content_hash)")
+    conn.execute("CREATE INDEX idx_resume_analysis_text_hash ON resume_analysis (text_hash, id)")
+
+    # The index reads text through a view, since only Python can inflate it
+    conn.execute(
+        "CREATE VIEW text_blob_contents AS "
+        "SELECT id, inflate_text(codec, data) AS extracted_text FROM text_blobs"
+    )
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE resume_search USING fts5 (
+            extracted_text,
+            content='text_blob_contents',
+            content_rowid='id',
+            tokenize="{SEARCH_TOKENIZER}"
+        )
+        """
+    )
+    # Blobs are immutable, so inserts and deletes are all there is to mirror
+    conn.execute(
+        """
+        CREATE TRIGGER text_blobs_search_ai AFTER INSERT ON text_blobs BEGIN
+            INSERT INTO resume_search (rowid, extracted_text)
+            VALUES (new.id, inflate_text(new.codec, new.data));
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER text_blobs_search_ad AFTER DELETE ON text_blobs BEGIN
+            INSERT INTO resume_search (resume_search, rowid, extracted_text)
+            VALUES ('delete', old.id, inflate_text(old.codec, old.data));
+        END
+        """
+    )
+    conn.execute("INSERT INTO resume_search (resume_search) VALUES ('rebuild')")
+
+    blobs, bytes_after = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(length(data)), 0) FROM text_blobs"
+    ).fetchone()
+    saved = bytes_before - bytes_after
+    print(
+        f"[migrations] Resume text: {rows_before} rows, {bytes_before / 1e6:.1f} MB -> "
+        f"{blobs} blobs, {bytes_after / 1e6:.1f} MB ({saved / 1e6:.1f} MB saved; "
+        f"run `python -m utils.migrations vacuum` to shrink the file)"
+    )
+
+
+def _skills_of(column: str) -> str:
+    """json_each over a JSON skill list column; anything else reads as no skills."""
+    return f"json_each(CASE WHEN json_valid({column}) THEN {column} ELSE '[]' END)"
+
+
+def _refresh_user_skills(user_id: str) -> str:
+    """Trigger body: user_skills for one user = skills of their latest analysis."""
+    return f"""
+                DELETE FROM user_skills WHERE user_id = {user_id};
+                INSERT OR IGNORE INTO user_skills (user_id, skill, analysis_id)
+                SELECT r.user_id, s.value, r.id
+                FROM resume_analysis r, {_skills_of("r.identified_skills")} s
+                WHERE r.id = (SELECT MAX(id) FROM resume_analysis WHERE user_id = {user_id})
+                  AND s.type = 'text';"""
+
+
+def _count_skills(column: str, timestamp: str, delta: int, skill: str = "value") -> str:
+    """
+    Trigger body: add delta to the month's count of every skill in column.
+    skill is the expression the +1 path de-duplicates on; migration 10
+    used plain value, so "SQL" and "sql" in one analysis counted twice.
+    """
+    if delta > 0:
+        return f"""
+                INSERT INTO skill_counts (bucket, skill, analyses)
+                SELECT DISTINCT substr({timestamp}, 1, 7), {skill}, 1
+                FROM {_skills_of(column)} WHERE type = 'text'
+                ON CONFLICT (bucket, skill) DO UPDATE SET analyses = analyses + 1;"""
+    return f"""
+                UPDATE skill_counts SET analyses = analyses - 1
+                WHERE bucket = substr({timestamp}, 1, 7)
+                  AND skill IN (SELECT value FROM {_skills_of(column)} WHERE type = 'text');
+                DELETE FROM skill_counts
+                WHERE bucket = substr({timestamp}, 1, 7) AND analyses <= 0;"""
+
+
+# MIGRATIONS
+# Each entry is (version, description, steps). A step is either a SQL
+# string or a callable taking the connection. Never edit a shipped
+# migration; append a new one instead.
+
+MIGRATIONS = [
+    (
+        1,
+        "base tables",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                full_name TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                registration_date TEXT NOT NULL,
+                resume_path TEXT
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS resume_analysis (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                extracted_text TEXT NOT NULL,
+                analysis_scores TEXT,
+                strengths TEXT,
+                weaknesses TEXT,
+                identified_skills TEXT,
+                recommended_skills TEXT,
+                analysis_timestamp TEXT NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS job_recommendations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                job_title TEXT,
+                company_name TEXT,
+                location TEXT,
+                job_description TEXT,
+                job_url TEXT,
+                match_percentage REAL,
+                scraping_date TEXT,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS resume_cache (
+                content_hash TEXT PRIMARY KEY,
+                file_path TEXT,
+                extracted_text TEXT NOT NULL,
+                analysis TEXT,
+                created_at TEXT NOT NULL
+            );
+            """,
+        ],
+    ),
+    (
+        2,
+        "per-user indexes for latest-first lookups",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_resume_analysis_user_id
+            ON resume_analysis (user_id, id DESC);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_recommendations_user_id
+            ON job_recommendations (user_id, id DESC);
+            """,
+        ],
+    ),
+    (
+        3,
+        "content hash on resume_analysis for resumable batch ingestion",
+        [
+            "ALTER TABLE resume_analysis ADD COLUMN content_hash TEXT;",
+            """
+            CREATE INDEX IF NOT EXISTS idx_resume_analysis_content_hash
+            ON resume_analysis (content_hash);
+            """,
+        ],
+    ),
+    (
+        4,
+        "full-text search index over resume_analysis.extracted_text",
+        [
+            # External content: the index stores only tokens and reads the
+            # text back from resume_analysis for snippets. '+' and '#' are
+            # word characters so c++ and c# stay searchable.
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5 (
+                extracted_text,
+                content='resume_analysis',
+                content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2 tokenchars '+#'"
+            );
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_search_ai
+            AFTER INSERT ON resume_analysis BEGIN
+                INSERT INTO resume_search (rowid, extracted_text)
+                VALUES (new.id, new.extracted_text);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_search_ad
+            AFTER DELETE ON resume_analysis BEGIN
+                INSERT INTO resume_search (resume_search, rowid, extracted_text)
+                VALUES ('delete', old.id, old.extracted_text);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_search_au
+            AFTER UPDATE OF extracted_text ON resume_analysis BEGIN
+                INSERT INTO resume_search (resume_search, rowid, extracted_text)
+                VALUES ('delete', old.id, old.extracted_text);
+                INSERT INTO resume_search (rowid, extracted_text)
+                VALUES (new.id, new.extracted_text);
+            END;
+            """,
+            # Backfill rows written before the index existed
+            "INSERT INTO resume_search (resume_search) VALUES ('rebuild');",
+        ],
+    ),
+    (
+        5,
+        "compressed, deduplicated resume text in text_blobs",
+        [_move_text_to_blobs],
+    ),
+    (
+        6,
+        "analysis_jobs work queue",
+        [
+            # status: queued -> running -> done, or back to queued with a
+            # later run_after on failure, or dead after max_attempts.
+            # Times are epoch seconds so lease arithmetic stays in SQL.
+            """
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                run_after REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                result_id INTEGER,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_analysis_jobs_ready
+            ON analysis_jobs (status, run_after);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_analysis_jobs_lease
+            ON analysis_jobs (status, lease_expires);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_analysis_jobs_user
+            ON analysis_jobs (user_id, content_hash, id DESC);
+            """,
+        ],
+    ),
+    (
+        7,
+        "analyzer/matcher versions on analyses and recommendations",
+        [
+            # NULL means "written before versioning", i.e. stale
+            "ALTER TABLE resume_analysis ADD COLUMN analyzer_version INTEGER;",
+            "ALTER TABLE resume_analysis ADD COLUMN matcher_version INTEGER;",
+            "ALTER TABLE job_recommendations ADD COLUMN analysis_id INTEGER "
+            "REFERENCES resume_analysis(id);",
+            "ALTER TABLE job_recommendations ADD COLUMN analyzer_version INTEGER;",
+            "ALTER TABLE job_recommendations ADD COLUMN matcher_version INTEGER;",
+            # Older recommendations were saved right after their analysis:
+            # link each to the user's latest analysis written before it
+            """
+            UPDATE job_recommendations
+            SET analysis_id = (
+                SELECT MAX(r.id) FROM resume_analysis r
+                WHERE r.user_id = job_recommendations.user_id
+                  AND r.analysis_timestamp <= job_recommendations.scraping_date
+            )
+            WHERE analysis_id IS NULL;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_recommendations_analysis_id
+            ON job_recommendations (analysis_id);
+            """,
+        ],
+    ),
+    (
+        8,
+        "scraped job postings and HTTP validators for conditional fetches",
+        [
+            # Ids only grow, so the job index can pick up new rows by id
+            """
+            CREATE TABLE IF NOT EXISTS job_postings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL UNIQUE,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                description TEXT,
+                tags TEXT,
+                posted_at TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS scrape_pages (
+                url TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                status INTEGER,
+                fetched_at TEXT NOT NULL,
+                changed_at TEXT
+            );
+            """,
+        ],
+    ),
+    (
+        9,
+        "MinHash signatures and LSH bands for near-duplicate job postings",
+        [
+            # NULL: the posting is canonical itself (or not checked yet)
+            "ALTER TABLE job_postings ADD COLUMN canonical_id INTEGER "
+            "REFERENCES job_postings(id);",
+            """
+            CREATE TABLE IF NOT EXISTS job_posting_signatures (
+                posting_id INTEGER PRIMARY KEY REFERENCES job_postings(id),
+                signature BLOB NOT NULL
+            );
+            """,
+            # Only canonical postings are banded; a lookup is one probe per band
+            """
+            CREATE TABLE IF NOT EXISTS job_posting_bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                posting_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, posting_id)
+            ) WITHOUT ROWID;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_posting_bands_posting_id
+            ON job_posting_bands (posting_id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_postings_canonical_id
+            ON job_postings (canonical_id);
+            """,
+            # A re-scraped posting whose text changed is checked again, and
+            # so are the duplicates that pointed at it
+            """
+            CREATE TRIGGER IF NOT EXISTS job_postings_text_changed
+            AFTER UPDATE OF description ON job_postings
+            WHEN old.description IS NOT new.description BEGIN
+                DELETE FROM job_posting_signatures
+                WHERE posting_id = new.id
+                   OR posting_id IN (SELECT id FROM job_postings WHERE canonical_id = new.id);
+                DELETE FROM job_posting_bands WHERE posting_id = new.id;
+                UPDATE job_postings SET canonical_id = NULL
+                WHERE id = new.id OR canonical_id = new.id;
+            END;
+            """,
+        ],
+    ),
+    (
+        10,
+        "user_skills and monthly skill / recommended-role counts",
+        [
+            # Skills of each user's latest analysis, one row per skill
+            """
+            CREATE TABLE IF NOT EXISTS user_skills (
+                user_id INTEGER NOT NULL REFERENCES users(id),
+                skill TEXT NOT NULL COLLATE NOCASE,
+                analysis_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, skill)
+            ) WITHOUT ROWID;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_skills_skill
+            ON user_skills (skill, user_id);
+            """,
+            # Materialized counts per month ('YYYY-MM'). A bucket holds at
+            # most one row per skill / role, so "top N this month" reads a
+            # bounded number of rows however many analyses there are.
+            """
+            CREATE TABLE IF NOT EXISTS skill_counts (
+                bucket TEXT NOT NULL,
+                skill TEXT NOT NULL COLLATE NOCASE,
+                analyses INTEGER NOT NULL,
+                PRIMARY KEY (bucket, skill)
+            ) WITHOUT ROWID;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS role_counts (
+                bucket TEXT NOT NULL,
+                job_title TEXT NOT NULL,
+                recommendations INTEGER NOT NULL,
+                PRIMARY KEY (bucket, job_title)
+            ) WITHOUT ROWID;
+            """,
+            # Kept current by triggers, i.e. in the writer's own transaction,
+            # whichever helper (single, bulk, re-analysis) wrote the row
+            f"""
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_skills_ai
+            AFTER INSERT ON resume_analysis BEGIN
+                {_count_skills("new.identified_skills", "new.analysis_timestamp", 1)}
+                {_refresh_user_skills("new.user_id")}
+            END;
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_skills_au
+            AFTER UPDATE OF identified_skills ON resume_analysis
+            WHEN old.identified_skills IS NOT new.identified_skills BEGIN
+                {_count_skills("old.identified_skills", "old.analysis_timestamp", -1)}
+                {_count_skills("new.identified_skills", "new.analysis_timestamp", 1)}
+                {_refresh_user_skills("new.user_id")}
+            END;
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS resume_analysis_skills_ad
+            AFTER DELETE ON resume_analysis BEGIN
+                {_count_skills("old.identified_skills", "old.analysis_timestamp", -1)}
+                {_refresh_user_skills("old.user_id")}
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS job_recommendations_roles_ai
+            AFTER INSERT ON job_recommendations WHEN new.job_title IS NOT NULL BEGIN
+                INSERT INTO role_counts (bucket, job_title, recommendations)
+                VALUES (substr(COALESCE(new.scraping_date, ''), 1, 7), new.job_title, 1)
+                ON CONFLICT (bucket, job_title) DO UPDATE SET recommendations = recommendations + 1;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS job_recommendations_roles_ad
+            AFTER DELETE ON job_recommendations WHEN old.job_title IS NOT NULL BEGIN
+                UPDATE role_counts SET recommendations = recommendations - 1
+                WHERE bucket = substr(COALESCE(old.scraping_date, ''), 1, 7)
+                  AND job_title = old.job_title;
+                DELETE FROM role_counts
+                WHERE bucket = substr(COALESCE(old.scraping_date, ''), 1, 7)
+                  AND job_title = old.job_title AND recommendations <= 0;
+            END;
+            """,
+            # Backfill from the rows written so far (the one full scan)
+            f"""
+            INSERT OR IGNORE INTO user_skills (user_id, skill, analysis_id)
+            SELECT r.user_id, s.value, r.id
+            FROM resume_analysis r, {_skills_of("r.identified_skills")} s
+            WHERE r.id IN (SELECT MAX(id) FROM resume_analysis GROUP BY user_id)
+              AND s.type = 'text';
+            """,
+            f"""
+            INSERT INTO skill_counts (bucket, skill, analyses)
+            SELECT substr(r.analysis_timestamp, 1, 7), s.value, COUNT(DISTINCT r.id)
+            FROM resume_analysis r, {_skills_of("r.identified_skills")} s
+            WHERE s.type = 'text'
+            GROUP BY 1, 2
+            ON CONFLICT (bucket, skill) DO UPDATE SET analyses = analyses + excluded.analyses;
+            """,
+            """
+            INSERT INTO role_counts (bucket, job_title, recommendations)
+            SELECT substr(COALESCE(scraping_date, ''), 1, 7), job_title, COUNT(*)
+            FROM job_recommendations
+            WHERE job_title IS NOT NULL
+            GROUP BY 1, 2;
+            """,
+        ],
+    ),
+    (
+        11,
+        "index resume text from the app instead of inflate_text triggers",
+        [
+            # The triggers called the Python-only inflate_text(), so any
+            # connection without it (sqlite3 shell, backup tools) failed on
+            # every write to text_blobs. _store_text() and
+            # prune_text_blobs() now update resume_search themselves; texts
+            # written by other tools are picked up by rebuild-search.
+            "DROP TRIGGER IF EXISTS text_blobs_search_ai;",
+            "DROP TRIGGER IF EXISTS text_blobs_search_ad;",
+        ],
+    ),
+    (
+        12,
+        "change_seq on job_postings so the matcher index picks up edits",
+        [
+            # Every insert, edit and change of duplicate status takes the
+            # next change_seq. Writers hold the write lock, so sequence
+            # order is commit order and "change_seq > last seen" misses
+            # nothing; the matcher drops and re-adds those rows.
+            "ALTER TABLE job_postings ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0;",
+            "UPDATE job_postings SET change_seq = id;",
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_postings_change_seq
+            ON job_postings (change_seq);
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS job_postings_seq_ai
+            AFTER INSERT ON job_postings BEGIN
+                UPDATE job_postings
+                SET change_seq = (SELECT MAX(change_seq) FROM job_postings) + 1
+                WHERE id = new.id;
+            END;
+            """,
+            # Re-scrapes rewrite every column; only real changes count
+            """
+            CREATE TRIGGER IF NOT EXISTS job_postings_seq_au
+            AFTER UPDATE OF source, title, company, location, description, tags,
+                            posted_at, canonical_id ON job_postings
+            WHEN old.source IS NOT new.source OR old.title IS NOT new.title
+              OR old.company IS NOT new.company OR old.location IS NOT new.location
+              OR old.description IS NOT new.description OR old.tags IS NOT new.tags
+              OR old.posted_at IS NOT new.posted_at
+              OR old.canonical_id IS NOT new.canonical_id BEGIN
+                UPDATE job_postings
+                SET change_seq = (SELECT MAX(change_seq) FROM job_postings) + 1
+                WHERE id = new.id;
+            END;
+            """,
+        ],
+    ),
+    (
+        13,
+        "count each skill once per analysis regardless of case",
+        [
+            # skill_counts.skill is NOCASE, but the insert trigger's
+            # DISTINCT compared case-sensitively; redo it and recount
+            "DROP TRIGGER IF EXISTS resume_analysis_skills_ai;",
+            "DROP TRIGGER IF EXISTS resume_analysis_skills_au;",
+            f"""
+            CREATE TRIGGER resume_analysis_skills_ai
+            AFTER INSERT ON resume_analysis BEGIN
+                {_count_skills("new.identified_skills", "new.analysis_timestamp", 1, SKILL_NOCASE)}
+                {_refresh_user_skills("new.user_id")}
+            END;
+            """,
+            f"""
+            CREATE TRIGGER resume_analysis_skills_au
+            AFTER UPDATE OF identified_skills ON resume_analysis
+            WHEN old.identified_skills IS NOT new.identified_skills BEGIN
+                {_count_skills("old.identified_skills", "old.analysis_timestamp", -1)}
+                {_count_skills("new.identified_skills", "new.analysis_timestamp", 1, SKILL_NOCASE)}
+                {_refresh_user_skills("new.user_id")}
+            END;
+            """,
+            "DELETE FROM skill_counts;",
+            f"""
+            INSERT INTO skill_counts (bucket, skill, analyses)
+            SELECT substr(r.analysis_timestamp, 1, 7), s.value, COUNT(DISTINCT r.id)
+            FROM resume_analysis r, {_skills_of("r.identified_skills")} s
+            WHERE s.type = 'text'
+            GROUP BY 1, s.value COLLATE NOCASE;
+            """,
+        ],
+    ),
+    (
+        14,
+        "dedup high-water mark so signing skips postings already seen",
+        [
+            # Every posting that loses its signature (new, edited, or a
+            # duplicate of an edited one) also takes a new change_seq, so
+            # unsigned postings all sit above the last change_seq checked.
+            # Kept in the database to roll back with the batch it covers.
+            """
+            CREATE TABLE IF NOT EXISTS job_posting_dedup_mark (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                change_seq INTEGER NOT NULL
+            );
+            """,
+            "INSERT OR IGNORE INTO job_posting_dedup_mark (id, change_seq) VALUES (1, 0);",
+        ],
+    ),
+]
+
+# Queries the app runs on every page view; their plans must use an index
+HOT_QUERIES = [
+    (
+        "get_user_by_email",
+        "SELECT * FROM users WHERE email = ?",
+        ("someone@example.com",),
+    ),
+    (
+        "get_latest_resume_analysis",
+        "SELECT r.*, b.codec, b.data FROM resume_analysis r "
+        "LEFT JOIN text_blobs b ON b.hash = r.text_hash "
+        "WHERE r.user_id = ? ORDER BY r.id DESC LIMIT 1",
+        (1,),
+    ),
+    (
+        "iter_job_recommendations_for_user",
+        "SELECT * FROM job_recommendations WHERE user_id = ? AND id < ? "
+        "ORDER BY id DESC LIMIT ?",
+        (1, 1000, 100),
+    ),
+    (
+        "get_analyzed_content_hashes",
+        "SELECT DISTINCT content_hash FROM resume_analysis "
+        "WHERE content_hash IN (?, ?) AND user_id = ?",
+        ("0" * 64, "f" * 64, 1),
+    ),
+    (
+        "get_unsigned_job_postings",
+        "SELECT p.id FROM job_postings p WHERE p.change_seq > ? "
+        "AND NOT EXISTS (SELECT 1 FROM job_posting_signatures s WHERE s.posting_id = p.id) "
+        "ORDER BY p.change_seq LIMIT ?",
+        (0, 500),
+    ),
+    (
+        "get_resume_cache_entry",
+        "SELECT * FROM resume_cache WHERE content_hash = ?",
+        ("0" * 64,),
+    ),
+    (
+        "get_resume_text",
+        "SELECT codec, data FROM text_blobs WHERE hash = ?",
+        ("0" * 64,),
+    ),
+    (
+        "claim_analysis_job",
+        "SELECT id FROM analysis_jobs WHERE status = 'queued' AND run_after <= ? "
+        "ORDER BY run_after, id LIMIT 1",
+        (0.0,),
+    ),
+    (
+        "reclaim_expired_leases",
+        "SELECT id FROM analysis_jobs WHERE status = 'running' AND lease_expires <= ?",
+        (0.0,),
+    ),
+    (
+        "search_resumes",
+        "SELECT r.id FROM resume_search s JOIN text_blobs b ON b.id = s.rowid "
+        "JOIN resume_analysis r ON r.text_hash = b.hash "
+        "WHERE resume_search MATCH ? ORDER BY s.rank LIMIT ? OFFSET ?",
+        ("python", 20, 0),
+    ),
+]
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn) -> list:
+    """
+    Apply every migration newer than the database's user_version.
+    Expects an autocommit connection. Returns the versions applied.
+    """
+    applied = []
+
+    for version, description, steps in MIGRATIONS:
+        if get_schema_version(conn) >= version:
+            continue
+
+        # IMMEDIATE takes the write lock first, so a concurrent process
+        # that raced us here sees the bumped version and skips the step
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.execute("ROLLBACK")
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(f"[migrations] Applied {version}: {description}")
+        applied.append(version)
+
+    return applied
+
+
+def explain_hot_queries(conn) -> dict:
+    """Return {query name: [plan detail lines]} for HOT_QUERIES."""
+    plans = {}
+    for name, sql, params in HOT_QUERIES:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        plans[name] = [row[3] for row in rows]
+    return plans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the app.db schema.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="migrate",
+        choices=["migrate", "explain", "rebuild-search", "vacuum"],
+        help="migrate: apply pending migrations, then print query plans; "
+             "explain: only print query plans; "
+             "rebuild-search: re-index all resume text for full-text search; "
+             "vacuum: drop unreferenced text blobs and shrink the file",
+    )
+    args = parser.parse_args(argv)
+
+    from utils.database import (
+        DB_PATH,
+        get_connection,
+        init_db,
+        prune_text_blobs,
+        rebuild_search_index,
+    )
+
+    if args.command in ("migrate", "rebuild-search", "vacuum"):
+        init_db()
+
+    if args.command == "vacuum":
+        size_before = os.path.getsize(DB_PATH)
+        removed = prune_text_blobs()
+        conn = get_connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        size_after = os.path.getsize(DB_PATH)
+        print(
+            f"Removed {removed} unreferenced text blobs; "
+            f"{size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB"
+        )
+        return
+
+    if args.command == "rebuild-search":
+        count, seconds = rebuild_search_index()
+        print(f"Indexed {count} resumes in {seconds:.1f}s")
+        return
+
+    conn = get_connection()
+    print(f"Schema version: {get_schema_version(conn)} (latest {latest_version()})")
+
+    for name, details in explain_hot_queries(conn).items():
+        print(f"\n{name}")
+        for detail in details:
+            # full scans and temp sorts are what the indexes should prevent
+            slow = (detail.startswith("SCAN") and "INDEX" not in detail) or "TEMP B-TREE" in detail
+            flag = "  !! " if slow else "     "
+            print(flag + detail)
+
+
+if __name__ == "__main__":
+    main()
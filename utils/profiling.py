@@ -0,0 +1,125 @@
+"""
+Per-rerun cProfile capture for the Streamlit app.
+
+Each profiled rerun is written to PROFILE_DIR as
+<elapsed ms>-<page>-<timestamp>.pstats, and only the slowest KEEP_SLOWEST
+files are kept. Inspect one with `python -m pstats <file>` or snakeviz.
+"""
+import cProfile
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(os.environ.get("RESUME_APP_PROFILE_DIR", BASE_DIR / "data" / "profiles"))
+KEEP_SLOWEST = int(os.environ.get("RESUME_APP_PROFILE_KEEP", "20"))
+TOP_FUNCTIONS = 15
+
+_prune_lock = threading.Lock()
+
+
+def profiling_enabled_by_env() -> bool:
+    return os.environ.get("RESUME_APP_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+def _short_path(filename: str) -> str:
+    """Trim a source path to something readable in a table."""
+    if filename.startswith(str(BASE_DIR)):
+        return os.path.relpath(filename, BASE_DIR)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return filename
+
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> list:
+    """Returns the `limit` entries with the highest cumulative time."""
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({_short_path(filename)}:{line})",
+            "calls": ncalls,
+            "own_ms": round(tottime * 1000, 2),
+            "cumulative_ms": round(cumtime * 1000, 2),
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _kept_profiles(profile_dir: Path) -> list:
+    # Zero-padded elapsed time first, so name order is slowest-last
+    return sorted(profile_dir.glob("*.pstats"))
+
+
+def _save_if_slow(stats: pstats.Stats, elapsed_ms: int, page: str,
+                  profile_dir: Path, keep: int):
+    """Write the profile if it ranks among the slowest `keep`. Returns the path or None."""
+    with _prune_lock:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        kept = _kept_profiles(profile_dir)
+        if len(kept) >= keep and elapsed_ms <= int(kept[0].name.split("-", 1)[0]):
+            return None
+
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        path = profile_dir / f"{elapsed_ms:09d}-{page}-{stamp}.pstats"
+        stats.dump_stats(path)
+
+        kept = _kept_profiles(profile_dir)
+        for old in kept[:max(0, len(kept) - keep)]:
+            try:
+                old.unlink()
+            except FileNotFoundError:
+                pass  # pruned concurrently by another session
+        return path if path.exists() else None
+
+
+class RerunProfiler:
+    """
+    Context manager profiling one rerun. After exit, `report` holds
+    {page, elapsed_ms, saved_to, top} (or None if profiling was unavailable).
+    """
+
+    def __init__(self, page: str, profile_dir: Path = None, keep: int = None):
+        self.page = page
+        self.profile_dir = Path(profile_dir or PROFILE_DIR)
+        self.keep = keep or KEEP_SLOWEST
+        self.report = None
+        self._profiler = None
+        self._started = 0.0
+
+    def __enter__(self):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another session's rerun is already being profiled (Python 3.12+
+            # allows one active profiler per process); skip this one.
+            return self
+        self._profiler = profiler
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return False
+
+        self._profiler.disable()
+        elapsed_ms = int((time.perf_counter() - self._started) * 1000)
+        stats = pstats.Stats(self._profiler)
+
+        try:
+            saved_to = _save_if_slow(stats, elapsed_ms, self.page, self.profile_dir, self.keep)
+        except OSError as e:
+            print(f"[profiling] Could not save profile: {e}")
+            saved_to = None
+
+        self.report = {
+            "page": self.page,
+            "elapsed_ms": elapsed_ms,
+            "saved_to": str(saved_to) if saved_to else None,
+            "top": top_functions(stats),
+        }
+        return False  # never swallow Streamlit's rerun/stop exceptions
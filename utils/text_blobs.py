@@ -0,0 +1,90 @@
+"""
+Compression helpers for the content-addressed text_blobs table.
+
+Texts are keyed by the SHA-256 of their UTF-8 bytes, so a resume that is
+analysed a hundred times is stored (and full-text indexed) once.
+"""
+import hashlib
+import zlib
+from collections.abc import MutableMapping
+
+ZLIB_LEVEL = 6
+# Below this, the zlib header costs more than it saves
+MIN_COMPRESS_BYTES = 128
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str) -> tuple:
+    """Returns (codec, data, raw_size)."""
+    raw = text.encode("utf-8")
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        packed = zlib.compress(raw, ZLIB_LEVEL)
+        if len(packed) < len(raw):
+            return "zlib", packed, len(raw)
+    return "raw", raw, len(raw)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if data is None:
+        return None
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if codec == "raw":
+        return bytes(data).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec!r}")
+
+
+class LazyTextRow(MutableMapping):
+    """
+    A row dict whose `key` column is decompressed on first access.
+    Callers that only need the scores and skills never pay for inflating
+    the resume text.
+    """
+
+    def __init__(self, row: dict, key: str, codec: str, data: bytes):
+        self._row = dict(row)
+        self._row[key] = None
+        self._key = key
+        self._packed = (codec, data)
+
+    def __getitem__(self, name):
+        if name == self._key and self._packed is not None:
+            self._row[name] = decompress_text(*self._packed)
+            self._packed = None
+        return self._row[name]
+
+    def __setitem__(self, name, value):
+        if name == self._key:
+            self._packed = None
+        self._row[name] = value
+
+    def __delitem__(self, name):
+        if name == self._key:
+            self._packed = None
+        del self._row[name]
+
+    def __contains__(self, name):
+        return name in self._row
+
+    def __iter__(self):
+        return iter(self._row)
+
+    def __len__(self):
+        return len(self._row)
+
+    def __repr__(self):
+        state = "packed" if self._packed is not None else "loaded"
+        return f"LazyTextRow({self._key}={state}, {len(self._row)} columns)"
+
+
+def register_sql_functions(conn):
+    """
+    Expose decompress_text() to SQL as inflate_text(codec, data). The
+    full-text index's content view reads resume text through it, so
+    connections that search (snippets) or rebuild the index need it;
+    writing text_blobs does not.
+    """
+    conn.create_function("inflate_text", 2, decompress_text, deterministic=True)
@@ -0,0 +1,187 @@
+"""
+Write-behind batching for database writes (optional).
+
+With RESUME_APP_WRITE_BEHIND=1, write(func, ...) hands the call to one
+writer thread instead of running it on the caller's connection. The
+writer owns the write connection: it takes calls off a queue and runs
+up to WRITE_BATCH_SIZE of them, or whatever arrived within
+WRITE_BATCH_DELAY seconds of the first, in one BEGIN IMMEDIATE
+transaction. Many sessions then share one lock acquisition and one
+commit instead of queueing on the SQLite lock one by one.
+
+Each call runs in its own savepoint, so a failing write (say, a
+duplicate email) only fails its own future. Futures resolve after the
+batch commits: wait on one and a following read sees the write.
+
+Without the environment variable write() runs the call inline and
+returns an already-completed future, so callers look the same either way.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.database import in_transaction, transaction
+
+WRITE_BEHIND = os.environ.get("RESUME_APP_WRITE_BEHIND", "").lower() in ("1", "true", "yes", "on")
+WRITE_BATCH_SIZE = int(os.environ.get("RESUME_APP_WRITE_BATCH_SIZE", "200"))
+# 0: take whatever queued up while the last batch committed (group
+# commit). Only worth raising when callers do not wait on their futures.
+WRITE_BATCH_DELAY = float(os.environ.get("RESUME_APP_WRITE_BATCH_DELAY", "0"))
+# How long callers wait on a write's future before giving up (seconds)
+WRITE_RESULT_TIMEOUT = float(os.environ.get("RESUME_APP_WRITE_TIMEOUT", "30"))
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """One thread that runs queued write calls in batched transactions."""
+
+    def __init__(self, max_batch: int = WRITE_BATCH_SIZE, max_delay: float = WRITE_BATCH_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """Queue func(*args, **kwargs); the future holds its return value."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write-behind writer is closed")
+            self._queue.put((future, func, args, kwargs))
+        return future
+
+    def flush(self, timeout: float = None):
+        """Wait until everything submitted so far has been committed."""
+        self.submit(lambda: None).result(timeout)
+
+    def close(self):
+        """Commit what is queued, then stop the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _next_batch(self) -> tuple:
+        """Block for one call, then gather more until size or time runs out."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: list):
+        outcomes = []
+        try:
+            with transaction():
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        outcomes.append(None)
+                        continue
+                    try:
+                        with transaction():
+                            outcomes.append((True, func(*args, **kwargs)))
+                    except Exception as e:
+                        outcomes.append((False, e))
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the batch was written. A
+            # failed BEGIN leaves every future still pending, so fail those too
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            with self._lock:
+                self.failed += len(batch)
+            return
+
+        failed = 0
+        for (future, *_), outcome in zip(batch, outcomes):
+            if outcome is None:
+                continue
+            ok, value = outcome
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+                failed += 1
+        with self._lock:
+            self.batches += 1
+            self.writes += len(batch)
+            self.failed += failed
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "writes": self.writes,
+                "failed": self.failed,
+                "largest_batch": self.largest_batch,
+                "mean_batch": self.writes / self.batches if self.batches else 0.0,
+            }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The process's writer, started on first use; None unless enabled."""
+    global _writer
+    if not WRITE_BEHIND:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteBehindWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def write(func, *args, **kwargs) -> Future:
+    """
+    Run a database write through the writer if write-behind is enabled,
+    otherwise right here. Either way the result comes back as a future.
+    """
+    writer = get_writer()
+    # Inside the caller's own transaction the write must join it (and the
+    # writer could not get the lock the caller holds anyway)
+    if writer is not None and not in_transaction():
+        return writer.submit(func, *args, **kwargs)
+
+    future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future